@@ -0,0 +1,344 @@
+"""
+Deduplikatsiyali, siqilgan inkremental backup
+Har bir fayl mazmuni sha256 bo'yicha faqat bir marta, siqilgan holda
+backups/objects/ ga yoziladi; snapshot esa faqat "fayl -> xesh" ro'yxati
+(backups/snapshots/<vaqt>.json). products.json ichidagi base64 rasmlar
+alohida obyekt sifatida saqlanadi - bir xil rasm barcha snapshotlarda bitta.
+
+O'zgarmagan fayl qayta o'qilmaydi (imzo keshi: inode, hajm, mtime), hech
+narsa o'zgarmagan bo'lsa yangi snapshot yaratilmaydi.
+
+Saqlash muddati: oxirgi BACKUP_KEEP_HOURLY soat, BACKUP_KEEP_DAILY kun va
+BACKUP_KEEP_WEEKLY haftaning har biridan eng yangi snapshot qoladi,
+hech bir snapshot ishlatmaydigan obyektlar o'chiriladi.
+
+Ishlatish:
+    python backup_store.py create
+    python backup_store.py list
+    python backup_store.py restore <snapshot> [bot|web] [papka]   # bot to'xtatilgan holda
+    python backup_store.py prune
+"""
+
+import os
+import sys
+import gzip
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+from storage import file_signature, write_json_atomic
+from image_store import IMAGES_DIR, THUMBS_DIR, is_data_uri
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.getenv('BACKUP_DIR', 'backups')
+BACKUP_KEEP_HOURLY = int(os.getenv('BACKUP_KEEP_HOURLY', '24'))
+BACKUP_KEEP_DAILY = int(os.getenv('BACKUP_KEEP_DAILY', '7'))
+BACKUP_KEEP_WEEKLY = int(os.getenv('BACKUP_KEEP_WEEKLY', '4'))
+
+# Zaxiralanadigan fayllar (images/ papkasi ham qo'shiladi, thumbs/ - yo'q)
+# Yig'ish paytida olingan backupda snapshotga hali tushmagan yozuvlar compacting jurnalida
+BACKUP_FILES = ['products.json', 'categories.json', 'orders.json', 'settings.json',
+                'admin_ids.json', 'orders.journal.jsonl', 'orders.journal.compacting.jsonl',
+                'orders.snapshot.json']
+# Zaxiralanmaydigan, lekin tiklashdan keyin qolsa eski holatni qaytaradigan fayl
+# (snapshot belgisi tiklangan orders.json ga mos emas)
+RESTORE_STALE_FILES = ['orders.snapshot.state.json']
+
+# products.json ichida alohida saqlangan rasm o'rnidagi belgi
+IMAGE_MARKER = 'backup-image:'
+
+SNAPSHOT_FORMAT = '%Y%m%d_%H%M%S'
+
+def compress(content):
+    """zstd (o'rnatilgan bo'lsa) yoki gzip: (kengaytma, siqilgan baytlar)"""
+    if zstandard is not None:
+        return 'zst', zstandard.ZstdCompressor(level=10).compress(content)
+    return 'gz', gzip.compress(content, compresslevel=6, mtime=0)
+
+def decompress(extension, content):
+    if extension == 'zst':
+        if zstandard is None:
+            raise RuntimeError("zstd bilan siqilgan obyekt uchun zstandard kutubxonasi kerak")
+        return zstandard.ZstdDecompressor().decompress(content)
+    return gzip.decompress(content)
+
+def list_files(data_dir, files=BACKUP_FILES):
+    """Papkadagi zaxiralanadigan fayllar (nisbiy yo'llar)"""
+    names = [name for name in files if os.path.isfile(os.path.join(data_dir, name))]
+    images_dir = os.path.join(data_dir, IMAGES_DIR)
+    if os.path.isdir(images_dir):
+        names.extend(f"{IMAGES_DIR}/{name}" for name in sorted(os.listdir(images_dir))
+                     if name != THUMBS_DIR and not name.endswith('.tmp')
+                     and os.path.isfile(os.path.join(images_dir, name)))
+    return names
+
+def snapshot_time(snapshot_id):
+    return datetime.strptime(snapshot_id[:15], SNAPSHOT_FORMAT)
+
+def select_retained(snapshot_ids, hourly=None, daily=None, weekly=None):
+    """Saqlanadigan snapshotlar: har soat/kun/hafta uchun eng yangisi (+ oxirgisi)"""
+    ids = sorted(snapshot_ids)
+    keep = set(ids[-1:])
+    for fmt, count in (('%Y%m%d%H', BACKUP_KEEP_HOURLY if hourly is None else hourly),
+                       ('%Y%m%d', BACKUP_KEEP_DAILY if daily is None else daily),
+                       ('%G%V', BACKUP_KEEP_WEEKLY if weekly is None else weekly)):
+        buckets = set()
+        for snapshot_id in reversed(ids):
+            bucket = snapshot_time(snapshot_id).strftime(fmt)
+            if bucket in buckets:
+                continue
+            if len(buckets) >= count:
+                break
+            buckets.add(bucket)
+            keep.add(snapshot_id)
+    return keep
+
+class BackupStore:
+    """Kontent-manzilli backup ombori"""
+
+    def __init__(self, root=None):
+        self.root = root or BACKUP_DIR
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.snapshots_dir = os.path.join(self.root, 'snapshots')
+        self.index_file = os.path.join(self.root, 'index.json')
+        self.stats = {'files': 0, 'read': 0, 'objects_written': 0, 'bytes_written': 0, 'deduplicated': 0,
+                      'removed': 0}
+
+    # Obyektlar
+    def _object_path(self, digest):
+        """Mavjud obyekt yo'li (kengaytmasi bilan) yoki None"""
+        for extension in ('zst', 'gz'):
+            path = os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, content):
+        """Baytlarni saqlash (mavjud bo'lsa yozilmaydi), xeshini qaytaradi"""
+        digest = hashlib.sha256(content).hexdigest()
+        if self._object_path(digest) is not None:
+            self.stats['deduplicated'] += 1
+            return digest
+        extension, packed = compress(content)
+        path = os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(packed)
+        os.replace(tmp_path, path)
+        self.stats['objects_written'] += 1
+        self.stats['bytes_written'] += len(packed)
+        return digest
+
+    def get(self, digest):
+        path = self._object_path(digest)
+        if path is None:
+            raise FileNotFoundError(f"Backup obyekti topilmadi: {digest}")
+        with open(path, 'rb') as f:
+            return decompress(path.rsplit('.', 1)[-1], f.read())
+
+    def _put_file(self, path, name):
+        """Faylni saqlash: {'hash', 'size', 'blobs'} - products.json rasmlari alohida"""
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.stats['read'] += 1
+        blobs = []
+        if name == 'products.json' and b'data:image' in content:
+            try:
+                products = json.loads(content)
+                for product in products:
+                    if is_data_uri(product.get('image')):
+                        digest = self.put(product['image'].encode('utf-8'))
+                        product['image'] = IMAGE_MARKER + digest
+                        blobs.append(digest)
+                content = json.dumps(products, ensure_ascii=False, indent=2).encode('utf-8')
+            except (ValueError, AttributeError, TypeError) as e:
+                logger.error(f"products.json rasmlarini ajratishda xatolik: {e}")
+                blobs = []
+        return {'hash': self.put(content), 'size': len(content), 'blobs': sorted(set(blobs))}
+
+    def _restore_content(self, name, content):
+        """products.json ga alohida saqlangan rasmlarni qaytarish"""
+        if name != 'products.json' or IMAGE_MARKER.encode() not in content:
+            return content
+        products = json.loads(content)
+        for product in products:
+            image = product.get('image')
+            if isinstance(image, str) and image.startswith(IMAGE_MARKER):
+                product['image'] = self.get(image[len(IMAGE_MARKER):]).decode('utf-8')
+        return json.dumps(products, ensure_ascii=False, indent=2).encode('utf-8')
+
+    # Snapshotlar
+    def snapshots(self):
+        """Snapshot nomlari (eskidan yangiga)"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith('.json'))
+
+    def manifest(self, snapshot_id):
+        with open(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_index(self):
+        """Imzo keshi: {'latest': oxirgi snapshot, 'files': {kalit: imzo, xesh, ...}}"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'latest': None, 'files': {}}
+
+    def create(self, sources, files=BACKUP_FILES):
+        """Snapshot yaratish: sources - [(nom, papka), ...]
+
+        Qaytaradi: snapshot nomi yoki None (oxirgi snapshotdan keyin o'zgarish yo'q).
+        """
+        index = self._load_index()
+        cache = index['files']
+        dirty = False
+        entries = {}
+        for side, data_dir in sources:
+            for name in list_files(data_dir, files):
+                path = os.path.join(data_dir, name)
+                key = f"{side}/{name}"
+                signature = list(file_signature(path) or [])
+                cached = cache.get(key)
+                self.stats['files'] += 1
+                if cached and cached['signature'] == signature and self._object_path(cached['hash']):
+                    entry = {k: cached[k] for k in ('hash', 'size', 'blobs')}
+                else:
+                    entry = self._put_file(path, os.path.basename(name))
+                    cache[key] = dict(entry, signature=signature)
+                    dirty = True
+                entries[key] = entry
+        if len(cache) != len(entries):
+            index['files'] = {key: value for key, value in cache.items() if key in entries}
+            dirty = True
+
+        # Hech bir fayl o'qilmagan bo'lsa oxirgi snapshot bilan bir xil - manifestni o'qish shart emas
+        previous = self.snapshots()
+        if previous and ((index['latest'] == previous[-1] and not dirty) or
+                         self.manifest(previous[-1])['files'] == entries):
+            index['latest'] = previous[-1]
+            if dirty:
+                write_json_atomic(self.index_file, index, indent=None)
+            return None
+
+        snapshot_id = datetime.now().strftime(SNAPSHOT_FORMAT)
+        suffix = 1
+        while snapshot_id in previous:
+            suffix += 1
+            snapshot_id = f"{datetime.now().strftime(SNAPSHOT_FORMAT)}_{suffix}"
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        write_json_atomic(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"),
+                          {'created': datetime.now().isoformat(), 'files': entries}, indent=None)
+        index['latest'] = snapshot_id
+        write_json_atomic(self.index_file, index, indent=None)
+        return snapshot_id
+
+    def restore(self, snapshot_id, side='bot', target=None):
+        """Snapshotdagi bir tomon fayllarini papkaga tiklash, tiklangan fayllar sonini qaytaradi
+
+        Snapshotda yo'q zaxiralanadigan fayllar (masalan keyin paydo bo'lgan
+        orders.journal.jsonl) o'chiriladi - aks holda bot ularni tiklangan
+        orders.json ustiga qayta qo'llaydi.
+
+        Bot to'xtatilgan bo'lishi kerak: ishlayotgan bot jurnalni ochiq ushlab
+        turadi va xotiradagi ro'yxatni keyingi yig'ishda tiklangan fayllar ustiga yozadi.
+        """
+        target = target or f"{side}_data"
+        prefix = f"{side}/"
+        names = [key[len(prefix):] for key in self.manifest(snapshot_id)['files'] if key.startswith(prefix)]
+        for name in list_files(target) + RESTORE_STALE_FILES:
+            path = os.path.join(target, name)
+            if name not in names and os.path.isfile(path):
+                os.remove(path)
+                self.stats['removed'] += 1
+
+        restored = 0
+        for key, entry in self.manifest(snapshot_id)['files'].items():
+            if not key.startswith(prefix):
+                continue
+            name = key[len(prefix):]
+            content = self._restore_content(os.path.basename(name), self.get(entry['hash']))
+            path = os.path.join(target, name)
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            restored += 1
+        return restored
+
+    def prune(self, hourly=None, daily=None, weekly=None):
+        """Saqlash muddatidan o'tgan snapshotlar va ishlatilmagan obyektlarni o'chirish
+
+        Qaytaradi: (o'chirilgan snapshotlar, o'chirilgan obyektlar).
+        """
+        snapshot_ids = self.snapshots()
+        keep = select_retained(snapshot_ids, hourly, daily, weekly)
+        removed = [snapshot_id for snapshot_id in snapshot_ids if snapshot_id not in keep]
+        for snapshot_id in removed:
+            os.remove(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+        if not removed:
+            return 0, 0
+
+        live = set()
+        for snapshot_id in keep:
+            for entry in self.manifest(snapshot_id)['files'].values():
+                live.add(entry['hash'])
+                live.update(entry.get('blobs', []))
+        deleted = 0
+        for prefix in os.listdir(self.objects_dir):
+            directory = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(directory):
+                if name.split('.', 1)[0] not in live:
+                    os.remove(os.path.join(directory, name))
+                    deleted += 1
+        return len(removed), deleted
+
+    def disk_usage(self):
+        """Ombor hajmi (baytlar)"""
+        total = 0
+        for directory, _, names in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+        return total
+
+def main():
+    sources = [('web', 'web_data'), ('bot', 'bot_data')]
+    store = BackupStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == 'create':
+        snapshot_id = store.create(sources)
+        print(f"✅ Snapshot: {snapshot_id}" if snapshot_id else "➖ O'zgarish yo'q, snapshot yaratilmadi")
+        print(f"📁 Fayllar: {store.stats['files']}, o'qilgan: {store.stats['read']}, "
+              f"yangi obyektlar: {store.stats['objects_written']} ({store.stats['bytes_written'] / 1024:.0f} KB)")
+        removed, deleted = store.prune()
+        if removed:
+            print(f"🗑 O'chirildi: {removed} snapshot, {deleted} obyekt")
+    elif command == 'list':
+        for snapshot_id in store.snapshots():
+            files = store.manifest(snapshot_id)['files']
+            print(f"{snapshot_id}: {len(files)} fayl, {sum(e['size'] for e in files.values()) / 1024:.0f} KB")
+        print(f"💾 Ombor hajmi: {store.disk_usage() / 1024:.0f} KB")
+    elif command == 'restore' and len(sys.argv) > 2:
+        # Bot to'xtatilgan bo'lishi kerak (BackupStore.restore)
+        side = sys.argv[3] if len(sys.argv) > 3 else 'bot'
+        target = sys.argv[4] if len(sys.argv) > 4 else None
+        restored = store.restore(sys.argv[2], side, target)
+        print(f"✅ {restored} ta fayl tiklandi, snapshotda yo'q {store.stats['removed']} ta fayl o'chirildi")
+    elif command == 'prune':
+        removed, deleted = store.prune()
+        print(f"🗑 O'chirildi: {removed} snapshot, {deleted} obyekt")
+    else:
+        print("Foydalanish: python backup_store.py create | list | restore <snapshot> [bot|web] [papka] | prune")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,909 @@
+"""
+Ma'lumotlar ombori uchun benchmark
+Sintetik ma'lumotlar bilan bot callback'lari ma'lumot yo'lining tezligini o'lchaydi
+
+Ishlatish:
+    python benchmark.py
+    python benchmark.py --products 1000 10000 --repeat 200
+    python benchmark.py --suite storage --json-out bench.json
+    python benchmark.py --suite storage --compare bench.json   # oldingi versiya bilan solishtirish
+"""
+
+import gc
+import os
+import json
+import time
+import asyncio
+import base64
+import random
+import argparse
+import threading
+import contextlib
+import platform
+import shutil
+import tempfile
+import statistics
+import subprocess
+
+import storage
+from group_commit import GroupCommitWriter
+from image_store import migrate_images
+
+CATEGORY_COUNT = 4
+
+def generate_dataset(data_dir, product_count, order_count=0, image_bytes=2048, seed=42,
+                     category_count=CATEGORY_COUNT):
+    """bot_data/*.json sxemasiga mos sintetik ma'lumotlar yaratish"""
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+
+    categories = [
+        {'id': i, 'name': f"Kategoriya {i}", 'description': f"Kategoriya {i} tavsifi",
+         'icon': '📦', 'createdAt': '2025-10-27T00:00:00.000Z'}
+        for i in range(1, category_count + 1)
+    ]
+
+    image = ''
+    if image_bytes:
+        image = 'data:image/webp;base64,' + base64.b64encode(rng.randbytes(image_bytes)).decode('ascii')
+
+    products = []
+    for i in range(1, product_count + 1):
+        products.append({
+            'name': f"Mahsulot {i}",
+            'categoryId': rng.randint(1, category_count),
+            'price': rng.randint(1, 500) * 1000,
+            'quantity': rng.randint(0, 50),
+            'description': f"Mahsulot {i} tavsifi",
+            'image': image,
+            'id': 1761500000000 + i,
+            'createdAt': '2025-10-27T00:00:00.000Z'
+        })
+
+    orders = []
+    for i in range(1, order_count + 1):
+        product = rng.choice(products) if products else {'id': 0}
+        orders.append({
+            'id': 1761600000000 + i,
+            'productId': product['id'],
+            'userName': f"Foydalanuvchi {i % 500}",
+            'telegramId': 100000 + i % 500,
+            'reason': 'Ish uchun',
+            'createdAt': '2025-10-28T10:00:00',
+            'status': rng.choice(['pending', 'completed', 'cancelled'])
+        })
+
+    files = {
+        'products.json': products,
+        'categories.json': categories,
+        'orders.json': orders,
+        'settings.json': {}
+    }
+    for filename, data in files.items():
+        with open(os.path.join(data_dir, filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    return {name: os.path.join(data_dir, name) for name in files}
+
+def category_callback(paths, category_id):
+    """show_category_products dagi ma'lumot yo'li"""
+    products = storage.load_data(paths['products.json'], [])
+    categories = storage.load_data(paths['categories.json'], [])
+    category = next((cat for cat in categories if cat['id'] == category_id), None)
+    return [p for p in products if p.get('categoryId') == category['id'] and p.get('quantity', 0) > 0]
+
+def measure(func, repeat):
+    """Funksiyani repeat marta chaqirib, millisekundlarda natija qaytarish"""
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': statistics.fmean(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p95_ms': timings[int(len(timings) * 0.95) - 1]
+    }
+
+def bench_cache(product_counts, repeat):
+    """Callback kechikishi: keshsiz va kesh bilan"""
+    results = []
+    for count in product_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = generate_dataset(tmp, count)
+            run = lambda i: category_callback(paths, i % CATEGORY_COUNT + 1)
+
+            for enabled in (False, True):
+                storage.CACHE_ENABLED = enabled
+                storage.clear_cache()
+                stats = measure(run, repeat)
+                stats.update({'products': count, 'cache': enabled, **storage.cache_stats()})
+                results.append(stats)
+    storage.CACHE_ENABLED = True
+    return results
+
+def make_order(i, product_id):
+    """add_order yaratadigan buyurtma"""
+    return {
+        'id': int(time.time() * 1000),
+        'productId': product_id,
+        'userName': f"Foydalanuvchi {i}",
+        'telegramId': 200000 + i,
+        'reason': 'Benchmark',
+        'createdAt': '2025-10-28T10:00:00',
+        'status': 'pending'
+    }
+
+def bench_orders(user_counts, product_count=1000, order_count=5000, backend_name='json'):
+    """Buyurtmalar/soniya: har bir buyurtma alohida yozilishi va guruhli yozuv"""
+    results = []
+    for users in user_counts:
+        for mode in ('direct', 'group'):
+            with tempfile.TemporaryDirectory() as tmp:
+                generate_dataset(tmp, product_count, order_count, image_bytes=0)
+                storage.clear_cache()
+                backend = storage.get_backend(tmp, backend_name)
+                product_ids = [p['id'] for p in backend.load('products', [])]
+                writer = GroupCommitWriter(backend)
+
+                async def user(i):
+                    order = make_order(i, product_ids[i % len(product_ids)])
+                    if mode == 'group':
+                        await writer.submit(order)
+                    else:
+                        backend.create_order(order)
+
+                async def run():
+                    await asyncio.gather(*(user(i) for i in range(users)))
+
+                start = time.perf_counter()
+                asyncio.run(run())
+                elapsed = time.perf_counter() - start
+                saved = len(backend.load('orders', [])) - order_count
+                backend.close()
+                results.append({'users': users, 'mode': mode, 'seconds': elapsed,
+                                'orders_per_sec': users / elapsed, 'saved': saved,
+                                'batches': writer.stats['batches']})
+    return results
+
+def bench_loop_lag(order_counts, saves=5):
+    """Katta orders.json saqlanayotganda event loop kechikishi: loop ichida va thread pool'da"""
+    results = []
+    for count in order_counts:
+        for mode in ('loop', 'thread'):
+            with tempfile.TemporaryDirectory() as tmp:
+                generate_dataset(tmp, 100, count, image_bytes=0)
+                storage.clear_cache()
+                backend = storage.JsonBackend(tmp, journal=False)
+                storage_io = storage.AsyncStorage(backend)
+                orders = backend.load('orders', [])
+                lags = []
+
+                async def ticker(stop, interval=0.001):
+                    # Har tikning kechikishi - loop boshqa update'larni shuncha kutadi
+                    loop = asyncio.get_running_loop()
+                    while not stop.is_set():
+                        start = loop.time()
+                        await asyncio.sleep(interval)
+                        lags.append((loop.time() - start - interval) * 1000)
+
+                async def run():
+                    stop = asyncio.Event()
+                    task = asyncio.create_task(ticker(stop))
+                    await asyncio.sleep(0.01)
+                    for _ in range(saves):
+                        if mode == 'thread':
+                            await storage_io.save('orders', orders)
+                        else:
+                            backend.save('orders', orders)
+                        await asyncio.sleep(0)
+                    stop.set()
+                    await task
+
+                start = time.perf_counter()
+                asyncio.run(run())
+                elapsed = time.perf_counter() - start
+                storage_io.shutdown()
+                lags.sort()
+                results.append({'orders': count, 'mode': mode, 'seconds': elapsed,
+                                'max_lag_ms': lags[-1], 'p95_lag_ms': lags[max(int(len(lags) * 0.95) - 1, 0)]})
+    return results
+
+def storage_repeat(records, repeat):
+    """Katta fayllar uchun takrorlar soni kamaytiriladi"""
+    return max(3, min(repeat, 200000 // records))
+
+def bench_storage(record_counts, repeat, backend_name='json'):
+    """load_data/save_data/add_order: yozuvlar soni va rasm turi bo'yicha
+
+    images: none - rasmsiz, base64 - products.json ichida data URI,
+    ref - image_store ga ko'chirilgan (faqat havola).
+    """
+    results = []
+    for records in record_counts:
+        runs = storage_repeat(records, repeat)
+        for images in ('none', 'base64', 'ref'):
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = generate_dataset(tmp, records, records, image_bytes=0 if images == 'none' else 2048)
+                if images == 'ref':
+                    migrate_images(storage.JsonBackend(tmp, journal=False), tmp)
+                products = storage.load_data(paths['products.json'], [])
+
+                def cold(path):
+                    def run(i):
+                        storage.clear_cache()
+                        storage.load_data(path, [])
+                    return run
+
+                result = {
+                    'records': records,
+                    'images': images,
+                    'products_bytes': os.path.getsize(paths['products.json']),
+                    'products_compact_bytes': len(json.dumps(products, ensure_ascii=False,
+                                                             separators=(',', ':')).encode('utf-8')),
+                    'orders_bytes': os.path.getsize(paths['orders.json']),
+                    'get_products_cold': measure(cold(paths['products.json']), runs),
+                    'get_products_warm': measure(lambda i: storage.load_data(paths['products.json'], []), runs),
+                    'get_orders_cold': measure(cold(paths['orders.json']), runs),
+                    'get_orders_warm': measure(lambda i: storage.load_data(paths['orders.json'], []), runs),
+                    'save_products': measure(lambda i: storage.save_data(paths['products.json'], products), runs)
+                }
+
+                storage.clear_cache()
+                backend = storage.get_backend(tmp, backend_name)
+                product_ids = [p['id'] for p in backend.load('products', [])]
+                result['add_order'] = measure(
+                    lambda i: backend.create_order(make_order(i, product_ids[i % len(product_ids)])), runs
+                )
+                backend.close()
+                results.append(result)
+    return results
+
+STORAGE_METRICS = ['get_products_cold', 'get_products_warm', 'get_orders_cold', 'get_orders_warm',
+                   'save_products', 'add_order']
+
+def print_storage_table(results, previous=None):
+    """Ombor benchmarki jadvali (p50 ms), previous berilsa o'zgarish foizi bilan"""
+    before = {}
+    for r in (previous or {}).get('results', []):
+        before[(r['records'], r['images'])] = r
+
+    print(f"{'records':>8} {'images':>7} {'products KB':>12} {'compact KB':>11} {'orders KB':>10} "
+          + ' '.join(f"{name:>17}" for name in STORAGE_METRICS))
+    for r in results:
+        cells = []
+        old = before.get((r['records'], r['images']))
+        for name in STORAGE_METRICS:
+            cell = f"{r[name]['p50_ms']:.3f}"
+            if old is not None and old.get(name, {}).get('p50_ms'):
+                cell += f" ({(r[name]['p50_ms'] / old[name]['p50_ms'] - 1) * 100:+.0f}%)"
+            cells.append(f"{cell:>17}")
+        print(f"{r['records']:>8} {r['images']:>7} {r['products_bytes'] / 1024:>12.0f} "
+              f"{r['products_compact_bytes'] / 1024:>11.0f} {r['orders_bytes'] / 1024:>10.0f} " + ' '.join(cells))
+
+def git_revision():
+    """Joriy git commit (hisobotlarni solishtirish uchun)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def save_report(path, results):
+    """Natijalarni JSON hisobot sifatida yozish"""
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def process_io():
+    """Jarayonning o'qigan/yozgan baytlari (Linux /proc/self/io)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+def bench_sync_idle(seconds, product_count=1000, order_count=5000):
+    """sync_data.py: eski 10 soniyalik to'liq nusxalash va kuzatish rejimi - o'zgarishsiz tizimda"""
+    import sync_data
+
+    results = []
+    for mode in ('loop', 'watch'):
+        with tempfile.TemporaryDirectory() as tmp:
+            sync_data.WEB_DATA_DIR = os.path.join(tmp, 'web_data')
+            sync_data.BOT_DATA_DIR = os.path.join(tmp, 'bot_data')
+            sync_data.SYNC_STATE_FILE = os.path.join(tmp, '.sync_state.json')
+            sync_data.SYNC_BASE_DIR = os.path.join(tmp, '.sync_base')
+            generate_dataset(sync_data.WEB_DATA_DIR, product_count, order_count, image_bytes=0)
+            with contextlib.redirect_stdout(open(os.devnull, 'w')):
+                # Ikkala rejim ham bir xil boshlang'ich holatdan: nusxalar mos, holat yozilgan
+                sync_data.sync_web_to_bot()
+                sync_data.save_sync_state({})
+                stop = threading.Event()
+                watcher = threading.Thread(target=sync_data.watch_sync, args=(stop,))
+                watcher.start()
+                time.sleep(0.5)
+                stop.set()
+                watcher.join()
+
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                read_start, write_start = process_io()
+                if mode == 'loop':
+                    deadline = time.monotonic() + seconds
+                    while time.monotonic() < deadline:
+                        sync_data.sync_web_to_bot()
+                        sync_data.sync_bot_to_web()
+                        time.sleep(min(10, max(deadline - time.monotonic(), 0)))
+                else:
+                    stop = threading.Event()
+                    watcher = threading.Thread(target=sync_data.watch_sync, args=(stop,))
+                    watcher.start()
+                    time.sleep(seconds)
+                    stop.set()
+                    watcher.join()
+                read_end, write_end = process_io()
+                cpu = time.process_time() - cpu_start
+                wall = time.perf_counter() - wall_start
+            results.append({'mode': mode, 'seconds': wall, 'cpu_ms': cpu * 1000,
+                            'cpu_percent': cpu * 100 / wall,
+                            'read_kb': (read_end - read_start) / 1024,
+                            'written_kb': (write_end - write_start) / 1024})
+    return results
+
+def bench_merge(record_counts, change_percent=1):
+    """sync_data.merge_records: N ta buyurtma, har ikki tomonda change_percent% o'zgarish"""
+    import copy
+    import sync_data
+
+    results = []
+    for records in record_counts:
+        base = [dict(make_order(i, 1), id=i) for i in range(records)]
+        web, bot = copy.deepcopy(base), copy.deepcopy(base)
+        step = max(1, 100 // change_percent)
+        for i in range(0, records, step):
+            web[i]['status'] = 'completed'
+            bot[(i + step // 2) % records]['reason'] = 'Bot'
+        bot.extend(dict(make_order(i, 1), id=records + i) for i in range(records // step))
+
+        runs = storage_repeat(records, 50)
+        start = time.perf_counter()
+        for _ in range(runs):
+            merged, conflicts = sync_data.merge_records(base, web, bot)
+        elapsed = (time.perf_counter() - start) / runs
+        results.append({'records': records, 'merged': len(merged), 'conflicts': len(conflicts),
+                        'ms': elapsed * 1000, 'us_per_record': elapsed * 1e6 / records})
+    return results
+
+def print_merge_table(results):
+    """merge_records natijalari"""
+    print(f"{'records':>8} {'merged':>8} {'conflicts':>10} {'ms':>9} {'us/record':>10}")
+    for r in results:
+        print(f"{r['records']:>8} {r['merged']:>8} {r['conflicts']:>10} {r['ms']:>9.2f} {r['us_per_record']:>10.3f}")
+
+def http_get(port, path, headers=None):
+    """(status, sarlavhalar, sim orqali o'tgan baytlar, tana)"""
+    import http.client
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    header_bytes = len(f"HTTP/1.1 {response.status} {response.reason}\r\n") + \
+        sum(len(f"{name}: {value}\r\n") for name, value in response.getheaders()) + 2
+    return response.status, dict(response.getheaders()), header_bytes + len(body), body
+
+def bench_api(product_count=1000, order_count=20000, polls=10):
+    """data_api: GitHub'dagidek to'liq yuklash va ETag/304 + delta"""
+    import gzip
+    import data_api
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_dataset(tmp, product_count, order_count, image_bytes=0)
+        storage.clear_cache()
+        backend = storage.get_backend(tmp, 'json')
+        server = data_api.start_server(backend, tmp, port=18081)
+        port = server.server_address[1]
+        names = ('products', 'categories', 'orders')
+
+        def poll(label, func):
+            start = time.perf_counter()
+            total = sum(func() for _ in range(polls))
+            results.append({'mode': label, 'bytes_per_poll': total / polls,
+                            'ms_per_poll': (time.perf_counter() - start) * 1000 / polls})
+
+        # Eski: har safar uchala fayl to'liq (siqilmagan)
+        poll('full', lambda: sum(http_get(port, f'/api/{name}')[2] for name in names))
+        poll('full gzip', lambda: sum(http_get(port, f'/api/{name}', {'Accept-Encoding': 'gzip'})[2] for name in names))
+
+        etags = {name: http_get(port, f'/api/{name}', {'Accept-Encoding': 'gzip'})[1]['ETag'] for name in names}
+        poll('etag 304', lambda: sum(http_get(port, f'/api/{name}', {'Accept-Encoding': 'gzip', 'If-None-Match': etags[name]})[2]
+                                     for name in names))
+
+        version = json.loads(http_get(port, '/api/changes?since=')[3])['version']
+        poll('changes 304', lambda: http_get(port, f'/api/changes?since={version}', {'Accept-Encoding': 'gzip'})[2])
+
+        # Bitta yangi buyurtma -> delta
+        product = next(p for p in backend.load('products', []) if p.get('quantity', 0) > 0)
+        backend.create_orders([dict(make_order(0, product['id']), id=1)])
+        status, _, size, body = http_get(port, f'/api/changes?since={version}', {'Accept-Encoding': 'gzip'})
+        delta = json.loads(gzip.decompress(body))
+        results.append({'mode': '1 order delta', 'bytes_per_poll': size, 'ms_per_poll': 0.0,
+                        'detail': ', '.join(f"{c['name']}:{c['op']}:{len(c.get('records', []))}" for c in delta['changes'])})
+
+        server.shutdown()
+        server.server_close()
+        backend.close()
+    return results
+
+def print_api_table(results):
+    """data_api natijalari"""
+    print(f"{'mode':>14} {'bytes/poll':>11} {'ms/poll':>8}")
+    for r in results:
+        print(f"{r['mode']:>14} {r['bytes_per_poll']:>11.0f} {r['ms_per_poll']:>8.2f} {r.get('detail', '')}")
+
+def process_status():
+    """(RSS KB, iplar soni) - Linux /proc/self/status"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f.read().splitlines() if ':' in line)
+        return int(fields['VmRSS'].split()[0]), int(fields['Threads'])
+    except (OSError, KeyError, ValueError):
+        return 0, threading.active_count()
+
+def bench_feed(subscriber_counts, events=20, idle_seconds=5):
+    """data_api oqimi: N ta bo'sh SSE obunachi narxi va buyurtmadan hammasiga yetib borish vaqti"""
+    import socket
+    import selectors
+    import data_api
+
+    results = []
+    for count in subscriber_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, 1000, 1000, image_bytes=0)
+            storage.clear_cache()
+            backend = storage.get_backend(tmp, 'json')
+            server = data_api.start_server(backend, tmp, port=18082)
+            port = server.server_address[1]
+            version = json.loads(http_get(port, '/api/changes?since=')[3])['version']
+            gc.collect()
+            rss_before, threads_before = process_status()
+
+            selector = selectors.DefaultSelector()
+            clients = []
+            for _ in range(count):
+                sock = socket.create_connection(('127.0.0.1', port))
+                sock.sendall(f"GET /api/feed?since={version} HTTP/1.1\r\nHost: x\r\n\r\n".encode('ascii'))
+                clients.append(sock)
+
+            def receive(marker, timeout=10):
+                """Har bir ulanishga marker kelguncha - oxirgisining kelish vaqti"""
+                pending, buffers = set(clients), {sock: b'' for sock in clients}
+                for sock in clients:
+                    selector.register(sock, selectors.EVENT_READ)
+                deadline = time.perf_counter() + timeout
+                while pending and time.perf_counter() < deadline:
+                    for key, _ in selector.select(0.5):
+                        buffers[key.fileobj] += key.fileobj.recv(65536)
+                        if marker in buffers[key.fileobj]:
+                            pending.discard(key.fileobj)
+                            selector.unregister(key.fileobj)
+                for sock in pending:
+                    selector.unregister(sock)
+                return time.perf_counter(), len(pending)
+
+            receive(b'retry:')
+            gc.collect()
+            rss_after, threads_after = process_status()
+
+            # Bo'sh turish: obunachilar kutmoqda, hech narsa o'zgarmaydi
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            time.sleep(idle_seconds)
+            idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start) * 100
+
+            product = next(p for p in backend.load('products', []) if p.get('quantity', 0) > 0)
+            latencies, saves, missed = [], [], 0
+            for i in range(events):
+                start = time.perf_counter()
+                backend.create_orders([dict(make_order(0, product['id']), id=10_000_000 + i)])
+                saved = time.perf_counter()
+                end, lost = receive(b'event: change')
+                saves.append((saved - start) * 1000)
+                latencies.append((end - start) * 1000)
+                missed += lost
+
+            results.append({'subscribers': count, 'threads': threads_after - threads_before,
+                            'rss_kb_per_sub': (rss_after - rss_before) / count, 'idle_cpu_pct': idle_cpu,
+                            'save_p50_ms': statistics.median(saves), 'fanout_p50_ms': statistics.median(latencies), 'fanout_max_ms': max(latencies),
+                            'missed': missed, 'pushed': server.api.stats['pushed']})
+
+            server.api.close()
+            for sock in clients:
+                sock.close()
+            selector.close()
+            server.shutdown()
+            server.server_close()
+            backend.close()
+    return results
+
+def print_feed_table(results):
+    """data_api oqimi natijalari"""
+    print(f"{'subs':>6} {'threads':>8} {'RSS KB/sub':>11} {'idle CPU %':>11} {'save p50':>9} {'fan-out p50':>12} "
+          f"{'max ms':>8} {'missed':>7}")
+    for r in results:
+        print(f"{r['subscribers']:>6} {r['threads']:>8} {r['rss_kb_per_sub']:>11.1f} {r['idle_cpu_pct']:>11.2f} "
+              f"{r['save_p50_ms']:>9.2f} {r['fanout_p50_ms']:>12.2f} {r['fanout_max_ms']:>8.2f} {r['missed']:>7}")
+
+def bench_publish(product_count=1000, order_count=20000, image_bytes=2048):
+    """data_publish: hozirgi fayllar (indent=2, ichki rasmlar) va xeshli, siqilgan artefaktlar"""
+    import gzip
+    from data_publish import Publisher, MANIFEST_FILE, brotli
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'bot_data')
+        generate_dataset(source, product_count, order_count, image_bytes=0)
+        rng = random.Random(7)
+        products = storage.load_data(os.path.join(source, 'products.json'), [])
+        for product in products:
+            product['image'] = 'data:image/webp;base64,' + base64.b64encode(rng.randbytes(image_bytes)).decode('ascii')
+        storage.save_data(os.path.join(source, 'products.json'), products)
+
+        publisher = Publisher(source, os.path.join(tmp, 'publish'), os.path.join(tmp, 'state.json'))
+        start = time.perf_counter()
+        publisher.publish()
+        first_ms = (time.perf_counter() - start) * 1000
+        manifest_path = os.path.join(publisher.target_dir, MANIFEST_FILE)
+        files = publisher.manifest()['files']
+        for name, entry in files.items():
+            with open(os.path.join(source, f"{name}.json"), 'rb') as f:
+                current = f.read()
+            results.append({'file': name, 'current': len(current),
+                            'current_gz': len(gzip.compress(current, compresslevel=6, mtime=0)),
+                            'minified': entry['bytes'], 'gz': entry['gz'], 'br': entry.get('br')})
+
+        # Bitta yangi buyurtmadan keyin qayta nashr
+        orders = storage.load_data(os.path.join(source, 'orders.json'), [])
+        orders.append(dict(orders[0], id=1))
+        storage.save_data(os.path.join(source, 'orders.json'), orders)
+        start = time.perf_counter()
+        publisher.publish()
+        update_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        publisher.publish()
+        idle_ms = (time.perf_counter() - start) * 1000
+
+        manifest_bytes = os.path.getsize(manifest_path)
+        manifest_gz = len(gzip.compress(open(manifest_path, 'rb').read(), mtime=0))
+        current_gz = sum(r['current_gz'] for r in results)
+        best = 'br' if brotli is not None else 'gz'
+        transfer = {
+            "hozirgi: 3 fayl (gzip)": current_gz,
+            "nashr: birinchi yuklash": manifest_gz + sum(r[best] for r in results),
+            "nashr: o'zgarishsiz": manifest_gz,
+            "nashr: 1 yangi buyurtma": manifest_gz + publisher.manifest()['files']['orders'][best]
+        }
+    return {'files': results, 'manifest': manifest_bytes, 'transfer': transfer,
+            'publish_ms': {'first': first_ms, '1 order': update_ms, 'unchanged': idle_ms}}
+
+def print_publish_table(results):
+    """data_publish natijalari (KB)"""
+    print(f"{'file':>11} {'current':>9} {'curr gz':>8} {'minified':>9} {'gz':>7} {'br':>7}")
+    for r in results['files']:
+        br = f"{r['br'] / 1024:>7.1f}" if r['br'] else f"{'-':>7}"
+        print(f"{r['file']:>11} {r['current'] / 1024:>9.1f} {r['current_gz'] / 1024:>8.1f} "
+              f"{r['minified'] / 1024:>9.1f} {r['gz'] / 1024:>7.1f} {br}")
+    print(f"\nmanifest.json: {results['manifest']} bytes")
+    for label, size in results['transfer'].items():
+        print(f"  {label:<28} {size / 1024:>9.1f} KB")
+    print("  publish: " + ', '.join(f"{label} {ms:.1f} ms" for label, ms in results['publish_ms'].items()))
+
+# Qidiruv benchmarki uchun so'zlar (lotin va kirill aralash)
+SEARCH_WORDS = ['printer', 'kompyuter', 'sichqoncha', "o'yinchoq", 'stol', 'stul', 'qog‘oz', 'ruchka',
+                'daftar', 'monitor', 'kabel', 'zaryadlovchi', 'telefon', 'quloqchin', 'lampa', 'kitob',
+                'ko‘ylak', 'shim', 'choynak', 'piyola', 'гилам', 'дафтар', 'қалам', 'ўчирғич']
+
+def bench_search(counts, queries=200):
+    """search.py: indeks qurish, so'rov kechikishi va bitta mahsulot o'zgarishi (qayta indekslash)"""
+    from search import SearchIndex
+
+    results = []
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, count, 0, image_bytes=0)
+            rng = random.Random(3)
+            # Brend/model so'zlari: bo'g'inlardan 3000 ta
+            syllables = ['ka', 'ro', 'mi', 'ta', 'ne', 'lo', 'vi', 'su', 'ga', 'de', 'zo', 'pa', 'xi', 'bu']
+            brands = sorted({''.join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(4000)})[:3000]
+            path = os.path.join(tmp, 'products.json')
+            products = storage.load_data(path, [])
+            for product in products:
+                product['name'] = f"{rng.choice(SEARCH_WORDS).capitalize()} {rng.choice(brands)} {rng.randint(1, count // 10 + 1)}-model"
+                product['description'] = f"{rng.choice(brands)} {rng.choice(SEARCH_WORDS)} {product['id']}"
+            storage.save_data(path, products)
+            storage.clear_cache()
+            backend = storage.get_backend(tmp, 'json')
+            search = SearchIndex(backend)
+
+            start = time.perf_counter()
+            search.refresh()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            row = {'products': count, 'tokens': len(search.postings), 'build_ms': build_ms}
+            brand = products[0]['name'].split()[1]
+            cases = {'rare': f"{count // 20}-model", 'brand': brand, 'prefix': brand[:3],
+                     'two words': f"printer {brand}", 'cyrillic': 'принтер', 'common': 'kitob'}
+            for label, query in cases.items():
+                timings = []
+                for _ in range(queries):
+                    # Kesh tozalanadi - har bir so'rov indeksdan hisoblanadi
+                    search._cache.clear()
+                    start = time.perf_counter()
+                    _, total = search.search(query, 0, 10)
+                    timings.append((time.perf_counter() - start) * 1000)
+                row[label] = (statistics.median(timings), total)
+            start = time.perf_counter()
+            for _ in range(queries):
+                search.search(cases['common'], 10, 10)
+            row['cached_ms'] = (time.perf_counter() - start) * 1000 / queries
+
+            # Bitta mahsulot nomi o'zgardi - faqat u qayta indekslanadi
+            products = backend.load('products', [])
+            products[0] = dict(products[0], name='Yangi printer')
+            backend.save('products', products)
+            reindexed = search.stats['reindexed']
+            start = time.perf_counter()
+            search.refresh()
+            row['update_ms'] = (time.perf_counter() - start) * 1000
+            row['reindexed'] = search.stats['reindexed'] - reindexed
+            backend.close()
+            results.append(row)
+    return results
+
+def print_search_table(results):
+    """search.py natijalari - so'rovlar: p50 ms (natijalar soni)"""
+    labels = ['rare', 'brand', 'prefix', 'two words', 'cyrillic', 'common']
+    print(f"{'products':>9} {'tokens':>7} {'build ms':>9} " + ' '.join(f"{label:>15}" for label in labels)
+          + f" {'cached':>7} {'update ms':>10} {'reindexed':>9}")
+    for r in results:
+        cells = ' '.join(f"{f'{r[label][0]:.3f} ({r[label][1]})':>15}" for label in labels)
+        print(f"{r['products']:>9} {r['tokens']:>7} {r['build_ms']:>9.0f} {cells} {r['cached_ms']:>7.4f} "
+              f"{r['update_ms']:>10.1f} {r['reindexed']:>9}")
+
+def scan_report(orders, products_by_id, start, end, category_id=None):
+    """Yig'indilarsiz hisobot - har so'rovda barcha buyurtmalar ko'rib chiqiladi"""
+    from collections import Counter
+    statuses, top_products, users = Counter(), Counter(), Counter()
+    for order in orders:
+        day = order.get('createdAt', '')[:10]
+        if not start <= day <= end:
+            continue
+        product = products_by_id.get(order.get('productId'))
+        if category_id is not None and (product or {}).get('categoryId') != category_id:
+            continue
+        statuses[order.get('status')] += 1
+        top_products[order.get('productId')] += 1
+        users[order.get('telegramId')] += 1
+    return statuses, top_products.most_common(5), users.most_common(5)
+
+def bench_report(order_counts, product_count=1000, queries=50):
+    """reports.py: to'liq skanerlash va kunlik yig'indilar (buyurtmalar 2 yilga tarqalgan)"""
+    from reports import OrderRollups
+
+    results = []
+    for count in order_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = generate_dataset(tmp, product_count, count, image_bytes=0)
+            orders = storage.load_data(paths['orders.json'], [])
+            first_day = time.mktime((2024, 1, 1, 12, 0, 0, 0, 0, -1))
+            for i, order in enumerate(orders):
+                order['createdAt'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(first_day + i * 730 * 86400 // count))
+            storage.save_data(paths['orders.json'], orders)
+            storage.clear_cache()
+            backend = storage.get_backend(tmp, 'json')
+            products_by_id = {product['id']: product for product in backend.load('products', [])}
+            rollups = OrderRollups(backend)
+
+            start = time.perf_counter()
+            rollups.refresh()
+            row = {'orders': count, 'days': len(rollups.days), 'rebuild_ms': (time.perf_counter() - start) * 1000}
+
+            orders = backend.load('orders', [])
+            ranges = {'7 kun': ('2025-12-25', '2025-12-31', None), '365 kun': ('2025-01-01', '2025-12-31', None),
+                      '30 kun, kategoriya': ('2025-12-01', '2025-12-30', 1)}
+            for label, (first, last, category_id) in ranges.items():
+                scan = measure(lambda i: scan_report(orders, products_by_id, first, last, category_id), max(queries // 10, 3))
+                rollup = measure(lambda i: rollups.report(first, last, category_id), queries)
+                row[label] = (scan['p50_ms'], rollup['p50_ms'])
+
+            # Yangi buyurtma va status o'zgarishi - faqat bitta kun yangilanadi
+            product_id = next(product['id'] for product in products_by_id.values() if product.get('quantity', 0) > 0)
+            order = dict(make_order(0, product_id), createdAt='2025-12-31T18:00:00')
+            start = time.perf_counter()
+            backend.create_orders([order])
+            rollups.report('2025-12-25', '2025-12-31')
+            row['order_ms'] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            backend.update_order_status(order['id'], 'completed')
+            rollups.report('2025-12-25', '2025-12-31')
+            row['status_ms'] = (time.perf_counter() - start) * 1000
+            row['rebuilds'] = rollups.stats['rebuilds']
+            backend.close()
+            results.append(row)
+    return results
+
+def print_report_table(results):
+    """reports.py natijalari - so'rovlar: skanerlash p50 ms / yig'indilar p50 ms"""
+    labels = ['7 kun', '365 kun', '30 kun, kategoriya']
+    print(f"{'orders':>8} {'days':>5} {'rebuild ms':>11} " + ' '.join(f"{label:>22}" for label in labels)
+          + f" {'order ms':>9} {'status ms':>10} {'rebuilds':>8}")
+    for r in results:
+        cells = ' '.join(f"{f'{r[label][0]:.2f} / {r[label][1]:.3f}':>22}" for label in labels)
+        print(f"{r['orders']:>8} {r['days']:>5} {r['rebuild_ms']:>11.0f} {cells} {r['order_ms']:>9.2f} "
+              f"{r['status_ms']:>10.2f} {r['rebuilds']:>8}")
+
+def bench_backup(product_count=1000, order_count=20000, image_bytes=2048):
+    """backup_store: to'liq nusxa (eski create_backup) va deduplikatsiyali snapshotlar"""
+    from backup_store import BackupStore, list_files
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        web_dir, bot_dir = os.path.join(tmp, 'web_data'), os.path.join(tmp, 'bot_data')
+        generate_dataset(web_dir, product_count, order_count, image_bytes=0)
+        rng = random.Random(7)
+        products = storage.load_data(os.path.join(web_dir, 'products.json'), [])
+        for product in products:
+            product['image'] = 'data:image/webp;base64,' + base64.b64encode(rng.randbytes(image_bytes)).decode('ascii')
+        storage.save_data(os.path.join(web_dir, 'products.json'), products)
+        shutil.copytree(web_dir, bot_dir)
+        migrate_images(storage.JsonBackend(bot_dir, journal=False), bot_dir)
+        sources = [('web', web_dir), ('bot', bot_dir)]
+
+        full_copy = sum(os.path.getsize(os.path.join(d, name)) for _, d in sources
+                        for name in list_files(d) if not name.startswith('images/'))
+
+        def step(label, change=None):
+            if change:
+                change()
+            store = BackupStore(os.path.join(tmp, 'backups'))
+            read_start, write_start = process_io()
+            start = time.perf_counter()
+            snapshot_id = store.create(sources)
+            elapsed = time.perf_counter() - start
+            read_end, write_end = process_io()
+            results.append({'step': label, 'snapshot': bool(snapshot_id), 'ms': elapsed * 1000,
+                            'files_read': store.stats['read'], 'objects': store.stats['objects_written'],
+                            'read_kb': (read_end - read_start) / 1024, 'written_kb': (write_end - write_start) / 1024,
+                            'store_kb': store.disk_usage() / 1024, 'full_copy_kb': full_copy / 1024})
+
+        def new_order():
+            path = os.path.join(bot_dir, 'orders.json')
+            orders = storage.load_data(path, [])
+            orders.append(dict(make_order(0, products[0]['id']), id=1))
+            storage.save_data(path, orders)
+
+        step('first')
+        step('unchanged')
+        step('new order', new_order)
+    return results
+
+def print_backup_table(results):
+    """backup_store natijalari"""
+    full = results[0]['full_copy_kb']
+    print(f"Eski create_backup: har safar {full:.0f} KB to'liq nusxa "
+          f"({full * len(results):.0f} KB {len(results)} ta backup uchun)\n")
+    print(f"{'step':>10} {'snapshot':>9} {'ms':>8} {'files read':>11} {'objects':>8} "
+          f"{'read KB':>9} {'written KB':>11} {'store KB':>9}")
+    for r in results:
+        print(f"{r['step']:>10} {'yes' if r['snapshot'] else 'no':>9} {r['ms']:>8.1f} {r['files_read']:>11} "
+              f"{r['objects']:>8} {r['read_kb']:>9.0f} {r['written_kb']:>11.0f} {r['store_kb']:>9.0f}")
+
+def print_sync_table(results):
+    """sync_data.py natijalari"""
+    print(f"{'mode':>6} {'seconds':>8} {'cpu ms':>9} {'cpu %':>7} {'read KB':>10} {'written KB':>11}")
+    for r in results:
+        print(f"{r['mode']:>6} {r['seconds']:>8.1f} {r['cpu_ms']:>9.1f} {r['cpu_percent']:>7.3f} "
+              f"{r['read_kb']:>10.0f} {r['written_kb']:>11.0f}")
+
+def print_lag_table(results):
+    """Event loop kechikishi natijalari"""
+    print(f"{'orders':>7} {'mode':>7} {'seconds':>9} {'max lag ms':>11} {'p95 lag ms':>11}")
+    for r in results:
+        print(f"{r['orders']:>7} {r['mode']:>7} {r['seconds']:>9.3f} {r['max_lag_ms']:>11.2f} {r['p95_lag_ms']:>11.2f}")
+
+def print_orders_table(results):
+    """Buyurtma yozish natijalari"""
+    print(f"{'users':>6} {'mode':>7} {'seconds':>9} {'orders/s':>10} {'saved':>6} {'batches':>8}")
+    for r in results:
+        print(f"{r['users']:>6} {r['mode']:>7} {r['seconds']:>9.3f} {r['orders_per_sec']:>10.1f} "
+              f"{r['saved']:>6} {r['batches']:>8}")
+
+def print_table(results):
+    """Natijalarni jadval ko'rinishida chiqarish"""
+    print(f"{'products':>9} {'cache':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'hits':>7} {'misses':>7}")
+    for r in results:
+        print(f"{r['products']:>9} {str(r['cache']):>6} {r['mean_ms']:>9.3f} {r['p50_ms']:>9.3f} "
+              f"{r['p95_ms']:>9.3f} {r['hits']:>7} {r['misses']:>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ma'lumotlar ombori benchmarki")
+    parser.add_argument('--products', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--backend', default='json', choices=['json', 'sqlite'])
+    parser.add_argument('--lag-orders', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--records', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--sync-seconds', type=float, default=30)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--suite', nargs='+', default=['cache', 'orders', 'lag', 'storage'],
+                        choices=['cache', 'orders', 'lag', 'storage', 'sync', 'merge', 'backup', 'api', 'feed', 'publish', 'search', 'report'])
+    parser.add_argument('--json-out', help="ombor benchmarki natijalarini JSON faylga yozish")
+    parser.add_argument('--compare', help="oldingi JSON hisobot bilan solishtirish")
+    args = parser.parse_args()
+
+    if 'cache' in args.suite:
+        print("📊 Callback kechikishi (show_category_products ma'lumot yo'li)\n")
+        print_table(bench_cache(args.products, args.repeat))
+
+    if 'orders' in args.suite:
+        print(f"\n📊 Bir vaqtda buyurtma berish ({args.backend}, 5000 ta eski buyurtma)\n")
+        print_orders_table(bench_orders(args.users, backend_name=args.backend))
+
+    if 'lag' in args.suite:
+        print("\n📊 orders.json saqlanayotganda event loop kechikishi\n")
+        print_lag_table(bench_loop_lag(args.lag_orders))
+
+    if 'sync' in args.suite:
+        print(f"\n📊 sync_data.py o'zgarishsiz tizimda ({args.sync_seconds:.0f} s)\n")
+        print_sync_table(bench_sync_idle(args.sync_seconds))
+
+    if 'merge' in args.suite:
+        print("\n📊 Uch tomonlama birlashtirish (yozuvlar id bo'yicha)\n")
+        print_merge_table(bench_merge(args.records))
+
+    if 'api' in args.suite:
+        print("\n📊 Ma'lumotlar API: 1000 mahsulot, 20000 buyurtma\n")
+        print_api_table(bench_api())
+
+    if 'feed' in args.suite:
+        print("\n📊 O'zgarishlar oqimi (SSE): bo'sh obunachilar va yangi buyurtma yetib borishi\n")
+        print_feed_table(bench_feed(args.subscribers))
+
+    if 'publish' in args.suite:
+        print("\n📊 Statik sayt nashri: 1000 mahsulot (har birida 2 KB rasm), 20000 buyurtma\n")
+        print_publish_table(bench_publish())
+
+    if 'search' in args.suite:
+        print("\n📊 Mahsulot qidiruvi (teskari indeks), so'rov p50 ms (natijalar soni)\n")
+        print_search_table(bench_search(args.records))
+
+    if 'report' in args.suite:
+        print("\n📊 Buyurtmalar hisoboti: skanerlash / kunlik yig'indilar, p50 ms\n")
+        print_report_table(bench_report(args.records))
+
+    if 'backup' in args.suite:
+        print("\n📊 Backup: 1000 mahsulot (har birida 2 KB rasm), 20000 buyurtma\n")
+        print_backup_table(bench_backup())
+
+    if 'storage' in args.suite:
+        previous = None
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        print(f"\n📊 Ombor operatsiyalari, p50 ms ({args.backend})\n")
+        results = bench_storage(args.records, args.repeat, args.backend)
+        print_storage_table(results, previous)
+        if args.json_out:
+            save_report(args.json_out, results)
+            print(f"\n💾 Hisobot: {args.json_out}")
+
+if __name__ == '__main__':
+    main()
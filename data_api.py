@@ -0,0 +1,412 @@
+"""
+Web panel uchun ma'lumotlar API (ixtiyoriy, DATA_API_PORT)
+Web panel har 30 soniyada GitHub'dan uchala faylni to'liq yuklab olish
+o'rniga bot jarayonidan so'raydi; hech narsa o'zgarmagan bo'lsa faqat
+sarlavhalar (304) qaytadi.
+
+    GET /api/products | /api/categories | /api/orders
+        Kuchli ETag, If-None-Match -> 304, gzip (Accept-Encoding)
+    GET /api/changes?since=<versiya>[&wait=<soniya>]
+        Versiyadan keyingi o'zgarishlar: yangi/o'zgargan yozuvlar yoki
+        "replace" (ro'yxatni to'liq qayta olish kerak); o'zgarish yo'q bo'lsa 304.
+        wait berilsa (long-poll) o'zgarish bo'lguncha kutadi (son bo'lmasa yoki manfiy - 400)
+    GET /api/feed?since=<versiya>
+        Server-Sent Events: har bir o'zgarish "change" hodisasi (/api/changes
+        javobi bilan bir xil), qayta ulanishda Last-Event-ID dan davom etadi
+    GET /images/<sha256>.<ext>
+        Mahsulot rasmlari (mazmun xeshi bo'yicha - o'zgarmaydi)
+
+O'zgarishlar backend hodisalaridan (buyurtma, status, saqlash) yig'iladi,
+fayl tashqaridan o'zgarsa (sync_data.py) "replace" qo'shiladi. Kutayotgan
+obunachilar bitta Condition'da uxlaydi - bo'sh obunachi CPU sarflamaydi,
+tashqi o'zgarishlar esa obunachi bo'lgandagina DATA_API_POLL_INTERVAL da
+bir marta (faqat stat) tekshiriladi.
+
+    curl -i http://127.0.0.1:8081/api/products
+"""
+
+import os
+import gzip
+import json
+import logging
+import time
+import secrets
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from image_store import IMAGES_DIR, is_image_ref
+
+logger = logging.getLogger(__name__)
+
+DATA_API_HOST = os.getenv('DATA_API_HOST', '127.0.0.1')
+DATA_API_PORT = int(os.getenv('DATA_API_PORT', '0'))
+# Berilsa: Authorization: Bearer <token> yoki ?token=<token>
+DATA_API_TOKEN = os.getenv('DATA_API_TOKEN', '')
+DATA_API_CORS = os.getenv('DATA_API_CORS', '*')
+# Xotirada saqlanadigan o'zgarishlar soni (undan eskisi uchun to'liq qayta yuklash)
+DATA_API_LOG_SIZE = int(os.getenv('DATA_API_LOG_SIZE', '1000'))
+# Oqim: bo'sh ulanishga izoh yuborish oralig'i, long-poll chegarasi, tashqi o'zgarishlarni tekshirish (s)
+DATA_API_HEARTBEAT = float(os.getenv('DATA_API_HEARTBEAT', '25'))
+DATA_API_MAX_WAIT = 60
+DATA_API_POLL_INTERVAL = float(os.getenv('DATA_API_POLL_INTERVAL', '1'))
+# EventSource qayta ulanish kutishi (ms)
+FEED_RETRY_MS = 3000
+
+# Sozlamalar (bot tokeni) va admin ID'lar API orqali berilmaydi
+API_NAMES = ('products', 'categories', 'orders')
+
+class DataApi:
+    """Ma'lumotlar va o'zgarishlar jurnali (HTTP'dan mustaqil)"""
+
+    def __init__(self, backend, data_dir, log_size=None):
+        self.backend = backend
+        self.data_dir = data_dir
+        # Jarayon qayta ishga tushsa versiyalar boshidan boshlanadi - ETag'lar to'qnashmasligi uchun
+        self.boot = secrets.token_hex(4)
+        self.seq = 0
+        self.log = deque(maxlen=log_size or DATA_API_LOG_SIZE)
+        self.known = {}
+        self.stats = {'full': 0, 'not_modified': 0, 'changes': 0, 'resets': 0, 'pushed': 0}
+        self.subscribers = 0
+        self.closed = False
+        self._bodies = {}
+        self._products = (None, {})
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._watcher = None
+        backend.subscribe(self._on_change)
+
+    # O'zgarishlar jurnali
+    def token(self):
+        """Joriy versiya: '<boot>.<seq>'"""
+        return f"{self.boot}.{self.seq}"
+
+    def _record(self, name, op, items=None):
+        self.seq += 1
+        self.log.append((self.seq, name, op, items))
+        self._changed.notify_all()
+
+    def _on_change(self, event, payload):
+        """Backend hodisasi: buyurtmalar yozuv sifatida, mahsulotlar id sifatida (miqdor o'zgaradi)"""
+        with self._lock:
+            if event == 'orders_created':
+                self._record('orders', 'upsert', list(payload))
+                self._record('products', 'upsert', sorted({order.get('productId') for order in payload}, key=str))
+                names = ('orders', 'products')
+            elif event == 'order_status':
+                self._record('orders', 'upsert', [payload])
+                names = ('orders',)
+            elif event == 'saved' and payload in API_NAMES:
+                self._record(payload, 'replace')
+                names = (payload,)
+            else:
+                return
+            for name in names:
+                if name in self.known:
+                    self.known[name] = self.backend.version(name)
+
+    def refresh(self):
+        """Tashqaridan (hodisasiz) o'zgargan ma'lumot - 'replace'"""
+        versions = {}
+        for name in API_NAMES:
+            # load() fayl o'zgarganini aniqlaydi (kerak bo'lsa o'qiydi) - lock'dan tashqarida
+            self.backend.load(name, [])
+            versions[name] = self.backend.version(name)
+        with self._lock:
+            for name, version in versions.items():
+                if name in self.known and self.known[name] != version:
+                    self._record(name, 'replace')
+                self.known[name] = version
+
+    # Obunachilar (SSE va long-poll)
+    def subscribe(self):
+        """Obunachi qo'shish - birinchisi tashqi o'zgarishlar kuzatuvchisini ishga tushiradi"""
+        with self._lock:
+            self.subscribers += 1
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name='data-api-watch', daemon=True)
+                self._watcher.start()
+
+    def unsubscribe(self):
+        with self._lock:
+            self.subscribers -= 1
+
+    def _watch(self):
+        """Obunachilar bor ekan fayllarni vaqti-vaqti bilan tekshirish"""
+        while True:
+            time.sleep(DATA_API_POLL_INTERVAL)
+            with self._lock:
+                if self.subscribers <= 0 or self.closed:
+                    self._watcher = None
+                    return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Ma'lumotlar API kuzatuvchisida xatolik: {e}")
+
+    def wait_for_change(self, since, timeout):
+        """since versiyasidan keyin o'zgarish bo'lguncha kutish - o'zgarish bo'lsa True"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.closed or self.token() != since, timeout)
+
+    def close(self):
+        """Kutayotgan obunachilarni bo'shatish"""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def _product_lookup(self):
+        """Mahsulot id -> yozuv (mahsulotlar versiyasi bo'yicha keshlanadi)"""
+        version = self.backend.version('products')
+        cached_version, by_id = self._products
+        if cached_version != version:
+            by_id = {product.get('id'): product for product in self.backend.load('products', [])}
+            self._products = (version, by_id)
+        return by_id
+
+    def changes(self, since, refresh=True):
+        """since dan keyingi o'zgarishlar - None: o'zgarish yo'q"""
+        if refresh:
+            self.refresh()
+        with self._lock:
+            boot, _, seq = (since or '').partition('.')
+            oldest = self.log[0][0] if self.log else self.seq + 1
+            if boot != self.boot or not seq.isdigit() or int(seq) > self.seq or int(seq) < oldest - 1:
+                self.stats['resets'] += 1
+                return {'version': self.token(), 'reset': True, 'changes': []}
+            seq = int(seq)
+            if seq == self.seq:
+                return None
+
+            replaced, upserts = set(), {}
+            for entry_seq, name, op, items in self.log:
+                if entry_seq <= seq:
+                    continue
+                if op == 'replace':
+                    replaced.add(name)
+                else:
+                    upserts.setdefault(name, []).extend(items)
+
+            changes = [{'name': name, 'op': 'replace'} for name in API_NAMES if name in replaced]
+            for name in API_NAMES:
+                if name in replaced or name not in upserts:
+                    continue
+                if name == 'products':
+                    by_id = self._product_lookup()
+                    records = [by_id[product_id] for product_id in upserts[name] if product_id in by_id]
+                else:
+                    records = upserts[name]
+                latest = {record.get('id'): record for record in records}
+                changes.append({'name': name, 'op': 'upsert', 'records': list(latest.values())})
+            self.stats['changes'] += 1
+            return {'version': self.token(), 'reset': False, 'changes': changes}
+
+    # To'liq ro'yxatlar
+    def snapshot(self, name):
+        """(etag, json baytlari, gzip baytlari) - versiya o'zgarmaguncha bir marta seriyalanadi"""
+        before = self.backend.version(name)
+        data = self.backend.load(name, [])
+        after = self.backend.version(name)
+        cached = self._bodies.get(name)
+        if cached is not None and cached[0] == before == after:
+            return cached[1:]
+
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        # Yuklash paytida versiya o'zgargan bo'lsa eski versiya bilan belgilanadi - keyingi so'rov qayta oladi
+        result = (f'"{self.boot}-{name}-{before}"', body, gzip.compress(body, compresslevel=6, mtime=0))
+        if before == after:
+            self._bodies[name] = (before,) + result
+        return result
+
+class DataApiHandler(BaseHTTPRequestHandler):
+    """GET /api/<nom>, /api/changes, /images/<fayl>"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _authorized(self, query):
+        if not DATA_API_TOKEN:
+            return True
+        header = self.headers.get('Authorization', '')
+        return secrets.compare_digest(header, f"Bearer {DATA_API_TOKEN}") or \
+            secrets.compare_digest(query.get('token', [''])[0], DATA_API_TOKEN)
+
+    def _not_modified(self, etag):
+        """If-None-Match so'rovdagi ETag bilan mos keladimi"""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+    def _send(self, status, body=b'', etag=None, content_type='application/json; charset=utf-8',
+              cache_control='no-cache', encoding=None):
+        self.send_response(status)
+        if DATA_API_CORS:
+            self.send_header('Access-Control-Allow-Origin', DATA_API_CORS)
+            self.send_header('Access-Control-Expose-Headers', 'ETag')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if status != 304:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_data(self, etag, body, gz):
+        """JSON javob: gzip (mijoz qabul qilsa) va If-None-Match"""
+        api = self.server.api
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            etag, body, encoding = etag[:-1] + '-gz"', gz, 'gzip'
+        else:
+            encoding = None
+        if self._not_modified(etag):
+            api.stats['not_modified'] += 1
+            self._send(304, etag=etag)
+            return
+        api.stats['full'] += 1
+        self._send(200, body, etag=etag, encoding=encoding)
+
+    def do_OPTIONS(self):
+        """CORS preflight (If-None-Match va Authorization sarlavhalari uchun)"""
+        self.send_response(204)
+        if DATA_API_CORS:
+            self.send_header('Access-Control-Allow-Origin', DATA_API_CORS)
+            self.send_header('Access-Control-Allow-Methods', 'GET, HEAD, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'If-None-Match, Authorization')
+            self.send_header('Access-Control-Max-Age', '86400')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        api = self.server.api
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if not self._authorized(query):
+            self._send(401, b'{"error":"unauthorized"}')
+            return
+        try:
+            parts = url.path.strip('/').split('/')
+            if len(parts) == 2 and parts[0] == 'api' and parts[1] in API_NAMES:
+                self._send_data(*api.snapshot(parts[1]))
+            elif url.path == '/api/changes':
+                since = query.get('since', [''])[0]
+                try:
+                    wait = float(query.get('wait', ['0'])[0] or 0)
+                except ValueError:
+                    wait = -1
+                if not 0 <= wait < float('inf'):
+                    self._send(400, b'{"error":"invalid wait"}')
+                    return
+                wait = min(wait, DATA_API_MAX_WAIT)
+                result = api.changes(since)
+                if result is None and wait > 0 and self.command != 'HEAD':
+                    # Long-poll: o'zgarish bo'lguncha yoki wait soniya kutish
+                    api.subscribe()
+                    try:
+                        api.wait_for_change(since, wait)
+                    finally:
+                        api.unsubscribe()
+                    result = api.changes(since, refresh=False)
+                etag = f'"{api.token()}"'
+                if result is None:
+                    api.stats['not_modified'] += 1
+                    self._send(304, etag=etag)
+                else:
+                    body = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                    self._send_data(etag, body, gzip.compress(body, compresslevel=6, mtime=0))
+            elif url.path == '/api/feed':
+                self._send_feed(self.headers.get('Last-Event-ID') or query.get('since', [''])[0])
+            elif len(parts) == 2 and parts[0] == IMAGES_DIR and is_image_ref(url.path.lstrip('/')):
+                self._send_image(url.path.lstrip('/'))
+            else:
+                self._send(404, b'{"error":"not found"}')
+        except Exception as e:
+            logger.error(f"Ma'lumotlar API xatoligi {self.path}: {e}")
+            self._send(500, b'{"error":"internal"}')
+
+    # HEAD - faqat sarlavhalar: long-poll kutilmaydi, SSE oqimi ochilmaydi
+    do_HEAD = do_GET
+
+    def _send_feed(self, since):
+        """Server-Sent Events oqimi - ulanish uzilguncha (yoki server yopilguncha)"""
+        api = self.server.api
+        self.send_response(200)
+        if DATA_API_CORS:
+            self.send_header('Access-Control-Allow-Origin', DATA_API_CORS)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.close_connection = True
+        if self.command == 'HEAD':
+            return
+
+        api.subscribe()
+        try:
+            self.wfile.write(f"retry: {FEED_RETRY_MS}\n\n".encode('utf-8'))
+            since = since or api.token()
+            while not api.closed:
+                delta = api.changes(since, refresh=False)
+                if delta is None:
+                    if not api.wait_for_change(since, DATA_API_HEARTBEAT):
+                        # Izoh qatori: uzilgan ulanishni aniqlash va proksilarni uxlatmaslik
+                        self.wfile.write(b": ping\n\n")
+                    continue
+                since = delta['version']
+                data = json.dumps(delta, ensure_ascii=False, separators=(',', ':'))
+                self.wfile.write(f"id: {since}\nevent: change\ndata: {data}\n\n".encode('utf-8'))
+                api.stats['pushed'] += 1
+        except OSError:
+            pass
+        except Exception as e:
+            logger.error(f"Ma'lumotlar API oqimida xatolik: {e}")
+        finally:
+            api.unsubscribe()
+
+    def _send_image(self, ref):
+        """Rasm - nomi mazmun xeshi, shuning uchun ETag = xesh va uzoq keshlash"""
+        etag = f'"{ref.rsplit("/", 1)[-1].split(".")[0]}"'
+        if self._not_modified(etag):
+            self._send(304, etag=etag, cache_control='public, max-age=31536000, immutable')
+            return
+        path = os.path.join(self.server.api.data_dir, ref)
+        if not os.path.exists(path):
+            self._send(404, b'{"error":"not found"}')
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = 'image/jpeg' if ref.endswith('.jpg') else f"image/{ref.rsplit('.', 1)[-1]}"
+        self._send(200, body, etag=etag, content_type=content_type,
+                   cache_control='public, max-age=31536000, immutable')
+
+    def log_message(self, format, *args):
+        pass
+
+class DataApiServer(ThreadingHTTPServer):
+    """Har ulanishga ip; oqim obunachilari bir vaqtda ulanganda navbat to'lmasligi uchun kattaroq backlog"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+def start_server(backend, data_dir, port=None, host=None):
+    """API serverini orqa fon ipida ishga tushirish (port 0 bo'lsa ishga tushmaydi)"""
+    port = DATA_API_PORT if port is None else port
+    if not port:
+        return None
+    try:
+        server = DataApiServer((host or DATA_API_HOST, port), DataApiHandler)
+    except OSError as e:
+        logger.error(f"Ma'lumotlar API serverini ishga tushirishda xatolik: {e}")
+        return None
+    server.api = DataApi(backend, data_dir)
+    server.api.refresh()
+    thread = threading.Thread(target=server.serve_forever, name='data-api-server', daemon=True)
+    thread.start()
+    logger.info(f"🌐 Ma'lumotlar API: http://{server.server_address[0]}:{server.server_address[1]}/api/products")
+    return server
@@ -0,0 +1,198 @@
+"""
+Statik web sayt uchun nashr (publish) artefaktlari
+bot_data fayllari minifikatsiya qilingan, nomida mazmun xeshi bo'lgan
+nusxalar sifatida yoziladi (products.<xesh>.json), yoniga oldindan
+siqilgan .gz (brotli o'rnatilgan bo'lsa .br ham) qo'yiladi. Kichik
+manifest.json har fayl uchun xesh, yozuvlar soni va hajmlarni saqlaydi -
+web panel avval faqat manifestni oladi va xeshi o'zgargan fayllarnigina
+yuklaydi. Xeshli fayllar hech qachon o'zgarmaydi, shuning uchun ularni
+muddatsiz keshlash mumkin.
+
+Rasmlar (base64 yoki bot_data/images dagi) images/<sha256>.<ext> fayllari
+sifatida nashr qilinadi - JSON ichida faqat havola qoladi. settings.json
+(bot tokeni) va admin ID'lar nashr qilinmaydi.
+
+O'zgarmagan manba fayl qayta o'qilmaydi (imzo .publish_state.json da),
+oldingi avlod artefaktlari qoldiriladi (eski manifestni olgan mijoz uchun),
+undan eskilari o'chiriladi.
+
+Ishlatish:
+    python data_publish.py [manba] [papka]      # standart: bot_data web/data
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+
+from storage import file_signature, write_json_atomic
+from image_store import IMAGES_DIR, extract_images, image_path, is_image_ref
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_DIR = os.getenv('PUBLISH_DIR', os.path.join('web', 'data'))
+PUBLISH_STATE_FILE = '.publish_state.json'
+
+# Nashr qilinadigan fayllar (settings.json - yo'q)
+PUBLISH_FILES = ['products.json', 'categories.json', 'orders.json']
+MANIFEST_FILE = 'manifest.json'
+# Fayl nomidagi xesh uzunligi (hex)
+HASH_LENGTH = 16
+
+def minify(data):
+    """Bo'shliqsiz JSON baytlari"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def precompress(content):
+    """Oldindan siqilgan variantlar: kengaytma -> baytlar"""
+    variants = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return variants
+
+def write_bytes(path, content):
+    """Vaqtinchalik fayl orqali yozish (mavjud xeshli fayl qayta yozilmaydi)"""
+    if os.path.exists(path):
+        return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def image_refs(products):
+    """Mahsulotlardagi rasm havolalari"""
+    return {product.get('image') for product in products
+            if isinstance(product, dict) and is_image_ref(product.get('image'))}
+
+class Publisher:
+    """Manba papkadan nashr papkasiga artefaktlar va manifest"""
+
+    def __init__(self, source_dir='bot_data', target_dir=None, state_file=None):
+        self.source_dir = source_dir
+        self.target_dir = target_dir or PUBLISH_DIR
+        self.state_file = state_file or PUBLISH_STATE_FILE
+        self.stats = {'read': 0, 'written': 0, 'images': 0, 'removed': 0}
+
+    def manifest(self):
+        return load_json(os.path.join(self.target_dir, MANIFEST_FILE), {'files': {}})
+
+    def _publish_images(self, products):
+        """Rasmlarni nashr papkasiga: base64 -> fayl, images/ dagilari nusxalanadi"""
+        extract_images(self.target_dir, products)
+        for ref in image_refs(products):
+            target = os.path.join(self.target_dir, ref)
+            source = image_path(self.source_dir, ref)
+            if os.path.exists(target) or not os.path.exists(source):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, f"{target}.tmp")
+            os.replace(f"{target}.tmp", target)
+            self.stats['images'] += 1
+
+    def _publish_file(self, filename):
+        """Bitta fayl: manifest yozuvi (artefaktlar yozilgan)"""
+        name = filename.rsplit('.', 1)[0]
+        with open(os.path.join(self.source_dir, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.stats['read'] += 1
+        if name == 'products' and isinstance(data, list):
+            self._publish_images(data)
+
+        content = minify(data)
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        entry = {'file': f"{name}.{digest}.json", 'hash': digest,
+                 'count': len(data) if isinstance(data, list) else None, 'bytes': len(content)}
+        path = os.path.join(self.target_dir, entry['file'])
+        self.stats['written'] += write_bytes(path, content)
+        for extension, compressed in precompress(content).items():
+            write_bytes(f"{path}.{extension}", compressed)
+            entry[extension] = len(compressed)
+        return entry
+
+    def publish(self):
+        """Artefaktlarni yangilash - o'zgargan fayl nomlari ro'yxati"""
+        os.makedirs(self.target_dir, exist_ok=True)
+        state = load_json(self.state_file, {})
+        previous = self.manifest().get('files', {})
+        files, changed = {}, []
+
+        for filename in PUBLISH_FILES:
+            name = filename.rsplit('.', 1)[0]
+            signature = file_signature(os.path.join(self.source_dir, filename))
+            if signature is None:
+                continue
+            entry = previous.get(name)
+            if entry is None or state.get(name) != list(signature) or \
+                    not os.path.exists(os.path.join(self.target_dir, entry['file'])):
+                entry = self._publish_file(filename)
+                state[name] = list(signature)
+            files[name] = entry
+            if previous.get(name, {}).get('hash') != entry['hash']:
+                changed.append(name)
+
+        if changed or set(files) != set(previous):
+            manifest = {
+                'version': hashlib.sha256(''.join(files[name]['hash'] for name in sorted(files)).encode()).hexdigest()[:HASH_LENGTH],
+                'generated': datetime.now().isoformat(timespec='seconds'),
+                'files': files
+            }
+            write_json_atomic(os.path.join(self.target_dir, MANIFEST_FILE), manifest, indent=None)
+            self._prune(files, previous)
+        write_json_atomic(self.state_file, state, indent=None)
+        return changed
+
+    def _prune(self, files, previous):
+        """Joriy va oldingi manifestdagilardan boshqa artefaktlar va rasmlarni o'chirish"""
+        keep = {entry['file'] for entry in list(files.values()) + list(previous.values())}
+        for filename in os.listdir(self.target_dir):
+            base = filename.split('.json', 1)[0] + '.json'
+            if base.rsplit('.', 2)[0] in files and base not in keep and filename != MANIFEST_FILE:
+                os.remove(os.path.join(self.target_dir, filename))
+                self.stats['removed'] += 1
+
+        # Rasmlar: faqat mahsulotlar o'zgarganda (joriy va oldingi avlod havolalari qoladi)
+        images_dir = os.path.join(self.target_dir, IMAGES_DIR)
+        if 'products' not in files or previous.get('products', {}).get('hash') == files['products']['hash'] \
+                or not os.path.isdir(images_dir):
+            return
+        live = set()
+        for entry in (files['products'], previous.get('products')):
+            if entry:
+                live |= image_refs(load_json(os.path.join(self.target_dir, entry['file']), []))
+        for filename in os.listdir(images_dir):
+            ref = f"{IMAGES_DIR}/{filename}"
+            if is_image_ref(ref) and ref not in live:
+                os.remove(os.path.join(images_dir, filename))
+                self.stats['removed'] += 1
+
+def main():
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else 'bot_data'
+    target_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    publisher = Publisher(source_dir, target_dir)
+    changed = publisher.publish()
+    print(f"✅ Nashr qilindi: {', '.join(changed)}" if changed else "➖ O'zgarish yo'q")
+    for name, entry in publisher.manifest().get('files', {}).items():
+        sizes = ', '.join(f"{extension} {entry[extension] / 1024:.0f} KB" for extension in ('gz', 'br') if extension in entry)
+        print(f"  📄 {entry['file']}: {entry['count']} ta, {entry['bytes'] / 1024:.0f} KB ({sizes})")
+    if not brotli:
+        print("ℹ️ brotli o'rnatilmagan - faqat .gz yaratildi")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Buyurtmalar uchun guruhli yozish (group commit)
+Qisqa oyna ichida kelgan buyurtmalar bitta yozuvda saqlanadi:
+orders va products har bir guruh uchun faqat bir marta yoziladi.
+"""
+
+import os
+import asyncio
+import logging
+
+from stock import StockLedger
+
+logger = logging.getLogger(__name__)
+
+# Guruhlash oynasi (millisekund) va maksimal guruh hajmi
+ORDER_COMMIT_WINDOW_MS = float(os.getenv('ORDER_COMMIT_WINDOW_MS', '20'))
+ORDER_COMMIT_MAX_BATCH = int(os.getenv('ORDER_COMMIT_MAX_BATCH', '500'))
+
+class GroupCommitWriter:
+    """Buyurtmalarni guruhlab saqlovchi yozuvchi
+
+    submit() mahsulotdan bir donani band qiladi (stock.py), buyurtmani navbatga
+    qo'yadi va guruh saqlanguncha kutadi. Mahsulot tugagan bo'lsa None qaytadi.
+    Saqlanmagan buyurtmalar band qilingan miqdor sifatida hisobga olinadi
+    (available_quantity), shuning uchun tekshiruvlar eski qiymatni ko'rmaydi.
+    """
+
+    def __init__(self, backend, window_ms=None, max_batch=None, storage_io=None, stock=None):
+        self.backend = backend
+        self.storage_io = storage_io
+        self.stock = stock or StockLedger(backend)
+        self.window = (ORDER_COMMIT_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or ORDER_COMMIT_MAX_BATCH
+        self.stats = {'orders': 0, 'batches': 0, 'errors': 0, 'sold_out': 0}
+        self._queue = []
+        self._timer = None
+        self._flush_lock = None
+        self._last_id = 0
+
+    def available_quantity(self, product):
+        """Hali saqlanmagan buyurtmalarni hisobga olgan holda mavjud miqdor"""
+        return self.stock.available(product)
+
+    async def submit(self, order):
+        """Buyurtmani navbatga qo'yish va saqlanishini kutish (tugagan bo'lsa None)"""
+        loop = asyncio.get_running_loop()
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        if self.stock.reserve(order['productId']) is None:
+            self.stats['sold_out'] += 1
+            return None
+
+        # Bir guruhdagi buyurtmalar ID'si takrorlanmasligi uchun
+        if order['id'] <= self._last_id:
+            order['id'] = self._last_id + 1
+        self._last_id = order['id']
+
+        future = loop.create_future()
+        self._queue.append((order, future))
+
+        if len(self._queue) >= self.max_batch:
+            loop.create_task(self.flush())
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, lambda: loop.create_task(self.flush()))
+
+        return await future
+
+    async def flush(self):
+        """Navbatdagi buyurtmalarni bitta yozuvda saqlash"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            batch, self._queue = self._queue, []
+            if not batch:
+                return
+
+            orders = [order for order, _ in batch]
+            try:
+                # Fayl yozuvi event loop'ni to'xtatmasligi uchun thread pool'da
+                if self.storage_io is not None:
+                    saved = await self.storage_io.create_orders(orders)
+                else:
+                    saved = self.backend.create_orders(orders)
+            except Exception as e:
+                logger.error(f"Buyurtmalar guruhini saqlashda xatolik ({len(orders)} ta): {e}")
+                self.stats['errors'] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                # Backend yozish paytida tugagan mahsulotlar buyurtmasini rad etadi
+                saved_ids = {id(order) for order in saved}
+                self.stats['orders'] += len(saved)
+                self.stats['sold_out'] += len(orders) - len(saved)
+                self.stats['batches'] += 1
+                for order, future in batch:
+                    if not future.done():
+                        future.set_result(order if id(order) in saved_ids else None)
+            finally:
+                # Miqdor diskda kamaygandan keyingina bo'shatiladi
+                for order in orders:
+                    self.stock.release(order['productId'])
@@ -0,0 +1,220 @@
+"""
+Mahsulot rasmlari uchun kontent-manzilli ombor
+Rasmlar products.json ichida base64 sifatida emas, bot_data/images/<sha256>.<ext>
+fayllarida saqlanadi, mahsulotda esa faqat havola qoladi: "images/<sha256>.webp".
+Bir xil rasm bir marta saqlanadi.
+
+Ishlatish:
+    python image_store.py migrate bot_data    # mavjud data URI'larni ko'chirish
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import base64
+import hashlib
+import logging
+
+from storage import load_data, save_data, JsonBackend
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = 'images'
+THUMBS_DIR = 'thumbs'
+
+# Telegram'ga yuboriladigan rasm o'lchami va sifati
+PHOTO_MAX_SIZE = int(os.getenv('PHOTO_MAX_SIZE', '1280'))
+PHOTO_QUALITY = int(os.getenv('PHOTO_QUALITY', '85'))
+
+# Rasm xeshi -> Telegram file_id
+PHOTO_CACHE_FILE = 'photo_cache.json'
+photo_stats = {'uploads': 0, 'cache_hits': 0, 'thumbnails': 0, 'errors': 0}
+
+MIME_EXTENSIONS = {
+    'image/webp': 'webp',
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif'
+}
+
+_REF_RE = re.compile(r'^images/([0-9a-f]{64})\.(webp|jpg|png|gif|bin)$')
+
+def is_data_uri(value):
+    """Qiymat base64 data URI ekanligini tekshirish"""
+    return isinstance(value, str) and value.startswith('data:image')
+
+def is_image_ref(value):
+    """Qiymat ombordagi rasm havolasi ekanligini tekshirish"""
+    return isinstance(value, str) and _REF_RE.match(value) is not None
+
+def image_hash(ref):
+    """Havoladan rasm xeshini olish"""
+    match = _REF_RE.match(ref or '')
+    return match.group(1) if match else None
+
+def image_path(data_dir, ref):
+    """Havola bo'yicha fayl yo'li (faqat to'g'ri havolalar uchun)"""
+    if not is_image_ref(ref):
+        return None
+    return os.path.join(data_dir, ref)
+
+def store_bytes(data_dir, content, extension):
+    """Rasm baytlarini saqlash va havolani qaytarish"""
+    digest = hashlib.sha256(content).hexdigest()
+    ref = f"{IMAGES_DIR}/{digest}.{extension}"
+    path = os.path.join(data_dir, ref)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return ref
+
+def store_data_uri(data_dir, data_uri):
+    """data:image/...;base64,... qatorini omborga ko'chirish"""
+    header, _, payload = data_uri.partition(',')
+    mime = header[5:].split(';')[0].lower()
+    content = base64.b64decode(payload)
+    return store_bytes(data_dir, content, MIME_EXTENSIONS.get(mime, 'bin'))
+
+def read_image(data_dir, ref):
+    """Rasm baytlarini o'qish (faqat rasm haqiqatan ko'rsatilganda chaqiriladi)"""
+    path = image_path(data_dir, ref)
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+def thumbnail(data_dir, ref):
+    """Telegram uchun kichraytirilgan JPEG - har bir rasm xeshi uchun bir marta yaratiladi
+
+    Pillow o'rnatilmagan bo'lsa asl rasm qaytariladi.
+    """
+    digest = image_hash(ref)
+    if digest is None:
+        return None
+    if Image is None:
+        return read_image(data_dir, ref)
+
+    thumb_path = os.path.join(data_dir, IMAGES_DIR, THUMBS_DIR, f"{digest}.jpg")
+    if os.path.exists(thumb_path):
+        with open(thumb_path, 'rb') as f:
+            return f.read()
+
+    source = image_path(data_dir, ref)
+    if source is None or not os.path.exists(source):
+        return None
+
+    with Image.open(source) as img:
+        img = img.convert('RGB')
+        img.thumbnail((PHOTO_MAX_SIZE, PHOTO_MAX_SIZE))
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        tmp_path = f"{thumb_path}.tmp"
+        img.save(tmp_path, 'JPEG', quality=PHOTO_QUALITY, optimize=True)
+    os.replace(tmp_path, thumb_path)
+    photo_stats['thumbnails'] += 1
+
+    with open(thumb_path, 'rb') as f:
+        return f.read()
+
+def cached_file_id(data_dir, ref):
+    """Avval yuklangan rasmning Telegram file_id si"""
+    digest = image_hash(ref)
+    if digest is None:
+        return None
+    return load_data(os.path.join(data_dir, PHOTO_CACHE_FILE), {}).get(digest)
+
+def remember_file_id(data_dir, ref, file_id, live_refs=None):
+    """Yuklangan rasm file_id sini saqlash
+
+    live_refs berilsa, hech bir mahsulot ishlatmayotgan (rasmi o'zgargan)
+    yozuvlar keshdan o'chiriladi.
+    """
+    digest = image_hash(ref)
+    if digest is None or not file_id:
+        return
+    path = os.path.join(data_dir, PHOTO_CACHE_FILE)
+    cache = dict(load_data(path, {}))
+    cache[digest] = file_id
+    if live_refs is not None:
+        live = {image_hash(r) for r in live_refs}
+        cache = {key: value for key, value in cache.items() if key in live}
+    save_data(path, cache)
+
+def forget_file_id(data_dir, ref):
+    """Eskirgan file_id ni o'chirish (masalan Telegram uni qabul qilmasa)"""
+    digest = image_hash(ref)
+    path = os.path.join(data_dir, PHOTO_CACHE_FILE)
+    cache = load_data(path, {})
+    if digest in cache:
+        cache = dict(cache)
+        del cache[digest]
+        save_data(path, cache)
+
+def extract_images(data_dir, products):
+    """Mahsulotlardagi data URI'larni havolaga almashtirish, o'zgargan mahsulotlar sonini qaytaradi"""
+    changed = 0
+    for product in products:
+        image = product.get('image')
+        if not is_data_uri(image):
+            continue
+        try:
+            product['image'] = store_data_uri(data_dir, image)
+            changed += 1
+        except Exception as e:
+            logger.error(f"Rasmni ko'chirishda xatolik (mahsulot {product.get('id')}): {e}")
+    return changed
+
+def migrate_images(backend, data_dir):
+    """Backenddagi mahsulotlar rasmlarini omborga ko'chirish"""
+    products = backend.load('products', [])
+    changed = extract_images(data_dir, products)
+    if changed:
+        backend.save('products', products)
+        logger.info(f"🖼 {changed} ta mahsulot rasmi bot_data/{IMAGES_DIR} ga ko'chirildi")
+    return changed
+
+def _parse_time(path, repeat=20):
+    """Faylni o'qib parse qilishning o'rtacha vaqti (ms)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with open(path, 'r', encoding='utf-8') as f:
+            json.load(f)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != 'migrate':
+        print("Foydalanish: python image_store.py migrate <data_dir>")
+        return
+
+    data_dir = sys.argv[2]
+    products_file = os.path.join(data_dir, 'products.json')
+    if not os.path.exists(products_file):
+        print(f"❌ {products_file} topilmadi")
+        return
+
+    size_before = os.path.getsize(products_file)
+    parse_before = _parse_time(products_file)
+
+    backend = JsonBackend(data_dir, journal=False)
+    changed = migrate_images(backend, data_dir)
+
+    size_after = os.path.getsize(products_file)
+    parse_after = _parse_time(products_file)
+
+    print(f"✅ Ko'chirilgan rasmlar: {changed}")
+    print(f"📦 products.json: {size_before} -> {size_after} bytes "
+          f"({100 - size_after * 100 / max(size_before, 1):.1f}% kamaydi)")
+    print(f"⏱ Parse vaqti: {parse_before:.3f} -> {parse_after:.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Ma'lumotlar indekslari - chiziqli qidiruv o'rniga O(1) topish
+    mahsulot id bo'yicha, kategoriya mahsulotlari (faqat mavjudlari),
+    kategoriya id bo'yicha, foydalanuvchi buyurtmalari (yaratilish tartibida)
+
+Yozuvlar backend hodisalari orqali indeksga qo'shiladi, fayl tashqaridan
+o'zgarsa (versiya o'zgargan bo'lsa) indeks qaytadan quriladi.
+"""
+
+import logging
+import threading
+
+from storage import advance_version
+
+logger = logging.getLogger(__name__)
+
+class DataIndex:
+    """Backend ustidagi indekslar"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {'rebuilds': 0, 'incremental': 0}
+        self._lock = threading.RLock()
+        self._versions = {'products': None, 'categories': None, 'orders': None}
+
+        self.products_by_id = {}
+        self.products_by_category = {}
+        self.categories_by_id = {}
+        self.orders_by_user = {}
+        self.order_ids = set()
+
+        backend.subscribe(self._on_change)
+
+    # Qurish
+    def _rebuild_products(self, products):
+        """Mahsulot indekslarini qurish"""
+        by_id = {}
+        by_category = {}
+        for product in products:
+            by_id[product.get('id')] = product
+            if product.get('quantity', 0) > 0:
+                by_category.setdefault(product.get('categoryId'), []).append(product)
+        self.products_by_id = by_id
+        self.products_by_category = by_category
+
+    def _rebuild_categories(self, categories):
+        """Kategoriya indeksini qurish"""
+        self.categories_by_id = {category.get('id'): category for category in categories}
+
+    def _rebuild_orders(self, orders):
+        """Foydalanuvchi buyurtmalari indeksini qurish"""
+        by_user = {}
+        for order in orders:
+            by_user.setdefault(order.get('telegramId'), []).append(order)
+        self.orders_by_user = by_user
+        self.order_ids = {order.get('id') for order in orders}
+
+    def refresh(self, *names):
+        """Versiya o'zgargan bo'lsa indeksni qayta qurish"""
+        with self._lock:
+            for name in names:
+                # load() fayl tashqaridan o'zgarganini ham aniqlaydi
+                data = self.backend.load(name, [])
+                version = self.backend.version(name)
+                if version == self._versions[name]:
+                    continue
+                if name == 'products':
+                    self._rebuild_products(data)
+                elif name == 'categories':
+                    self._rebuild_categories(data)
+                else:
+                    self._rebuild_orders(data)
+                self._versions[name] = version
+                self.stats['rebuilds'] += 1
+
+    # Qo'shimcha yangilash
+    def _on_change(self, event, payload):
+        """Backend hodisasi - indeksni qisman yangilash
+
+        O'zgarish faqat indeks yozuvdan oldingi versiyada bo'lsa qo'llanadi (advance_version),
+        aks holda indeks eskirgan deb belgilanadi va keyingi o'qishda qayta quriladi.
+        """
+        with self._lock:
+            if event == 'orders_created':
+                versions = self.backend.event_versions()
+                self._versions['orders'], add_orders = advance_version(self._versions['orders'], 'orders', versions)
+                self._versions['products'], update_stock = advance_version(self._versions['products'], 'products', versions)
+                for order in payload:
+                    # Indeks shu orada qayta qurilgan bo'lsa, buyurtma unda allaqachon bor
+                    if add_orders and order.get('id') not in self.order_ids:
+                        self.orders_by_user.setdefault(order.get('telegramId'), []).append(order)
+                        self.order_ids.add(order.get('id'))
+                    product = self.products_by_id.get(order.get('productId')) if update_stock else None
+                    if product is not None and product.get('quantity', 0) <= 0:
+                        in_stock = self.products_by_category.get(product.get('categoryId'), [])
+                        for i, item in enumerate(in_stock):
+                            if item is product:
+                                del in_stock[i]
+                                break
+                if add_orders or update_stock:
+                    self.stats['incremental'] += 1
+            elif event == 'saved' and payload in self._versions:
+                self._versions[payload] = None
+
+    # O'qish
+    def product(self, product_id):
+        """Mahsulot id bo'yicha"""
+        self.refresh('products')
+        return self.products_by_id.get(product_id)
+
+    def category_products(self, category_id):
+        """Kategoriyadagi mavjud (quantity > 0) mahsulotlar"""
+        self.refresh('products')
+        return self.products_by_category.get(category_id, [])
+
+    def category(self, category_id):
+        """Kategoriya id bo'yicha"""
+        self.refresh('categories')
+        return self.categories_by_id.get(category_id)
+
+    def user_orders(self, telegram_id, limit=None):
+        """Foydalanuvchi buyurtmalari - yaratilish tartibida, oxirgi limit tasi O(limit)"""
+        self.refresh('orders')
+        orders = self.orders_by_user.get(telegram_id, [])
+        if limit is not None:
+            return orders[-limit:]
+        return orders
+
+    def user_orders_page(self, telegram_id, page, page_size):
+        """Foydalanuvchi buyurtmalari sahifasi (eng yangisidan boshlab) va jami soni - O(page_size)"""
+        self.refresh('orders')
+        orders = self.orders_by_user.get(telegram_id, [])
+        end = max(len(orders) - page * page_size, 0)
+        start = max(end - page_size, 0)
+        return orders[start:end][::-1], len(orders)
@@ -0,0 +1,205 @@
+"""
+Katta JSON massivlarni oqim bilan o'qish
+Fayl bo'laklab o'qiladi va yozuvlar birma-bir qaytariladi - xotira fayl
+hajmiga emas, bitta yozuv hajmiga bog'liq. Sanash, status bo'yicha
+taqsimot va sxema tekshiruvi shu orqali bajariladi.
+
+Ishlatish:
+    python json_stream.py bot_data/orders.json orders
+    python json_stream.py bot_data/orders.json orders --compare   # json.load bilan vaqt va xotira
+"""
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+# Bir martada o'qiladigan bo'lak (belgilar)
+JSON_STREAM_CHUNK = int(os.getenv('JSON_STREAM_CHUNK', str(64 * 1024)))
+
+# Majburiy maydonlar va ularning turlari
+SCHEMAS = {
+    'products': {'id': (int, str), 'name': (str,), 'price': (int, float), 'quantity': (int,),
+                 'categoryId': (int, str)},
+    'categories': {'id': (int, str), 'name': (str,)},
+    'orders': {'id': (int, str), 'productId': (int, str), 'status': (str,)}
+}
+
+# Ko'rsatiladigan xatolar soni
+MAX_ERRORS = 5
+
+_WHITESPACE = ' \t\r\n'
+
+# Bo'lak oxiridan shuncha belgi ichidagi xato - element uzilgan bo'lishi mumkin
+_TRUNCATED_TAIL = 16
+
+def iter_array(path, chunk_size=None):
+    """Fayldagi JSON massiv elementlari (generator)
+
+    Fayl massiv bo'lmasa yoki buzilgan bo'lsa ValueError (fayldagi belgi o'rni bilan).
+    Buzilgan element darhol aniqlanadi - faylning qolgan qismi o'qilmaydi.
+    """
+    decoder = json.JSONDecoder()
+    chunk_size = chunk_size or JSON_STREAM_CHUNK
+    with open(path, 'r', encoding='utf-8') as f:
+        # base - buf boshining fayldagi o'rni (belgilarda)
+        buf, pos, eof, base = '', 0, False, 0
+        state = 'start'
+        while True:
+            # Bo'shliqlarni o'tkazib yuborish (kerak bo'lsa keyingi bo'lakni o'qish)
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    break
+                base += len(buf)
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+            if pos >= len(buf):
+                raise ValueError(f"{path}: kutilmagan fayl oxiri")
+
+            char = buf[pos]
+            if state == 'start':
+                if char != '[':
+                    raise ValueError(f"{path}: JSON massiv emas (belgi {base + pos})")
+                pos += 1
+                state = 'first'
+                continue
+            if state != 'value':
+                if char == ']':
+                    return
+                if state == 'next':
+                    if char != ',':
+                        raise ValueError(f"{path}: ',' kutilgan edi (belgi {base + pos})")
+                    pos += 1
+                    state = 'value'
+                    continue
+
+            # Element: bo'lak oxirida uzilgan bo'lsa keyingi bo'lak qo'shiladi.
+            # Xato bo'lak oxiridan uzoqda bo'lsa element buzilgan - qolgan qism o'qilmaydi
+            # (uzilgan son yoki true/null xatosi oxirga yaqin, uzilgan satr - "Unterminated string")
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    if end < len(buf) or eof:
+                        break
+                except json.JSONDecodeError as e:
+                    truncated = len(buf) - e.pos <= _TRUNCATED_TAIL or e.msg.startswith('Unterminated string')
+                    if eof or not truncated:
+                        raise ValueError(f"{path}: buzilgan element (belgi {base + e.pos}): {e.msg}") from None
+                more = f.read(chunk_size)
+                eof = not more
+                base += pos
+                buf, pos = buf[pos:] + more, 0
+            yield value
+            pos = end
+            state = 'next'
+
+def validate_record(kind, record):
+    """Yozuvdagi birinchi muammo yoki None"""
+    if not isinstance(record, dict):
+        return "obyekt emas"
+    for field, types in SCHEMAS.get(kind, {}).items():
+        value = record.get(field)
+        if value is None:
+            return f"'{field}' yo'q"
+        if not isinstance(value, types) or isinstance(value, bool):
+            return f"'{field}' turi noto'g'ri"
+    return None
+
+class RecordStats:
+    """Yozuvlar statistikasi: soni, noto'g'ri yozuvlar, status/mavjudlik bo'yicha"""
+
+    def __init__(self, kind, records=()):
+        self.kind = kind
+        self.count = 0
+        self.invalid = 0
+        self.errors = []
+        self.statuses = {}
+        self.available = 0
+        for record in records:
+            self.add(record)
+
+    def _apply(self, record, sign):
+        if not isinstance(record, dict):
+            return
+        if self.kind == 'orders':
+            status = record.get('status') or 'unknown'
+            self.statuses[status] = self.statuses.get(status, 0) + sign
+            if not self.statuses[status]:
+                del self.statuses[status]
+        elif self.kind == 'products':
+            quantity = record.get('quantity')
+            if isinstance(quantity, (int, float)) and quantity > 0:
+                self.available += sign
+
+    def add(self, record):
+        self.count += 1
+        problem = validate_record(self.kind, record)
+        if problem is not None:
+            self.invalid += 1
+            if len(self.errors) < MAX_ERRORS:
+                record_id = record.get('id') if isinstance(record, dict) else None
+                self.errors.append(f"#{self.count} (id={record_id}): {problem}")
+        self._apply(record, 1)
+
+    def replace(self, old, new):
+        """Yozuv o'zgardi (masalan buyurtma statusi)"""
+        self._apply(old, -1)
+        self._apply(new, 1)
+
+    def as_dict(self):
+        result = {'count': self.count, 'invalid': self.invalid, 'errors': list(self.errors)}
+        if self.kind == 'orders':
+            result['statuses'] = dict(self.statuses)
+        elif self.kind == 'products':
+            result['available'] = self.available
+        return result
+
+def stream_stats(path, kind):
+    """Faylni oqim bilan o'qib statistika yig'ish"""
+    stats = RecordStats(kind)
+    for record in iter_array(path):
+        stats.add(record)
+    return stats.as_dict()
+
+def _measure(func):
+    """Vaqt (ms, kuzatuvsiz) va eng yuqori xotira (MB, tracemalloc bilan alohida o'tishda)"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--compare']
+    if not args:
+        print("Foydalanish: python json_stream.py <fayl> [products|categories|orders] [--compare]")
+        return
+
+    path = args[0]
+    kind = args[1] if len(args) > 1 else os.path.basename(path).split('.')[0]
+    print(f"📄 {path}: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    if '--compare' in sys.argv:
+        stats, stream_ms, stream_mb = _measure(lambda: stream_stats(path, kind))
+
+        def load_all():
+            with open(path, 'r', encoding='utf-8') as f:
+                return RecordStats(kind, json.load(f)).as_dict()
+        _, load_ms, load_mb = _measure(load_all)
+        print(f"⏱ Oqim: {stream_ms:.0f} ms, {stream_mb:.1f} MB | json.load: {load_ms:.0f} ms, {load_mb:.1f} MB")
+    else:
+        start = time.perf_counter()
+        stats = stream_stats(path, kind)
+        print(f"⏱ {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"📊 {json.dumps(stats, ensure_ascii=False)}")
+    if stats['invalid']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Bot handlerlari uchun yuklama testi (tarmoqsiz)
+telegram_bot_render.py dagi haqiqiy handlerlar soxta Update/CallbackQuery/Bot
+obyektlari bilan chaqiriladi. N ta foydalanuvchi bir vaqtda odatiy yo'lni
+bosib o'tadi: /start -> katalog -> kategoriya -> mahsulot -> buyurtma -> buyurtmalarim.
+
+Natija: har bir handler uchun p50/p95/p99 kechikish va buyurtmalar/soniya.
+
+Ishlatish:
+    python loadtest.py
+    python loadtest.py --users 500 --rounds 3 --products 10000 --orders 50000
+    python loadtest.py --backend sqlite --api-latency-ms 30
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import importlib
+
+from benchmark import generate_dataset
+
+class FakeUser:
+    """telegram.User o'rniga"""
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.first_name = "Foydalanuvchi"
+        self.last_name = str(user_id)
+
+class FakePhotoSize:
+    """Yuborilgan rasm - faqat file_id kerak"""
+
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+class FakeApi:
+    """Bot API chaqiruvlari: tarmoq o'rniga sozlanadigan kutish va hisoblagich"""
+
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.calls = {}
+
+    async def call(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+class FakeMessage:
+    """telegram.Message o'rniga"""
+
+    def __init__(self, api, text=None, photo=None, reply_markup=None):
+        self.api = api
+        self.text = text
+        self.photo = photo or []
+        self.reply_markup = reply_markup
+        self.last_reply = None
+
+    async def reply_text(self, text, reply_markup=None, parse_mode=None):
+        await self.api.call('sendMessage')
+        self.last_reply = FakeMessage(self.api, text=text, reply_markup=reply_markup)
+        return self.last_reply
+
+    async def reply_photo(self, photo, caption=None, reply_markup=None, parse_mode=None):
+        await self.api.call('sendPhoto')
+        file_id = photo if isinstance(photo, str) else f"file-{len(photo)}-{hash(photo)}"
+        self.last_reply = FakeMessage(self.api, text=caption, photo=[FakePhotoSize(file_id)],
+                                      reply_markup=reply_markup)
+        return self.last_reply
+
+    async def delete(self):
+        await self.api.call('deleteMessage')
+
+class FakeCallbackQuery:
+    """telegram.CallbackQuery o'rniga"""
+
+    def __init__(self, api, data, message):
+        self.api = api
+        self.data = data
+        self.message = message
+        self.edited = None
+
+    @property
+    def result(self):
+        """Foydalanuvchi ko'radigan xabar: tahrirlangan, yangi yuborilgan yoki eskisi"""
+        return self.edited or self.message.last_reply or self.message
+
+    async def answer(self, text=None):
+        await self.api.call('answerCallbackQuery')
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        await self.api.call('editMessageText')
+        self.edited = FakeMessage(self.api, text=text, reply_markup=reply_markup)
+
+    async def delete_message(self):
+        await self.api.call('deleteMessage')
+
+class FakeInlineQuery:
+    """telegram.InlineQuery o'rniga"""
+
+    def __init__(self, api, query, offset=''):
+        self.api = api
+        self.query = query
+        self.offset = offset
+        self.results = None
+        self.next_offset = None
+
+    async def answer(self, results, cache_time=None, next_offset=None):
+        await self.api.call('answerInlineQuery')
+        self.results = results
+        self.next_offset = next_offset
+
+class FakeUpdate:
+    """telegram.Update o'rniga"""
+
+    def __init__(self, user, message=None, callback_query=None, inline_query=None):
+        self.effective_user = user
+        self.message = message
+        self.callback_query = callback_query
+        self.inline_query = inline_query
+
+class FakeBot:
+    """context.bot o'rniga (adminga xabarlar)"""
+
+    def __init__(self, api):
+        self.api = api
+
+    async def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+        await self.api.call('sendMessage')
+
+class FakeContext:
+    """ContextTypes.DEFAULT_TYPE o'rniga - har bir foydalanuvchining user_data si"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.user_data = {}
+        self.args = []
+
+def callback_buttons(message, prefix):
+    """Xabardagi inline tugmalardan prefix bilan boshlanadigan callback_data lar"""
+    markup = message.reply_markup if message is not None else None
+    if markup is None or not hasattr(markup, 'inline_keyboard'):
+        return []
+    return [button.callback_data for row in markup.inline_keyboard for button in row
+            if (button.callback_data or '').startswith(prefix)]
+
+def percentile(timings, p):
+    """Tartiblangan ro'yxatdan percentil"""
+    return timings[min(int(len(timings) * p / 100), len(timings) - 1)]
+
+class LoadTest:
+    """Handlerlarni soxta update'lar bilan chaqirib kechikishni yig'ish"""
+
+    def __init__(self, bot_module, api, rng):
+        self.bot = bot_module
+        self.api = api
+        self.rng = rng
+        self.timings = {}
+        self.orders = 0
+        self.sold_out = 0
+        self.errors = 0
+
+    async def dispatch(self, name, handler, update, context):
+        """Dispatcher kabi: avval prefetch (group=-1), keyin handler - vaqtni o'lchash"""
+        start = time.perf_counter()
+        try:
+            await self.bot.prefetch_data(update, context)
+            await handler(update, context)
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ {name}: {e}")
+        self.timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+    async def send_text(self, name, user, context, text, handler=None):
+        """Matnli xabar (buyruq yoki menyu tugmasi) - javob xabarini qaytaradi"""
+        message = FakeMessage(self.api, text=text)
+        await self.dispatch(name, handler or self.bot.handle_text_messages,
+                            FakeUpdate(user, message=message), context)
+        return message.last_reply
+
+    async def press(self, name, user, context, message, data):
+        """Inline tugmani bosish - yangi (yoki tahrirlangan) xabarni qaytaradi"""
+        message.last_reply = None
+        query = FakeCallbackQuery(self.api, data, message)
+        await self.dispatch(name, self.bot.callback_handler, FakeUpdate(user, callback_query=query), context)
+        return query.result
+
+    async def type_inline(self, user, context, text):
+        """Inline rejimda nomni harfma-harf yozish (har bir harf - alohida inline so'rov)"""
+        for end in range(1, len(text) + 1):
+            query = FakeInlineQuery(self.api, text[:end])
+            await self.dispatch('inline_query', self.bot.inline_query, FakeUpdate(user, inline_query=query), context)
+        if query.next_offset:
+            query = FakeInlineQuery(self.api, text, query.next_offset)
+            await self.dispatch('inline_query', self.bot.inline_query, FakeUpdate(user, inline_query=query), context)
+
+    async def user_flow(self, user_id, rounds):
+        """Bitta foydalanuvchi: ko'rish -> mahsulot -> buyurtma -> buyurtmalarim"""
+        user = FakeUser(user_id)
+        context = FakeContext(FakeBot(self.api))
+
+        await self.send_text('start', user, context, '/start', self.bot.start)
+        for _ in range(rounds):
+            catalog = await self.send_text('products', user, context, "🛍 Mahsulotlar")
+            categories = callback_buttons(catalog, 'category_')
+            if not categories:
+                continue
+
+            listing = await self.press('show_category_products', user, context, catalog,
+                                       self.rng.choice(categories))
+            pages = [data for data in callback_buttons(listing, 'category_') if data.count('_') == 2]
+            if pages and self.rng.random() < 0.3:
+                listing = await self.press('show_category_products', user, context, listing, pages[-1])
+
+            products = callback_buttons(listing, 'product_')
+            if not products:
+                continue
+            details = await self.press('show_product_details', user, context, listing, self.rng.choice(products))
+
+            order_buttons = callback_buttons(details, 'order_')
+            if order_buttons:
+                await self.press('order_product', user, context, details, order_buttons[0])
+                reply = await self.send_text('handle_order_reason', user, context, "Yuklama testi")
+                if reply is not None and reply.text.startswith("✅"):
+                    self.orders += 1
+                else:
+                    self.sold_out += 1
+
+            if self.rng.random() < 0.5:
+                await self.type_inline(user, context, f"Mahsulot {self.rng.randint(1, 99)}")
+
+            history = await self.send_text('my_orders', user, context, "📋 Mening buyurtmalarim")
+            older = callback_buttons(history, 'orders_')
+            if older:
+                await self.press('show_orders_page', user, context, history, older[-1])
+
+    async def run(self, users, rounds):
+        """Barcha foydalanuvchilarni bir vaqtda ishga tushirish"""
+        start = time.perf_counter()
+        await asyncio.gather(*(self.user_flow(100000 + i, rounds) for i in range(users)))
+        elapsed = time.perf_counter() - start
+        await self.bot.order_writer.flush()
+        return elapsed
+
+def print_report(test, elapsed, users):
+    """Natijalar jadvali"""
+    print(f"{'handler':>24} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, timings in test.timings.items():
+        timings.sort()
+        print(f"{name:>24} {len(timings):>7} {percentile(timings, 50):>8.2f} {percentile(timings, 95):>8.2f} "
+              f"{percentile(timings, 99):>8.2f} {timings[-1]:>8.2f}")
+    updates = sum(len(timings) for timings in test.timings.values())
+    print(f"\n👥 Foydalanuvchilar: {users}, update'lar: {updates}, vaqt: {elapsed:.2f} s "
+          f"({updates / elapsed:.0f} update/s)")
+    print(f"🛒 Buyurtmalar: {test.orders} ({test.orders / elapsed:.1f} buyurtma/s), "
+          f"tugagan: {test.sold_out}, xatolar: {test.errors}")
+    print(f"📡 Bot API chaqiruvlari: {test.api.calls}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot handlerlari uchun yuklama testi")
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=2)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--backend', default='json', choices=['json', 'sqlite'])
+    parser.add_argument('--api-latency-ms', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_dataset(tmp, args.products, args.orders, image_bytes=0, seed=args.seed,
+                         category_count=args.categories)
+
+        # Bot moduli import paytida DATA_DIR dagi backendni ochadi
+        os.environ['DATA_DIR'] = tmp
+        os.environ['STORAGE_BACKEND'] = args.backend
+        os.environ.setdefault('ADMIN_IDS', '1,2')
+        bot = importlib.import_module('telegram_bot_render')
+
+        api = FakeApi(args.api_latency_ms)
+        test = LoadTest(bot, api, random.Random(args.seed))
+        elapsed = asyncio.run(test.run(args.users, args.rounds))
+
+        print(f"📊 Yuklama testi: {args.products} mahsulot, {args.categories} kategoriya, "
+              f"{args.orders} eski buyurtma, backend={args.backend}\n")
+        print_report(test, elapsed, args.users)
+
+        bot.storage_io.shutdown()
+        bot.backend.close()
+
+    if test.errors:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Prometheus formatidagi metrikalar
+Handler kechikishi, update turlari, fayl o'qish/yozish vaqti va hajmi, kesh
+hit nisbati, xabar yuborish xatolari va yaratilgan buyurtmalar.
+
+Handler tanasi o'zgarmaydi: handlerlar main() da ro'yxatga olinayotganda
+(va dispatcherlarning yo'naltirish jadvallarida) instrument() bilan o'raladi.
+Xabar yuborish xatolari Bot o'ramida, update turlari group=-2 dagi
+count_update orqali, fayl I/O storage.observe_io orqali, buyurtmalar
+backend hodisalari orqali yig'iladi.
+
+Kichik HTTP server (METRICS_PORT, standart 9100, 0 - o'chirilgan):
+    curl http://127.0.0.1:9100/metrics
+"""
+
+import os
+import time
+import logging
+import threading
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import storage
+from profiler import profiler
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+
+# Prometheus standart chegaralari (soniya)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names, values, extra=None):
+    """{name="value",...} ko'rinishi"""
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Counter:
+    """O'suvchi hisoblagich"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labels, key), value) for key, value in items]
+
+class Gauge:
+    """Joriy qiymat - har bir so'rovda func() dan olinadi: [(label_values, value), ...]"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, func, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.func = func
+
+    def samples(self):
+        return [(self.name, _format_labels(self.labels, key), value) for key, value in self.func()]
+
+class Histogram:
+    """Taqsimot: chegaralar bo'yicha yig'ma hisob, yig'indi va soni"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *label_values):
+        entry = self._values.get(label_values)
+        return entry[2] if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        result = []
+        for key, counts, total, count in items:
+            for bound, value in zip(self.buckets, counts):
+                result.append((f"{self.name}_bucket", _format_labels(self.labels, key, [('le', bound)]), value))
+            result.append((f"{self.name}_bucket", _format_labels(self.labels, key, [('le', '+Inf')]), count))
+            result.append((f"{self.name}_sum", _format_labels(self.labels, key), total))
+            result.append((f"{self.name}_count", _format_labels(self.labels, key), count))
+        return result
+
+class Registry:
+    """Metrikalar ro'yxati va matn ko'rinishi (Prometheus text format 0.0.4)"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.error(f"Metrikani yig'ishda xatolik {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+handler_latency = registry.register(Histogram(
+    'bot_handler_duration_seconds', "Handler bajarilish vaqti", ['handler']))
+handler_errors = registry.register(Counter(
+    'bot_handler_errors_total', "Handlerdagi ushlanmagan xatolar", ['handler']))
+updates_total = registry.register(Counter(
+    'bot_updates_total', "Kelgan update'lar turi bo'yicha", ['type']))
+storage_seconds = registry.register(Histogram(
+    'storage_io_duration_seconds', "Fayl o'qish/yozish vaqti", ['op', 'file']))
+storage_bytes = registry.register(Counter(
+    'storage_io_bytes_total', "O'qilgan/yozilgan baytlar", ['op', 'file']))
+send_failures = registry.register(Counter(
+    'bot_send_failures_total', "Bot API yuborish xatolari (metod va qabul qiluvchi: admin/chat)", ['method', 'target']))
+orders_created = registry.register(Counter(
+    'bot_orders_created_total', "Saqlangan buyurtmalar"))
+
+def _storage_cache_ratio():
+    stats = storage.cache_stats()
+    return [(('storage',), stats['hit_ratio'])]
+
+cache_hit_ratio = registry.register(Gauge(
+    'bot_cache_hit_ratio', "Kesh hit nisbati", _storage_cache_ratio, ['cache']))
+
+def add_cache(name, counts):
+    """Qo'shimcha kesh hit nisbatini ko'rsatish - counts() (hits, misses) qaytaradi"""
+    previous = cache_hit_ratio.func
+
+    def ratios():
+        hits, misses = counts()
+        total = hits + misses
+        return previous() + [((name,), hits / total if total else 0.0)]
+
+    cache_hit_ratio.func = ratios
+
+# Yig'ish nuqtalari
+def instrument(handler, name=None):
+    """Handlerni o'rash: bajarilish vaqti, ushlanmagan xatolar va (/profile yoqilgan bo'lsa) profil
+
+    Dispatcher ichidan chaqirilgan handler ham o'z nomi bilan o'lchanadi,
+    profilda esa "tashqi > ichki" yorlig'i bilan ko'rinadi.
+    """
+    label = name or handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(update, context, *args):
+        start = time.perf_counter()
+        try:
+            if profiler.active:
+                return await profiler.run(label, handler, update, context, *args)
+            return await handler(update, context, *args)
+        except Exception:
+            handler_errors.inc(1, label)
+            raise
+        finally:
+            handler_latency.observe(time.perf_counter() - start, label)
+    return wrapper
+
+def update_type(update):
+    """Update turi: message, callback_query, inline_query va h.k."""
+    for kind in ('callback_query', 'inline_query', 'message', 'edited_message', 'chosen_inline_result'):
+        if getattr(update, kind, None) is not None:
+            return kind
+    return 'other'
+
+async def count_update(update, context):
+    """Middleware (group=-2): update turini hisoblash"""
+    updates_total.inc(1, update_type(update))
+
+def _on_io(op, filename, seconds, nbytes):
+    file = os.path.basename(filename)
+    storage_seconds.observe(seconds, op, file)
+    storage_bytes.inc(nbytes, op, file)
+
+def _on_backend_event(event, payload):
+    if event == 'orders_created':
+        orders_created.inc(len(payload))
+
+def watch_backend(backend):
+    """Backend hodisalari va fayl I/O ni kuzatishni boshlash"""
+    storage.observe_io(_on_io)
+    backend.subscribe(_on_backend_event)
+
+# HTTP server
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=None, host=None):
+    """Metrikalar serverini orqa fon ipida ishga tushirish (port 0 bo'lsa ishga tushmaydi)"""
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host or METRICS_HOST, port), MetricsHandler)
+    except OSError as e:
+        logger.error(f"Metrikalar serverini ishga tushirishda xatolik: {e}")
+        return None
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"📈 Metrikalar: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
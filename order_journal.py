@@ -0,0 +1,336 @@
+"""
+Buyurtmalar jurnali - faqat qo'shiladigan JSONL fayl va snapshot
+Har bir buyurtma yoki status o'zgarishi jurnalga bitta qator bo'lib yoziladi
+(har bir guruh uchun fsync), orqa fonda jurnal snapshot va orders.json ga yig'iladi.
+
+Fayllar:
+    orders.snapshot.json   - oxirgi yig'ilgan holat (ixcham JSON)
+    orders.snapshot.state.json - jurnal o'zi yozgan orders.json imzosi (snapshot eskirmaganini bilish uchun)
+    orders.journal.jsonl   - snapshotdan keyingi yozuvlar
+    orders.json            - web panel uchun eksport (indent=2)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+import storage
+from storage import write_json_atomic
+from json_stream import RecordStats
+
+logger = logging.getLogger(__name__)
+
+# Jurnalni snapshotga yig'ish oralig'i (soniya)
+ORDER_COMPACT_INTERVAL = float(os.getenv('ORDER_COMPACT_INTERVAL', '60'))
+
+SNAPSHOT_FILE = 'orders.snapshot.json'
+SNAPSHOT_STATE_FILE = 'orders.snapshot.state.json'
+JOURNAL_FILE = 'orders.journal.jsonl'
+COMPACTING_FILE = 'orders.journal.compacting.jsonl'
+EXPORT_FILE = 'orders.json'
+
+class OrderJournal:
+    """Buyurtmalar jurnali: xotirada to'liq ro'yxat, diskda snapshot + jurnal
+
+    read_only=True - faqat o'qish (masalan reports.py): jurnal oxiridagi
+    tugallanmagan qator kesilmaydi, chunki uni ishlayotgan bot yozayotgan bo'lishi mumkin.
+    """
+
+    def __init__(self, data_dir, read_only=False):
+        self.data_dir = data_dir
+        self.read_only = read_only
+        self.snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+        self.state_path = os.path.join(data_dir, SNAPSHOT_STATE_FILE)
+        self.journal_path = os.path.join(data_dir, JOURNAL_FILE)
+        self.compacting_path = os.path.join(data_dir, COMPACTING_FILE)
+        self.export_path = os.path.join(data_dir, EXPORT_FILE)
+        self.stats = {'appended': 0, 'compactions': 0, 'replayed': 0}
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._orders = []
+        self._by_id = {}
+        self._journal = None
+        self._journal_entries = 0
+        self._export_signature = None
+        self._exporting = False
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._replay()
+
+    # Tiklash
+    def _reset(self, orders):
+        """Xotiradagi holatni berilgan ro'yxat bilan almashtirish"""
+        self._orders = list(orders)
+        self._by_id = {order.get('id'): order for order in self._orders}
+        self._record_stats = RecordStats('orders', self._orders)
+
+    def _apply(self, entry):
+        """Jurnal yozuvini xotiraga qo'llash (takroriy qo'llash xavfsiz)"""
+        op = entry.get('op')
+        if op == 'create':
+            order = entry['order']
+            if order.get('id') not in self._by_id:
+                self._orders.append(order)
+                self._by_id[order.get('id')] = order
+                self._record_stats.add(order)
+        elif op == 'status':
+            order = self._by_id.get(entry.get('id'))
+            if order is not None:
+                previous = dict(order)
+                order['status'] = entry.get('status')
+                self._record_stats.replace(previous, order)
+
+    def _read_journal(self, path):
+        """Jurnal faylini o'qish - oxirgi yarim yozilgan qator tashlab yuboriladi"""
+        entries = []
+        if not os.path.exists(path):
+            return entries
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    logger.error(f"Jurnal qatori buzilgan {path}:{line_no}, tashlab yuborildi")
+        return entries
+
+    def _repair_tail(self, path):
+        """Uzilib qolgan oxirgi qatorni kesib tashlash, aks holda keyingi yozuv unga qo'shilib ketadi"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b'\n'):
+                return
+            f.truncate(data.rfind(b'\n') + 1)
+        logger.warning(f"Jurnal oxiridagi tugallanmagan yozuv kesildi: {path}")
+
+    def _snapshot_current(self):
+        """orders.json ni oxirgi marta jurnal o'zi yozgan - snapshot undan eskirmagan"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        signature = storage.file_signature(self.export_path)
+        return signature is not None and state.get('export') == list(signature)
+
+    def _load_base(self):
+        """Asosiy holat: snapshot, orders.json tashqaridan o'zgargan (yoki snapshot yo'q) bo'lsa orders.json"""
+        paths = [self.snapshot_path, self.export_path]
+        if os.path.exists(self.export_path) and not self._snapshot_current():
+            paths.reverse()
+        for path in paths:
+            if os.path.exists(path):
+                try:
+                    start = time.perf_counter()
+                    with open(path, 'r', encoding='utf-8') as f:
+                        orders = json.load(f)
+                    storage.record_io('load', path, time.perf_counter() - start, os.path.getsize(path))
+                    return orders
+                except Exception as e:
+                    logger.error(f"Buyurtmalarni yuklashda xatolik {path}: {e}")
+        return []
+
+    def _replay(self, base=None):
+        """Snapshot + jurnal qoldig'idan xotiradagi ro'yxatni tiklash"""
+        with self._lock:
+            self._reset(self._load_base() if base is None else base)
+            if not self.read_only:
+                self._repair_tail(self.journal_path)
+            entries = self._read_journal(self.compacting_path) + self._read_journal(self.journal_path)
+            for entry in entries:
+                self._apply(entry)
+            self._journal_entries = len(entries)
+            self.stats['replayed'] += len(entries)
+            self._export_signature = storage.file_signature(self.export_path)
+            storage.bump_version(self.journal_path)
+
+    def _check_external(self):
+        """orders.json tashqaridan (web/sync_data.py) o'zgartirilgan bo'lsa, uni asos qilib olish"""
+        # Yig'ish orders.json ni yozayotgan bo'lsa - bu o'zimizning yozuv
+        if self._exporting:
+            return
+        signature = storage.file_signature(self.export_path)
+        if signature is None or signature == self._export_signature:
+            return
+        try:
+            with open(self.export_path, 'r', encoding='utf-8') as f:
+                base = json.load(f)
+        except Exception as e:
+            logger.error(f"Buyurtmalarni yuklashda xatolik {self.export_path}: {e}")
+            self._export_signature = signature
+            return
+        logger.info("orders.json tashqaridan o'zgardi, jurnal uning ustiga qayta qo'llanadi")
+        self._replay(base)
+
+    # O'qish
+    def is_fresh(self):
+        """orders.json tashqaridan o'zgarmagan - orders() diskni o'qimaydi"""
+        return self._exporting or storage.file_signature(self.export_path) in (None, self._export_signature)
+
+    def orders(self):
+        """Barcha buyurtmalar (xotiradan)"""
+        with self._lock:
+            self._check_external()
+            return self._orders
+
+    def record_stats(self):
+        """Buyurtmalar statistikasi - O(1), har bir yozuvda yangilanadi"""
+        with self._lock:
+            self._check_external()
+            return self._record_stats.as_dict()
+
+    def has_order(self, order_id):
+        """Buyurtma ID'si band"""
+        with self._lock:
+            return order_id in self._by_id
+
+    def version(self):
+        """Buyurtmalar versiyasi"""
+        with self._lock:
+            self._check_external()
+            return storage.data_version(self.journal_path)
+
+    # Yozish
+    def _append(self, entries):
+        """Yozuvlarni jurnalga qo'shish - bitta fsync"""
+        start = time.perf_counter()
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+        self._journal.write(data)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        storage.record_io('append', self.journal_path, time.perf_counter() - start, len(data.encode('utf-8')))
+        self._journal_entries += len(entries)
+        self.stats['appended'] += len(entries)
+
+    def append_orders(self, orders):
+        """Yangi buyurtmalarni jurnalga yozish va xotiraga qo'shish"""
+        entries = [{'op': 'create', 'order': order} for order in orders]
+        with self._lock:
+            self._check_external()
+            self._append(entries)
+            for entry in entries:
+                self._apply(entry)
+            storage.bump_version(self.journal_path)
+        return orders
+
+    def set_status(self, order_id, status):
+        """Buyurtma statusini o'zgartirish"""
+        with self._lock:
+            self._check_external()
+            order = self._by_id.get(order_id)
+            if order is None:
+                return None
+            entry = {'op': 'status', 'id': order_id, 'status': status}
+            self._append([entry])
+            self._apply(entry)
+            storage.bump_version(self.journal_path)
+            return order
+
+    def replace(self, orders):
+        """Butun ro'yxatni almashtirish (snapshot sifatida yoziladi)
+
+        Yig'ish tugashi kutiladi - aks holda u eski ro'yxatni snapshot ustiga yozadi.
+        """
+        with self._compact_lock, self._lock:
+            self._reset(orders)
+            self._export_signature = self._write_snapshot(self._orders)
+            self._truncate_journal()
+            storage.bump_version(self.journal_path)
+
+    # Yig'ish (compaction)
+    def _truncate_journal(self):
+        """Jurnalni bo'shatish"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        for path in (self.journal_path, self.compacting_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._journal_entries = 0
+
+    def _write_snapshot(self, orders):
+        """Snapshot va web panel uchun orders.json ni yozish, orders.json imzosini saqlash"""
+        write_json_atomic(self.snapshot_path, orders, indent=None)
+        write_json_atomic(self.export_path, orders, indent=2)
+        signature = storage.file_signature(self.export_path)
+        write_json_atomic(self.state_path, {'export': list(signature)}, indent=None)
+        return signature
+
+    def compact(self):
+        """Jurnalni snapshotga yig'ish
+
+        Lock faqat jurnalni almashtirish uchun olinadi, snapshot yozish
+        lock'siz bajariladi - shu paytda yangi buyurtmalar yangi jurnalga tushadi,
+        yozilayotgan orders.json esa tashqi o'zgarish deb hisoblanmaydi.
+        """
+        with self._compact_lock:
+            with self._lock:
+                self._check_external()
+                if self._journal_entries == 0 and os.path.exists(self.snapshot_path):
+                    return False
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if os.path.exists(self.journal_path) and not os.path.exists(self.compacting_path):
+                    os.replace(self.journal_path, self.compacting_path)
+                orders = list(self._orders)
+                self._journal_entries = 0
+                # orders() bu yozuvni tashqi o'zgarish deb qayta tiklamasligi uchun
+                self._exporting = True
+
+            try:
+                signature = self._write_snapshot(orders)
+            except Exception as e:
+                logger.error(f"Buyurtmalar jurnalini yig'ishda xatolik: {e}")
+                with self._lock:
+                    self._exporting = False
+                return False
+
+            with self._lock:
+                self._export_signature = signature
+                self._exporting = False
+                if os.path.exists(self.compacting_path):
+                    os.remove(self.compacting_path)
+            self.stats['compactions'] += 1
+            return True
+
+    def _compactor(self, interval):
+        """Orqa fon ipi: vaqti-vaqti bilan yig'ish"""
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Buyurtmalar jurnalini yig'ishda xatolik: {e}")
+
+    def start_compactor(self, interval=None):
+        """Orqa fonda yig'ishni boshlash"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._compactor, args=(interval or ORDER_COMPACT_INTERVAL,),
+            name='order-journal-compactor', daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """Yig'ishni to'xtatish va jurnalni yopish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.compact()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
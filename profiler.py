@@ -0,0 +1,175 @@
+"""
+Ishlayotgan botni profillash (admin /profile buyrug'i)
+Keyingi N ta update yoki T soniya davomida handlerlar cProfile bilan
+o'lchanadi va natija handler bo'yicha yig'iladi. Profil faqat handler
+korutinasi haqiqatan bajarilayotgan qadamlarda yoqiladi - await paytida
+ishlagan boshqa update'lar unga aralashmaydi. Thread pool'dagi fayl I/O
+(storage.observe_io) alohida yig'iladi.
+
+Dispatcher yo'naltirgan ichki handlerlar (instrument() bilan o'ralgan) alohida
+profil ochmaydi - tashqi profilga qo'shiladi va natija zanjir bo'yicha
+yig'iladi: "callback_handler > show_product_details".
+
+O'chirilgan holatda qo'shimcha xarajat - bitta atribut tekshiruvi.
+"""
+
+import io
+import time
+import pstats
+import asyncio
+import cProfile
+import logging
+import threading
+import contextvars
+
+import storage
+
+logger = logging.getLogger(__name__)
+
+# Standart cheklovlar: 100 ta update yoki 60 soniya
+PROFILE_UPDATES = 100
+PROFILE_SECONDS = 60
+PROFILE_TOP = 15
+
+# Joriy profillanayotgan update'da chaqirilgan handlerlar zanjiri
+_chain = contextvars.ContextVar('profile_chain', default=None)
+
+class _Profiled:
+    """Korutinani qadamma-qadam bajarish, profil faqat qadam ichida yoqiladi"""
+
+    def __init__(self, coro, profile):
+        self.coro = coro
+        self.profile = profile
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.profile.enable()
+            try:
+                if error is not None:
+                    future = self.coro.throw(error)
+                else:
+                    future = self.coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profile.disable()
+            try:
+                value, error = (yield future), None
+            except BaseException as e:
+                value, error = None, e
+
+class Profiler:
+    """Namunaviy profillash sessiyasi"""
+
+    def __init__(self):
+        self.active = False
+        self._io_registered = False
+        self._lock = threading.Lock()
+        self._reset(0, 0)
+
+    def _reset(self, updates, seconds):
+        self.limit_updates = updates
+        self.limit_seconds = seconds
+        self.started = None
+        self.finished = None
+        self.sampled = 0
+        self.handlers = {}
+        self.io = {}
+        self.done = None
+
+    def start(self, updates=None, seconds=None):
+        """Sessiyani boshlash - tugashini kutish uchun asyncio.Event qaytaradi"""
+        if not self._io_registered:
+            storage.observe_io(self._on_io)
+            self._io_registered = True
+        self._reset(updates or PROFILE_UPDATES, seconds or PROFILE_SECONDS)
+        self.started = time.perf_counter()
+        self.done = asyncio.Event()
+        self.active = True
+        return self.done
+
+    def stop(self):
+        """Sessiyani to'xtatish"""
+        if self.active:
+            self.finished = time.perf_counter()
+        self.active = False
+        if self.done is not None:
+            self.done.set()
+
+    def _on_io(self, op, filename, seconds, nbytes):
+        """Sessiya paytidagi fayl I/O (har qanday ipdan)"""
+        if not self.active:
+            return
+        key = (op, filename.rsplit('/', 1)[-1])
+        with self._lock:
+            entry = self.io.setdefault(key, [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += nbytes
+
+    def note(self, label):
+        """Profillanayotgan update ichida chaqirilgan ichki handler - zanjir yorlig'iga qo'shiladi"""
+        chain = _chain.get()
+        if chain is not None:
+            chain.append(label)
+
+    async def run(self, label, handler, update, context, *args):
+        """Handlerni profillab bajarish (ichki chaqiruv bo'lsa - tashqi profilga qo'shiladi)"""
+        if _chain.get() is not None:
+            self.note(label)
+            return await handler(update, context, *args)
+
+        chain = [label]
+        token = _chain.set(chain)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return await _Profiled(handler(update, context, *args), profile)
+        finally:
+            _chain.reset(token)
+            self._add(' > '.join(chain), profile, time.perf_counter() - start)
+
+    def _add(self, label, profile, elapsed):
+        """Natijani handler bo'yicha yig'ish va cheklovlarni tekshirish"""
+        if not self.active:
+            return
+        entry = self.handlers.get(label)
+        if entry is None:
+            self.handlers[label] = [1, elapsed, pstats.Stats(profile)]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2].add(profile)
+        self.sampled += 1
+        if self.sampled >= self.limit_updates or \
+                time.perf_counter() - self.started >= self.limit_seconds:
+            self.stop()
+
+    def summary(self):
+        """Qisqa xulosa (Telegram xabari uchun)"""
+        elapsed = (self.finished or time.perf_counter()) - self.started if self.started else 0
+        lines = [f"🔬 Profil: {self.sampled} ta update, {elapsed:.1f} s", ""]
+        ranked = sorted(self.handlers.items(), key=lambda item: item[1][1], reverse=True)
+        for label, (count, total, _) in ranked[:10]:
+            lines.append(f"{label}: {count} ta, jami {total * 1000:.0f} ms, o'rtacha {total * 1000 / count:.1f} ms")
+        if self.io:
+            lines.append("")
+            lines.append("💾 Fayl I/O:")
+            for (op, name), (count, total, nbytes) in sorted(self.io.items(), key=lambda item: item[1][1], reverse=True)[:5]:
+                lines.append(f"{op} {name}: {count} ta, {total * 1000:.0f} ms, {nbytes / 1024:.0f} KB")
+        return '\n'.join(lines)
+
+    def report(self, top=PROFILE_TOP):
+        """To'liq hisobot: har bir handler uchun eng og'ir funksiyalar (cumulative)"""
+        out = io.StringIO()
+        out.write(self.summary() + '\n\n')
+        out.write("Vaqt: jami - devor soati (await bilan), profil - faqat handlerning o'z CPU qadamlari.\n")
+        ranked = sorted(self.handlers.items(), key=lambda item: item[1][1], reverse=True)
+        for label, (count, total, stats) in ranked:
+            out.write(f"\n===== {label} ({count} ta, {total * 1000:.1f} ms) =====\n")
+            stats.stream = out
+            stats.sort_stats('cumulative').print_stats(top)
+        return out.getvalue()
+
+profiler = Profiler()
@@ -0,0 +1,49 @@
+"""
+Tayyor xabar matni va klaviaturalar keshi
+Kalit: (ko'rinish, id, sahifa), katalog versiyasi o'zgarsa butun kesh tozalanadi.
+Eng kam ishlatilgan yozuvlar (LRU) chiqarib yuboriladi.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '512'))
+
+class RenderCache:
+    """Katalog versiyasiga bog'langan LRU kesh"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or RENDER_CACHE_SIZE
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._items = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, version, build):
+        """Keshdan olish yoki build() bilan yaratib saqlash"""
+        with self._lock:
+            if version != self._version:
+                if self._items:
+                    self.stats['invalidations'] += 1
+                self._items.clear()
+                self._version = version
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._items[key]
+
+        value = build()
+        with self._lock:
+            self.stats['misses'] += 1
+            if version == self._version:
+                self._items[key] = value
+                if len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Keshni tozalash"""
+        with self._lock:
+            self._items.clear()
+            self._version = None
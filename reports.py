@@ -0,0 +1,259 @@
+"""
+Buyurtmalar hisoboti uchun yig'indilar (rollup)
+Har bir kun (va oy) uchun: (kategoriya, status) -> soni, (kategoriya, mahsulot) -> soni,
+(kategoriya, foydalanuvchi) -> soni. Yangi buyurtma va status o'zgarishi
+backend hodisalari orqali faqat o'z kuni va oyini yangilaydi, shuning uchun hisobot
+barcha buyurtmalarni emas, faqat oraliqdagi kunlarni ko'rib chiqadi - oraliqqa
+to'liq kiradigan oylar uchun kunlar o'rniga oy yig'indisi olinadi.
+
+Fayl tashqaridan o'zgarsa (versiya o'zgargan bo'lsa) yig'indilar buyurtmalar
+ro'yxatidan qaytadan quriladi.
+
+Ishlatish:
+    python reports.py bot_data [boshlanish] [tugash]     # YYYY-MM-DD
+Buyurtmalar bot kabi snapshot + jurnaldan olinadi (orders.json faqat oxirgi yig'ishgacha).
+"""
+
+import os
+import sys
+import time
+import bisect
+import calendar
+import logging
+import threading
+from collections import Counter
+
+from json_stream import iter_array
+from order_journal import OrderJournal
+from storage import advance_version
+
+logger = logging.getLogger(__name__)
+
+# Hisobotdagi eng ko'p buyurtma qilingan mahsulotlar/foydalanuvchilar soni
+REPORT_TOP = 5
+
+def order_day(order):
+    """Buyurtma kuni (YYYY-MM-DD) yoki sana noto'g'ri bo'lsa None"""
+    created = order.get('createdAt')
+    if not isinstance(created, str) or len(created) < 10 or created[4] != '-' or created[7] != '-':
+        return None
+    return created[:10]
+
+class OrderRollups:
+    """Kunlik yig'indilar
+
+    lookup(product_id) mahsulotni qaytaradi (masalan DataIndex.product) - buyurtma
+    kategoriyasi hisobga qo'shilgan paytdagi mahsulot kategoriyasi.
+    """
+
+    def __init__(self, backend=None, lookup=None):
+        self.backend = backend
+        self.lookup = lookup or self._lookup
+        self.stats = {'rebuilds': 0, 'incremental': 0, 'skipped': 0}
+        self._lock = threading.RLock()
+        self._version = None
+        self._products = {}
+        self._products_version = None
+
+        self.days = {}
+        self.months = {}
+        self.day_keys = []
+        self.user_names = {}
+        self._orders = {}
+
+        if backend is not None:
+            backend.subscribe(self._on_change)
+
+    def _lookup(self, product_id):
+        """Mahsulot id bo'yicha (backenddagi ro'yxatdan)"""
+        if self.backend is None:
+            return self._products.get(product_id)
+        products = self.backend.load('products', [])
+        version = self.backend.version('products')
+        if version != self._products_version:
+            self._products = {product.get('id'): product for product in products}
+            self._products_version = version
+        return self._products.get(product_id)
+
+    # Yig'indilarni yangilash
+    def _buckets(self, day):
+        """Kun va oy yig'indilari"""
+        bucket = self.days.get(day)
+        if bucket is None:
+            bucket = self.days[day] = {'statuses': Counter(), 'products': Counter(), 'users': Counter()}
+            bisect.insort(self.day_keys, day)
+        month = self.months.get(day[:7])
+        if month is None:
+            month = self.months[day[:7]] = {'statuses': Counter(), 'products': Counter(), 'users': Counter()}
+        return bucket, month
+
+    def _add(self, order):
+        day = order_day(order)
+        if day is None:
+            self.stats['skipped'] += 1
+            return
+        product = self.lookup(order.get('productId'))
+        category_id = product.get('categoryId') if product else None
+        status = order.get('status') or 'pending'
+        user_id = order.get('telegramId')
+
+        for bucket in self._buckets(day):
+            bucket['statuses'][(category_id, status)] += 1
+            bucket['products'][(category_id, order.get('productId'))] += 1
+            bucket['users'][(category_id, user_id)] += 1
+        if order.get('userName'):
+            self.user_names[user_id] = order['userName']
+        self._orders[order.get('id')] = (day, category_id, status)
+
+    def _set_status(self, order):
+        """Status o'zgardi - faqat shu buyurtma kunidagi hisoblagich ko'chiriladi"""
+        entry = self._orders.get(order.get('id'))
+        if entry is None:
+            self._add(order)
+            return
+        day, category_id, old_status = entry
+        status = order.get('status') or 'pending'
+        if status == old_status:
+            return
+        for bucket in (self.days[day], self.months[day[:7]]):
+            statuses = bucket['statuses']
+            statuses[(category_id, old_status)] -= 1
+            if not statuses[(category_id, old_status)]:
+                del statuses[(category_id, old_status)]
+            statuses[(category_id, status)] += 1
+        self._orders[order.get('id')] = (day, category_id, status)
+
+    def rebuild(self, orders):
+        """Yig'indilarni noldan qurish (buyurtmalar ro'yxati yoki generator)"""
+        with self._lock:
+            self.days = {}
+            self.months = {}
+            self.day_keys = []
+            self.user_names = {}
+            self._orders = {}
+            for order in orders:
+                if isinstance(order, dict):
+                    self._add(order)
+            self.stats['rebuilds'] += 1
+
+    def refresh(self):
+        """Buyurtmalar versiyasi o'zgargan bo'lsa qayta qurish"""
+        if self.backend is None:
+            return
+        with self._lock:
+            orders = self.backend.load('orders', [])
+            version = self.backend.version('orders')
+            if version != self._version:
+                self.rebuild(orders)
+                self._version = version
+
+    def _on_change(self, event, payload):
+        """Backend hodisasi - yig'indilarni qisman yangilash
+
+        O'zgarish faqat yig'indilar yozuvdan oldingi versiyada bo'lsa qo'llanadi (advance_version),
+        aks holda keyingi hisobotda qaytadan quriladi.
+        """
+        with self._lock:
+            if event == 'saved' and payload == 'orders':
+                self._version = None
+                return
+            if event not in ('orders_created', 'order_status'):
+                return
+            self._version, apply = advance_version(self._version, 'orders', self.backend.event_versions())
+            if not apply:
+                return
+            if event == 'orders_created':
+                for order in payload:
+                    # Shu orada qayta qurilgan bo'lsa buyurtma allaqachon hisoblangan
+                    if order.get('id') not in self._orders:
+                        self._add(order)
+            else:
+                self._set_status(payload)
+            self.stats['incremental'] += 1
+
+    # Hisobot
+    @staticmethod
+    def _full_month(month, start, end):
+        """Oy (YYYY-MM) oraliqqa to'liq kiradimi"""
+        year, number = int(month[:4]), int(month[5:7])
+        last = f"{month}-{calendar.monthrange(year, number)[1]:02d}"
+        return (not start or start <= f"{month}-01") and (not end or end >= last)
+
+    def report(self, start=None, end=None, category_id=None, top=None):
+        """Sana oralig'i (YYYY-MM-DD, ikkala chegara ham kiradi) va kategoriya bo'yicha hisobot
+
+        Faqat oraliqdagi kunlar ko'rib chiqiladi, to'liq kiradigan oylar oy yig'indisidan olinadi.
+        """
+        self.refresh()
+        top = top or REPORT_TOP
+        with self._lock:
+            low = bisect.bisect_left(self.day_keys, start) if start else 0
+            high = bisect.bisect_right(self.day_keys, end) if end else len(self.day_keys)
+            days = self.day_keys[low:high]
+
+            buckets = []
+            full_months = set()
+            for day in days:
+                month = day[:7]
+                if month in full_months:
+                    continue
+                if self._full_month(month, start, end):
+                    full_months.add(month)
+                    buckets.append(self.months[month])
+                else:
+                    buckets.append(self.days[day])
+
+            statuses, categories, products, users = Counter(), Counter(), Counter(), Counter()
+            for bucket in buckets:
+                for (category, status), count in bucket['statuses'].items():
+                    if category_id is None or category == category_id:
+                        statuses[status] += count
+                        categories[category] += count
+                for (category, product_id), count in bucket['products'].items():
+                    if category_id is None or category == category_id:
+                        products[product_id] += count
+                for (category, user_id), count in bucket['users'].items():
+                    if category_id is None or category == category_id:
+                        users[user_id] += count
+
+            return {
+                'start': days[0] if days else start,
+                'end': days[-1] if days else end,
+                'days': len(days),
+                'total': sum(statuses.values()),
+                'statuses': dict(statuses),
+                'categories': dict(categories),
+                'top_products': products.most_common(top),
+                'top_users': [(user_id, self.user_names.get(user_id), count) for user_id, count in users.most_common(top)]
+            }
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'bot_data'
+    start = sys.argv[2] if len(sys.argv) > 2 else None
+    end = sys.argv[3] if len(sys.argv) > 3 else None
+
+    rollups = OrderRollups()
+    products_path = os.path.join(data_dir, 'products.json')
+    if os.path.exists(products_path):
+        rollups._products = {product.get('id'): product for product in iter_array(products_path)}
+
+    started = time.perf_counter()
+    # orders.json oxirgi yig'ishdan keyingi buyurtmalarni o'z ichiga olmaydi - jurnal qayta qo'llanadi
+    rollups.rebuild(OrderJournal(data_dir, read_only=True).orders())
+    print(f"🔨 Yig'indilar qurildi: {len(rollups._orders)} buyurtma, {len(rollups.days)} kun "
+          f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    started = time.perf_counter()
+    report = rollups.report(start, end)
+    print(f"📈 {report['start']} - {report['end']}: {report['total']} ta buyurtma "
+          f"({(time.perf_counter() - started) * 1000:.2f} ms)")
+    print(f"   Statuslar: {report['statuses']}")
+    print(f"   Kategoriyalar: {report['categories']}")
+    for product_id, count in report['top_products']:
+        product = rollups._products.get(product_id)
+        print(f"   🏆 {product.get('name') if product else product_id}: {count}")
+    for user_id, name, count in report['top_users']:
+        print(f"   👤 {name or user_id}: {count}")
+
+if __name__ == '__main__':
+    main()
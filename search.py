@@ -0,0 +1,275 @@
+"""
+Mahsulotlar bo'yicha to'liq matnli qidiruv
+Nom, tavsif va kategoriya nomi bo'yicha teskari indeks (so'z -> mahsulotlar).
+
+Matn normallashtiriladi: kichik harflar, kirill -> lotin (o'zbek alifbosi),
+o‘ / oʻ / o' / o` kabi tutuq belgilari olib tashlanadi - "Ўзбек", "o'zbek",
+"oʻzbek" va "ozbek" bitta so'zga aylanadi.
+
+So'z boshi ham mos keladi ("kompy" -> "kompyuter"). Natijalar maydon
+vazni (nom > kategoriya > tavsif) va to'liq moslik bo'yicha, teng bo'lsa
+katalog tartibida saralanadi. Bir nechta so'zda eng kam mahsulotga mos
+so'zdan boshlanadi, qolganlari faqat shu nomzodlar uchun tekshiriladi.
+Saralangan natijalar LRU keshda saqlanadi (sahifalash qayta hisoblamaydi).
+
+Katalog o'zgarsa faqat matni o'zgargan mahsulotlar qayta indekslanadi;
+buyurtmadan keyin (faqat miqdor o'zgaradi) indeks va kesh tegilmaydi.
+"""
+
+import os
+import re
+import bisect
+import logging
+import threading
+from operator import ne
+from itertools import compress, repeat
+from collections import OrderedDict
+
+from storage import advance_version
+
+logger = logging.getLogger(__name__)
+
+# Kirill -> lotin (o'zbek). Tutuq belgilari keyin olib tashlanadi, shuning uchun ў -> o, ғ -> g
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ғ': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'қ': 'q', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'ў': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ҳ': 'h',
+    'ц': 's', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya'
+}
+APOSTROPHES = "'‘’ʻʼ`´"
+_TRANSLATION = str.maketrans({**CYRILLIC_TO_LATIN, **{char: '' for char in APOSTROPHES}})
+# So'z boshidagi "е" - "ye" (ер -> yer)
+_INITIAL_YE = re.compile(r'(?<!\w)е')
+_WORD = re.compile(r'\w+')
+
+# Maydon vaznlari
+FIELD_WEIGHTS = (('name', 3), ('category', 2), ('description', 1))
+# Mahsulotning indekslanadigan maydonlari (o'zgarmagan bo'lsa hujjat qayta qurilmaydi)
+INDEXED_FIELDS = ('name', 'categoryId', 'description')
+# Prefiks qidiruv uchun eng qisqa so'z; kengaytmalar bundan ko'p bo'lsa bitta ro'yxatga birlashtiriladi
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 64
+# To'liq so'z prefiksdan yuqori
+EXACT_BONUS = 2
+# Saralangan natijalar keshi (so'rovlar soni)
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '256'))
+
+def normalize(text):
+    """Qidiruv uchun matn: kichik harf, lotin, tutuq belgilarisiz"""
+    text = _INITIAL_YE.sub('ye', (text or '').casefold())
+    return text.translate(_TRANSLATION)
+
+def tokenize(text):
+    """Normallashtirilgan so'zlar"""
+    return _WORD.findall(normalize(text))
+
+class SearchIndex:
+    """Backend ustidagi teskari indeks"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {'rebuilds': 0, 'reindexed': 0, 'queries': 0, 'cache_hits': 0}
+        self._lock = threading.RLock()
+        self._versions = {'products': None, 'categories': None}
+
+        self.postings = {}
+        self.products_by_id = {}
+        self._vocabulary = []
+        self._documents = {}
+        self._categories = {}
+        self._order = {}
+        # Oxirgi solishtirilgan ro'yxat: id'lar va har bir indekslanadigan maydon qiymatlari (o'rin bo'yicha)
+        self._ids = None
+        self._fields = []
+        self._cache = OrderedDict()
+
+        backend.subscribe(self._on_change)
+
+    # Indekslash
+    def _document(self, product):
+        """Indekslanadigan matnlar - o'zgarmagan bo'lsa mahsulot qayta indekslanmaydi"""
+        category = self._categories.get(product.get('categoryId'), '')
+        return (str(product.get('name') or ''), category, str(product.get('description') or ''))
+
+    def _add(self, product_id, document, bulk=False):
+        terms = {}
+        for (_, weight), text in zip(FIELD_WEIGHTS, document):
+            for token in tokenize(text):
+                if terms.get(token, 0) < weight:
+                    terms[token] = weight
+        for token, weight in terms.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                if not bulk:
+                    bisect.insort(self._vocabulary, token)
+            posting[product_id] = weight
+        self._documents[product_id] = (document, tuple(terms))
+
+    def _remove(self, product_id):
+        _, terms = self._documents.pop(product_id, (None, ()))
+        for token in terms:
+            posting = self.postings[token]
+            del posting[product_id]
+            if not posting:
+                del self.postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _reindex(self, product_id, product, bulk=False):
+        """Hujjati o'zgargan mahsulotni qayta indekslash"""
+        document = self._document(product)
+        indexed = self._documents.get(product_id)
+        if indexed is not None and indexed[0] == document:
+            return
+        if indexed is not None:
+            self._remove(product_id)
+        self._add(product_id, document, bulk)
+        self.stats['reindexed'] += 1
+
+    def _sync_products(self, products):
+        """Mahsulotlar ro'yxatini indeks bilan solishtirish - faqat farqlar qayta indekslanadi
+
+        Id'lar va indekslanadigan maydonlar map/zip bilan (Python tsiklisiz) olinadi.
+        Id'lar tartibi o'zgarmagan bo'lsa faqat maydoni farq qilgan o'rinlar ko'rib chiqiladi,
+        aks holda (qo'shilgan/o'chirilgan mahsulot) har bir hujjat solishtiriladi.
+        """
+        bulk = not self._documents
+        ids = list(map(dict.get, products, repeat('id')))
+        fields = [list(map(dict.get, products, repeat(field))) for field in INDEXED_FIELDS]
+        by_id = dict(zip(ids, products))
+
+        if ids == self._ids:
+            changed = set()
+            for values, previous in zip(fields, self._fields):
+                if values != previous:
+                    changed.update(compress(range(len(ids)), map(ne, values, previous)))
+            for position in sorted(changed):
+                self._reindex(ids[position], by_id[ids[position]])
+        else:
+            for product_id, product in by_id.items():
+                self._reindex(product_id, product, bulk)
+            for product_id in self._documents.keys() - by_id.keys():
+                self._remove(product_id)
+            order = {}
+            for position, product_id in enumerate(ids):
+                order.setdefault(product_id, position)
+            if order != self._order:
+                self._order = order
+                self._cache.clear()
+        self._ids = ids
+        self._fields = fields
+        self.products_by_id = by_id
+        if bulk:
+            self._vocabulary = sorted(self.postings)
+
+    def refresh(self):
+        """Versiya o'zgargan bo'lsa indeksni yangilash"""
+        with self._lock:
+            categories = self.backend.load('categories', [])
+            products = self.backend.load('products', [])
+            versions = {name: self.backend.version(name) for name in self._versions}
+            if versions == self._versions:
+                return
+            if not self._documents:
+                self.stats['rebuilds'] += 1
+            names = {category.get('id'): str(category.get('name') or '') for category in categories}
+            if names != self._categories:
+                # Kategoriya nomi hujjatga kiradi - barcha hujjatlar solishtiriladi
+                self._categories = names
+                self._ids = None
+            reindexed = self.stats['reindexed']
+            self._sync_products(products)
+            if self.stats['reindexed'] != reindexed:
+                self._cache.clear()
+            self._versions = versions
+
+    def _on_change(self, event, payload):
+        """Buyurtmadan keyin faqat miqdor o'zgaradi - matn indeksi tegilmaydi"""
+        with self._lock:
+            if event == 'orders_created':
+                # Indeks yozuvdan oldingi versiyada bo'lmasa - keyingi so'rovda solishtiriladi
+                self._versions['products'], _ = advance_version(
+                    self._versions['products'], 'products', self.backend.event_versions())
+            elif event == 'saved' and payload in self._versions:
+                self._versions[payload] = None
+
+    # Qidiruv
+    def _candidates(self, term):
+        """So'zga mos indeks yozuvlari: (koeffitsiyent, {mahsulot id: vazn}) - to'liq moslik va prefikslar
+
+        Kengaytmalar MAX_EXPANSIONS dan ko'p bo'lsa (qisqa prefiks) ular tashlab yuborilmaydi -
+        bitta {mahsulot id: eng katta vazn} ro'yxatiga birlashtiriladi.
+        """
+        candidates = []
+        exact = self.postings.get(term)
+        if exact:
+            candidates.append((EXACT_BONUS, exact))
+        if len(term) < MIN_PREFIX:
+            return candidates
+        start = bisect.bisect_left(self._vocabulary, term)
+        # term dan keyingi birinchi prefiks bo'lmagan so'z
+        end = bisect.bisect_left(self._vocabulary, term[:-1] + chr(ord(term[-1]) + 1), start)
+        tokens = [token for token in self._vocabulary[start:end] if token != term]
+        if len(tokens) <= MAX_EXPANSIONS:
+            candidates.extend((1, self.postings[token]) for token in tokens)
+            return candidates
+        merged = {}
+        for token in tokens:
+            for product_id, weight in self.postings[token].items():
+                if merged.get(product_id, 0) < weight:
+                    merged[product_id] = weight
+        candidates.append((1, merged))
+        return candidates
+
+    def _rank(self, terms):
+        """Barcha so'zlarga mos mahsulot id'lari - saralangan"""
+        matches = [self._candidates(term) for term in terms]
+        if not all(matches):
+            return []
+        # Eng kam mahsulotga mos so'zdan boshlanadi, qolganlari faqat nomzodlar uchun tekshiriladi
+        matches.sort(key=lambda candidates: sum(len(posting) for _, posting in candidates))
+        scores = {}
+        for bonus, posting in matches[0]:
+            for product_id, weight in posting.items():
+                if scores.get(product_id, 0) < weight * bonus:
+                    scores[product_id] = weight * bonus
+        for candidates in matches[1:]:
+            matched = {}
+            for product_id, score in scores.items():
+                best = 0
+                for bonus, posting in candidates:
+                    weight = posting.get(product_id, 0) * bonus
+                    if weight > best:
+                        best = weight
+                if best:
+                    matched[product_id] = score + best
+            scores = matched
+            if not scores:
+                return []
+
+        # Bitta butun son kaliti: ball (kamayish), keyin katalog tartibi
+        size = len(self._order) + 1
+        order = self._order
+        keys = {product_id: order.get(product_id, 0) - score * size for product_id, score in scores.items()}
+        return sorted(keys, key=keys.__getitem__)
+
+    def search(self, query, offset=0, limit=None):
+        """So'rovdagi barcha so'zlarga mos mahsulotlar (saralangan) va jami soni"""
+        self.refresh()
+        terms = tuple(sorted(set(tokenize(query))))
+        if not terms:
+            return [], 0
+        with self._lock:
+            self.stats['queries'] += 1
+            ranked = self._cache.get(terms)
+            if ranked is None:
+                ranked = self._rank(terms)
+                self._cache[terms] = ranked
+                if len(self._cache) > SEARCH_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(terms)
+                self.stats['cache_hits'] += 1
+            page = ranked[offset:] if limit is None else ranked[offset:offset + limit]
+            return [self.products_by_id[product_id] for product_id in page], len(ranked)
@@ -0,0 +1,356 @@
+"""
+SQLite saqlash backendi - bot_data/*.json fayllari o'rniga
+WAL rejimida ishlaydi, buyurtma qo'shish va miqdorni kamaytirish bitta tranzaksiyada
+
+Ishlatish:
+    STORAGE_BACKEND=sqlite python telegram_bot_render.py
+    python sqlite_storage.py import bot_data      # JSON -> SQLite
+    python sqlite_storage.py export bot_data      # SQLite -> JSON (web panel uchun)
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import logging
+import threading
+
+from storage import DATA_FILES, BackendEvents
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id, quantity);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    product_id INTEGER,
+    telegram_id INTEGER,
+    status TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_telegram ON orders (telegram_id, id);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+
+CREATE TABLE IF NOT EXISTS admins (
+    telegram_id INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+TABLES = ('products', 'categories', 'orders', 'admin_ids', 'settings')
+
+class SqliteBackend(BackendEvents):
+    """SQLite backendi - JsonBackend bilan bir xil interfeys"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path, data_dir=None):
+        self.db_path = db_path
+        self.listeners = []
+        self._lock = threading.RLock()
+        self._versions = {name: 0 for name in TABLES}
+        self._version_counter = 0
+        self._cache = {}
+        self._db_version = None
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(db_path)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+        if is_new and data_dir and any(
+            os.path.exists(os.path.join(data_dir, DATA_FILES[name])) for name in TABLES
+        ):
+            counts = import_json(self, data_dir)
+            logger.info(f"SQLite bazasi JSON fayllardan yaratildi: {counts}")
+
+    def _bump(self, *names):
+        """O'z yozuvlarimizdan keyin versiyani oshirish"""
+        self._version_counter += 1
+        for name in names:
+            self._versions[name] = self._version_counter
+            self._cache.pop(name, None)
+
+    def _check_external(self):
+        """Boshqa jarayon (masalan importer) bazani o'zgartirganini tekshirish"""
+        db_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if self._db_version is not None and db_version != self._db_version:
+            self._bump(*TABLES)
+        self._db_version = db_version
+
+    def _read(self, name):
+        """Jadvalni JSON ko'rinishida o'qish"""
+        if name == 'products':
+            rows = self.conn.execute('SELECT data, quantity FROM products ORDER BY position').fetchall()
+            result = []
+            for data, quantity in rows:
+                product = json.loads(data)
+                product['quantity'] = quantity
+                result.append(product)
+            return result
+        if name == 'categories':
+            return [json.loads(row[0]) for row in self.conn.execute('SELECT data FROM categories ORDER BY position')]
+        if name == 'orders':
+            return [json.loads(row[0]) for row in self.conn.execute('SELECT data FROM orders ORDER BY id')]
+        if name == 'admin_ids':
+            return [row[0] for row in self.conn.execute('SELECT telegram_id FROM admins ORDER BY rowid')]
+        if name == 'settings':
+            return {key: json.loads(value) for key, value in self.conn.execute('SELECT key, value FROM settings')}
+        raise KeyError(name)
+
+    def is_fresh(self, name):
+        """Jadval xotirada va boshqa jarayon bazani o'zgartirmagan"""
+        with self._lock:
+            self._check_external()
+            return name in self._cache
+
+    def load(self, name, default=None):
+        """Ma'lumotni yuklash (o'zgarmagan bo'lsa xotiradan)"""
+        with self._lock:
+            try:
+                self._check_external()
+                if name not in self._cache:
+                    self._cache[name] = self._read(name)
+                data = self._cache[name]
+            except Exception as e:
+                logger.error(f"SQLite'dan yuklashda xatolik {name}: {e}")
+                return [] if default is None else default
+
+            if not data and default is not None:
+                return default
+            return data
+
+    def _write(self, name, data):
+        """Jadvalni to'liq almashtirish (tranzaksiya ichida)"""
+        if name == 'products':
+            self.conn.execute('DELETE FROM products')
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO products (id, category_id, quantity, position, data) VALUES (?, ?, ?, ?, ?)',
+                [(p['id'], p.get('categoryId'), p.get('quantity', 0), i, json.dumps(p, ensure_ascii=False))
+                 for i, p in enumerate(data)]
+            )
+        elif name == 'categories':
+            self.conn.execute('DELETE FROM categories')
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO categories (id, position, data) VALUES (?, ?, ?)',
+                [(c['id'], i, json.dumps(c, ensure_ascii=False)) for i, c in enumerate(data)]
+            )
+        elif name == 'orders':
+            self.conn.execute('DELETE FROM orders')
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO orders (id, product_id, telegram_id, status, created_at, data) VALUES (?, ?, ?, ?, ?, ?)',
+                [self._order_row(o) for o in data]
+            )
+        elif name == 'admin_ids':
+            self.conn.execute('DELETE FROM admins')
+            self.conn.executemany('INSERT OR IGNORE INTO admins (telegram_id) VALUES (?)', [(int(i),) for i in data])
+        elif name == 'settings':
+            self.conn.execute('DELETE FROM settings')
+            self.conn.executemany(
+                'INSERT INTO settings (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items()]
+            )
+        else:
+            raise KeyError(name)
+
+    @staticmethod
+    def _order_row(order):
+        """Buyurtma qatori"""
+        return (order['id'], order.get('productId'), order.get('telegramId'), order.get('status'),
+                order.get('createdAt'), json.dumps(order, ensure_ascii=False))
+
+    def save(self, name, data):
+        """Ma'lumotni saqlash"""
+        with self._lock:
+            try:
+                self.conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._write(name, data)
+                    self.conn.execute('COMMIT')
+                except Exception:
+                    self.conn.execute('ROLLBACK')
+                    raise
+            except Exception as e:
+                logger.error(f"SQLite'ga saqlashda xatolik {name}: {e}")
+            self._bump(name)
+        self.notify('saved', name)
+
+    def stats(self, name):
+        """Yozuvlar statistikasi - indekslangan ustunlar bo'yicha COUNT (JsonBackend.stats bilan bir xil)"""
+        with self._lock:
+            if name == 'products':
+                count, available = self.conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(quantity > 0), 0) FROM products').fetchone()
+                return {'count': count, 'invalid': 0, 'errors': [], 'available': available}
+            if name == 'orders':
+                statuses = {status or 'unknown': count for status, count in
+                            self.conn.execute('SELECT status, COUNT(*) FROM orders GROUP BY status')}
+                return {'count': sum(statuses.values()), 'invalid': 0, 'errors': [], 'statuses': statuses}
+            count = self.conn.execute('SELECT COUNT(*) FROM categories').fetchone()[0]
+            return {'count': count, 'invalid': 0, 'errors': []}
+
+    def version(self, *names):
+        """Ma'lumotlar versiyasi"""
+        with self._lock:
+            self._check_external()
+            return max((self._versions.get(name, 0) for name in names), default=0)
+
+    def create_order(self, order):
+        """Buyurtma qo'shish va miqdorni kamaytirish - bitta O(1) tranzaksiya (tugagan bo'lsa None)"""
+        saved = self.create_orders([order])
+        return saved[0] if saved else None
+
+    def create_orders(self, orders):
+        """Buyurtmalar guruhini bitta tranzaksiyada saqlash
+
+        Miqdor shartli kamaytiriladi (quantity > 0) - tugagan mahsulotga
+        buyurtma rad etiladi, saqlangan buyurtmalar qaytariladi.
+        """
+        accepted = []
+        with self._lock:
+            self._check_external()
+            before = {name: self._versions[name] for name in ('orders', 'products')}
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                for order in orders:
+                    updated = self.conn.execute(
+                        'UPDATE products SET quantity = quantity - 1 WHERE id = ? AND quantity > 0',
+                        (order['productId'],)
+                    ).rowcount
+                    if not updated and self.conn.execute(
+                            'SELECT 1 FROM products WHERE id = ?', (order['productId'],)).fetchone():
+                        continue
+                    while True:
+                        try:
+                            self.conn.execute(
+                                'INSERT INTO orders (id, product_id, telegram_id, status, created_at, data) VALUES (?, ?, ?, ?, ?, ?)',
+                                self._order_row(order)
+                            )
+                            break
+                        except sqlite3.IntegrityError:
+                            # Bir millisekundda ikki buyurtma - ID ni siljitamiz
+                            order['id'] += 1
+                    accepted.append(order)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+            # Keshni butunlay tashlamasdan yangilash
+            if not accepted:
+                return accepted
+            if 'orders' in self._cache:
+                self._cache['orders'].extend(accepted)
+            if 'products' in self._cache:
+                by_id = {product['id']: product for product in self._cache['products']}
+                for order in accepted:
+                    product = by_id.get(order['productId'])
+                    if product is not None:
+                        product['quantity'] = max(product.get('quantity', 0) - 1, 0)
+            self._version_counter += 1
+            self._versions['orders'] = self._versions['products'] = self._version_counter
+            self._db_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            after = {name: self._versions[name] for name in ('orders', 'products')}
+        self.notify('orders_created', accepted, (before, after))
+        return accepted
+
+    def update_order_status(self, order_id, status):
+        """Buyurtma statusini o'zgartirish"""
+        with self._lock:
+            self._check_external()
+            before = {'orders': self._versions['orders']}
+            row = self.conn.execute('SELECT data FROM orders WHERE id = ?', (order_id,)).fetchone()
+            if row is None:
+                return None
+            order = json.loads(row[0])
+            order['status'] = status
+            self.conn.execute(
+                'UPDATE orders SET status = ?, data = ? WHERE id = ?',
+                (status, json.dumps(order, ensure_ascii=False), order_id)
+            )
+            self._bump('orders')
+            self._db_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            after = {'orders': self._versions['orders']}
+        self.notify('order_status', order, (before, after))
+        return order
+
+    def start_background(self):
+        """Orqa fon vazifalari (SQLite uchun kerak emas)"""
+
+    def close(self):
+        """Ulanishni yopish"""
+        with self._lock:
+            self.conn.close()
+
+def import_json(backend, data_dir):
+    """bot_data/*.json fayllaridan SQLite'ga bir martalik import"""
+    counts = {}
+    for name in TABLES:
+        path = os.path.join(data_dir, DATA_FILES[name])
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Import qilishda xatolik {path}: {e}")
+            continue
+        backend.save(name, data)
+        counts[name] = len(data)
+    return counts
+
+def export_json(backend, data_dir):
+    """SQLite'dan web panel o'qiydigan JSON fayllarni yaratish"""
+    os.makedirs(data_dir, exist_ok=True)
+    counts = {}
+    for name in TABLES:
+        data = backend.load(name, {} if name == 'settings' else [])
+        with open(os.path.join(data_dir, DATA_FILES[name]), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        counts[name] = len(data)
+    return counts
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('import', 'export'):
+        print("Foydalanish: python sqlite_storage.py import|export <data_dir> [db_path]")
+        return
+
+    command, data_dir = sys.argv[1], sys.argv[2]
+    db_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(data_dir, 'bot.db')
+    backend = SqliteBackend(db_path)
+
+    if command == 'import':
+        counts = import_json(backend, data_dir)
+        print(f"✅ Import qilindi: {counts}")
+    else:
+        counts = export_json(backend, data_dir)
+        print(f"✅ Eksport qilindi: {counts}")
+    backend.close()
+
+if __name__ == '__main__':
+    main()
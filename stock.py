@@ -0,0 +1,74 @@
+"""
+Mahsulot zaxirasini band qilish - oxirgi donani ikki kishi ololmaydi
+Tekshirish va band qilish bitta lock ostida bajariladi. Lock'lar mahsulot id
+bo'yicha bo'laklarga ajratilgan (lock striping), shuning uchun turli
+mahsulotlarga buyurtmalar bir-birini kutmaydi.
+
+Band qilingan miqdor buyurtma diskka yozilguncha saqlanadi va yozuvdan
+keyin (mahsulot miqdori kamaygach) bo'shatiladi.
+"""
+
+import os
+import threading
+
+# Lock bo'laklari soni
+STOCK_LOCK_STRIPES = int(os.getenv('STOCK_LOCK_STRIPES', '64'))
+
+class StockLedger:
+    """Mahsulot zaxirasi hisobi
+
+    lookup(product_id) mahsulotni qaytaradi (masalan DataIndex.product),
+    berilmasa backenddagi mahsulotlar ro'yxatidan id bo'yicha lug'at quriladi.
+    """
+
+    def __init__(self, backend, lookup=None, stripes=None):
+        self.backend = backend
+        self.lookup = lookup or self._lookup
+        self.stats = {'reserved': 0, 'sold_out': 0}
+        self._locks = [threading.Lock() for _ in range(stripes or STOCK_LOCK_STRIPES)]
+        self._reserved = {}
+        self._by_id = {}
+        self._by_id_version = None
+        self._by_id_lock = threading.Lock()
+
+    def _lookup(self, product_id):
+        """Mahsulot id bo'yicha (versiya o'zgarsa lug'at qayta quriladi)"""
+        with self._by_id_lock:
+            products = self.backend.load('products', [])
+            version = self.backend.version('products')
+            if version != self._by_id_version:
+                self._by_id = {product.get('id'): product for product in products}
+                self._by_id_version = version
+            return self._by_id.get(product_id)
+
+    def _lock_for(self, product_id):
+        """Mahsulotga tegishli lock bo'lagi"""
+        return self._locks[hash(product_id) % len(self._locks)]
+
+    def reserved(self, product_id):
+        """Band qilingan, lekin hali yozilmagan miqdor"""
+        return self._reserved.get(product_id, 0)
+
+    def available(self, product):
+        """Band qilinganlarni hisobga olgan holda mavjud miqdor"""
+        return max(product.get('quantity', 0) - self.reserved(product.get('id')), 0)
+
+    def reserve(self, product_id, count=1):
+        """Miqdorni band qilish - mahsulotni yoki (tugagan/topilmagan bo'lsa) None qaytaradi"""
+        with self._lock_for(product_id):
+            product = self.lookup(product_id)
+            if product is None or self.available(product) < count:
+                self.stats['sold_out'] += 1
+                return None
+            self._reserved[product_id] = self.reserved(product_id) + count
+            self.stats['reserved'] += count
+            return product
+
+    def release(self, product_id, count=1):
+        """Band qilingan miqdorni bo'shatish (buyurtma yozilgach yoki rad etilgach)"""
+        with self._lock_for(product_id):
+            left = self.reserved(product_id) - count
+            if left > 0:
+                self._reserved[product_id] = left
+            else:
+                self._reserved.pop(product_id, None)
@@ -0,0 +1,497 @@
+"""
+Ma'lumotlar ombori - JSON fayllar uchun xotiradagi kesh
+Fayl o'zgarsa (mtime/size/inode) kesh avtomatik yangilanadi,
+shuning uchun sync_data.py yoki web tomonidan qilingan o'zgarishlar ham ko'rinadi.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from json_stream import RecordStats, stream_stats
+
+logger = logging.getLogger(__name__)
+
+# Keshni o'chirish uchun: DATA_CACHE=0
+CACHE_ENABLED = os.getenv('DATA_CACHE', '1') != '0'
+
+# filename -> (signature, data)
+_cache = {}
+# filename -> versiya (har bir o'zgarishda oshadi)
+_versions = {}
+# filename -> oxirgi ko'rilgan fayl imzosi
+_signatures = {}
+_version_counter = 0
+_cache_stats = {'hits': 0, 'misses': 0}
+_lock = threading.RLock()
+# Disk o'qish/yozish kuzatuvchilari: callback(op, filename, seconds, nbytes)
+_io_observers = []
+
+def observe_io(callback):
+    """Diskdan o'qish va diskka yozishlarni kuzatish (masalan metrics.py)"""
+    _io_observers.append(callback)
+
+def record_io(op, filename, seconds, nbytes):
+    """I/O operatsiyasini kuzatuvchilarga yuborish"""
+    for callback in _io_observers:
+        try:
+            callback(op, filename, seconds, nbytes)
+        except Exception as e:
+            logger.error(f"I/O kuzatuvchisida xatolik: {e}")
+
+def file_signature(filename):
+    """Fayl imzosi: o'zgarishni aniqlash uchun inode, hajm, mtime va ctime"""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+def _bump_version(filename, signature):
+    """Fayl imzosi o'zgargan bo'lsa versiyasini oshirish"""
+    global _version_counter
+    if filename in _signatures and _signatures[filename] == signature:
+        return
+    _signatures[filename] = signature
+    _version_counter += 1
+    _versions[filename] = _version_counter
+
+def bump_version(name):
+    """Fayl bo'lmagan ma'lumot (masalan jurnal) versiyasini majburan oshirish"""
+    global _version_counter
+    with _lock:
+        _version_counter += 1
+        _versions[name] = _version_counter
+        _signatures.pop(name, None)
+
+def write_json_atomic(path, data, indent=2):
+    """Faylni vaqtinchalik fayl orqali yozish - yarim yozilgan fayl qolmaydi"""
+    start = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        if indent is None:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    record_io('save', path, time.perf_counter() - start, size)
+
+    kind = STATS_FILES.get(os.path.basename(path))
+    if kind is not None and isinstance(data, list):
+        signature = file_signature(path)
+        _write_stats(path, RecordStats(kind, data).as_dict(), signature)
+
+# Statistika fayli (<nom>.stats.json): yozishda yangilanadi, holat tekshiruvi faylni o'qimaydi
+STATS_FILES = {'products.json': 'products', 'categories.json': 'categories', 'orders.json': 'orders'}
+
+def stats_path(path):
+    """products.json -> products.stats.json"""
+    return f"{os.path.splitext(path)[0]}.stats.json"
+
+def _write_stats(path, stats, signature):
+    """Statistikani fayl imzosi bilan saqlash (kesh - fsync shart emas)"""
+    target = stats_path(path)
+    try:
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'signature': list(signature or []), 'stats': stats}, f, ensure_ascii=False)
+        os.replace(tmp_path, target)
+    except Exception as e:
+        logger.error(f"Statistika faylini yozishda xatolik {target}: {e}")
+
+def data_stats(path, save=True):
+    """Fayl statistikasi: soni, noto'g'ri yozuvlar, status/mavjudlik bo'yicha
+
+    Fayl oxirgi yozuvdan keyin o'zgarmagan bo'lsa statistika faylidan (O(1)),
+    aks holda fayl oqim bilan o'qiladi (xotira fayl hajmiga bog'liq emas).
+    save=False - sanalgan natija statistika fayliga yozilmaydi (faqat ko'rish uchun).
+    """
+    kind = STATS_FILES[os.path.basename(path)]
+    signature = file_signature(path)
+    if signature is None:
+        return RecordStats(kind).as_dict()
+    try:
+        with open(stats_path(path), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('signature') == list(signature):
+            return cached['stats']
+    except (OSError, ValueError, AttributeError):
+        pass
+    stats = stream_stats(path, kind)
+    if save:
+        _write_stats(path, stats, signature)
+    return stats
+
+def load_data(filename, default=None):
+    """Fayldan ma'lumotlarni yuklash (keshdan, agar fayl o'zgarmagan bo'lsa)
+
+    Qaytarilgan obyekt kesh bilan umumiy - uni o'zgartirgan kod
+    albatta save_data() ni chaqirishi kerak.
+    """
+    if default is None:
+        default = []
+
+    with _lock:
+        signature = file_signature(filename)
+        if signature is None:
+            _cache.pop(filename, None)
+            _bump_version(filename, None)
+            return default
+
+        entry = _cache.get(filename)
+        if CACHE_ENABLED and entry is not None and entry[0] == signature:
+            _cache_stats['hits'] += 1
+            return entry[1]
+
+        _cache_stats['misses'] += 1
+        start = time.perf_counter()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Ma'lumot yuklashda xatolik {filename}: {e}")
+            return default
+        record_io('load', filename, time.perf_counter() - start, signature[1])
+
+        if CACHE_ENABLED:
+            _cache[filename] = (signature, data)
+        _bump_version(filename, signature)
+        return data
+
+def save_data(filename, data):
+    """Ma'lumotlarni faylga saqlash va keshni yangilash"""
+    with _lock:
+        try:
+            write_json_atomic(filename, data)
+        except Exception as e:
+            logger.error(f"Ma'lumot saqlashda xatolik {filename}: {e}")
+            _cache.pop(filename, None)
+            _signatures.pop(filename, None)
+            return
+
+        signature = file_signature(filename)
+        if CACHE_ENABLED:
+            _cache[filename] = (signature, data)
+        _signatures.pop(filename, None)
+        _bump_version(filename, signature)
+
+def is_cached(filename):
+    """Fayl keshda bor va diskdagi nusxa bilan bir xilmi (faqat stat, o'qishsiz)"""
+    with _lock:
+        entry = _cache.get(filename)
+        return CACHE_ENABLED and entry is not None and entry[0] == file_signature(filename)
+
+def data_version(*filenames):
+    """Berilgan fayllar versiyasi - monoton o'suvchi son
+
+    Fayllardan birortasi o'zgarsa (saqlansa yoki tashqaridan yangilansa) oshadi.
+    Versiya fayl oxirgi marta yuklangan/saqlangan paytdagi holatni bildiradi.
+    """
+    with _lock:
+        return max((_versions.get(name, 0) for name in filenames), default=0)
+
+def cache_stats():
+    """Kesh statistikasi: hit/miss soni va keshdagi fayllar"""
+    with _lock:
+        total = _cache_stats['hits'] + _cache_stats['misses']
+        return {
+            'hits': _cache_stats['hits'],
+            'misses': _cache_stats['misses'],
+            'hit_ratio': _cache_stats['hits'] / total if total else 0.0,
+            'files': len(_cache),
+            'version': _version_counter
+        }
+
+def clear_cache():
+    """Keshni tozalash"""
+    with _lock:
+        _cache.clear()
+        _cache_stats['hits'] = 0
+        _cache_stats['misses'] = 0
+
+# Saqlash backendlari
+# STORAGE_BACKEND=json (standart) - bot_data/*.json fayllari
+# STORAGE_BACKEND=sqlite - bitta SQLite bazasi (WAL rejimi), sqlite_storage.py
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+
+# Ma'lumot nomi -> JSON fayl
+DATA_FILES = {
+    'products': 'products.json',
+    'categories': 'categories.json',
+    'orders': 'orders.json',
+    'settings': 'settings.json',
+    'admin_ids': 'admin_ids.json'
+}
+
+# Buyurtmalarni jurnal orqali saqlash (order_journal.py), o'chirish uchun: ORDER_JOURNAL=0
+ORDER_JOURNAL = os.getenv('ORDER_JOURNAL', '1') != '0'
+
+# Tarqatilayotgan hodisa yozuvidan oldingi va keyingi versiyalar (hodisa yozuvchi ipida tarqatiladi)
+_event_versions = threading.local()
+
+def advance_version(version, name, versions):
+    """Obunachi versiyasini hodisa yozuvi bo'yicha siljitish: (yangi versiya, o'zgarishni qo'llash kerakmi)
+
+    versions - backend.event_versions(). Obunachi yozuvdan oldingi holatda bo'lsa - keyingi
+    versiya va True; yozuv allaqachon hisobga olingan bo'lsa (shu orada qayta qurilgan) -
+    o'zgarishsiz va False; aks holda oraliqdagi boshqa o'zgarish o'tkazib yuborilgan -
+    None (keyingi o'qishda qayta qurish).
+    """
+    if version is None:
+        return None, False
+    before, after = versions or ({}, {})
+    if version == before.get(name):
+        return after.get(name), True
+    if version == after.get(name):
+        return version, False
+    return None, False
+
+class BackendEvents:
+    """Backend o'zgarishlari haqida obunachilarga xabar berish
+
+    Hodisalar: 'orders_created' (buyurtmalar ro'yxati), 'order_status' (buyurtma),
+    'saved' (to'liq almashtirilgan ma'lumot nomi).
+
+    Hodisa yozuv lock'idan keyin tarqatiladi - shu orada obunachi ma'lumotni qayta
+    o'qigan bo'lishi mumkin. Shuning uchun yozuvdan oldingi va keyingi versiyalar
+    event_versions() orqali beriladi (advance_version).
+    """
+
+    def subscribe(self, callback):
+        """callback(event, payload) ni ro'yxatga olish"""
+        self.listeners.append(callback)
+
+    def notify(self, event, payload, versions=None):
+        """Obunachilarga xabar berish - xatolik yozuvni to'xtatmaydi
+
+        versions - (oldingi, keyingi): yozuvdan oldin va keyin {nom: versiya}.
+        """
+        _event_versions.current = versions
+        try:
+            for callback in list(self.listeners):
+                try:
+                    callback(event, payload)
+                except Exception as e:
+                    logger.error(f"Backend hodisasini qayta ishlashda xatolik {event}: {e}")
+        finally:
+            _event_versions.current = None
+
+    def event_versions(self):
+        """Tarqatilayotgan hodisa yozuvidan oldingi va keyingi versiyalar yoki None"""
+        return getattr(_event_versions, 'current', None)
+
+class JsonBackend(BackendEvents):
+    """JSON fayllar backendi - har bir ma'lumot alohida faylda
+
+    Buyurtmalar orders.json ni qayta yozish o'rniga jurnalga qo'shiladi,
+    orders.json esa orqa fonda eksport qilinadi.
+    """
+
+    name = 'json'
+
+    def __init__(self, data_dir, journal=None):
+        self.data_dir = data_dir
+        self.listeners = []
+        os.makedirs(data_dir, exist_ok=True)
+
+        self.journal = None
+        if ORDER_JOURNAL if journal is None else journal:
+            from order_journal import OrderJournal
+            self.journal = OrderJournal(data_dir)
+
+    def path(self, name):
+        """Ma'lumot fayli yo'li"""
+        return os.path.join(self.data_dir, DATA_FILES[name])
+
+    def load(self, name, default=None):
+        """Ma'lumotni yuklash"""
+        if name == 'orders' and self.journal is not None:
+            return self.journal.orders()
+        return load_data(self.path(name), default)
+
+    def is_fresh(self, name):
+        """Ma'lumot xotirada va eskirmagan - load() diskni o'qimaydi"""
+        if name == 'orders' and self.journal is not None:
+            return self.journal.is_fresh()
+        return is_cached(self.path(name))
+
+    def save(self, name, data):
+        """Ma'lumotni saqlash"""
+        if name == 'orders' and self.journal is not None:
+            self.journal.replace(data)
+        else:
+            save_data(self.path(name), data)
+        self.notify('saved', name)
+
+    def stats(self, name):
+        """Yozuvlar statistikasi (data_stats) - buyurtmalar jurnali xotiradagi hisoblagichdan"""
+        if name == 'orders' and self.journal is not None:
+            return self.journal.record_stats()
+        return data_stats(self.path(name))
+
+    def version(self, *names):
+        """Ma'lumotlar versiyasi"""
+        versions = [data_version(*(self.path(name) for name in names if name != 'orders' or self.journal is None))]
+        if 'orders' in names and self.journal is not None:
+            versions.append(self.journal.version())
+        return max(versions)
+
+    def create_order(self, order):
+        """Buyurtmani saqlash va mahsulot miqdorini kamaytirish (tugagan bo'lsa None)"""
+        saved = self.create_orders([order])
+        return saved[0] if saved else None
+
+    def _unique_ids(self, orders, exists):
+        """Bir millisekundda kelgan buyurtmalar ID'sini siljitish"""
+        taken = set()
+        for order in orders:
+            while exists(order['id']) or order['id'] in taken:
+                order['id'] += 1
+            taken.add(order['id'])
+
+    def create_orders(self, new_orders):
+        """Buyurtmalar guruhini saqlash - orders va products bittadan yoziladi
+
+        Tugagan mahsulotga buyurtma rad etiladi, saqlangan buyurtmalar qaytariladi.
+        """
+        with _lock:
+            products = self.load('products', [])
+            by_id = {product['id']: product for product in products}
+            accepted = []
+            taken = {}
+            for order in new_orders:
+                product_id = order['productId']
+                product = by_id.get(product_id)
+                if product is not None:
+                    if product.get('quantity', 0) - taken.get(product_id, 0) <= 0:
+                        continue
+                    taken[product_id] = taken.get(product_id, 0) + 1
+                accepted.append(order)
+            if not accepted:
+                return accepted
+
+            if self.journal is None:
+                orders = self.load('orders', [])
+            before = {name: self.version(name) for name in ('orders', 'products')}
+            if self.journal is not None:
+                self._unique_ids(accepted, self.journal.has_order)
+                self.journal.append_orders(accepted)
+            else:
+                existing = {order.get('id') for order in orders}
+                self._unique_ids(accepted, existing.__contains__)
+                orders.extend(accepted)
+                save_data(self.path('orders'), orders)
+
+            for product_id, count in taken.items():
+                by_id[product_id]['quantity'] -= count
+            save_data(self.path('products'), products)
+            after = {name: self.version(name) for name in ('orders', 'products')}
+        self.notify('orders_created', accepted, (before, after))
+        return accepted
+
+    def update_order_status(self, order_id, status):
+        """Buyurtma statusini o'zgartirish"""
+        with _lock:
+            if self.journal is not None:
+                before = {'orders': self.version('orders')}
+                order = self.journal.set_status(order_id, status)
+            else:
+                orders = self.load('orders', [])
+                before = {'orders': self.version('orders')}
+                order = next((o for o in orders if o.get('id') == order_id), None)
+                if order is not None:
+                    order['status'] = status
+                    save_data(self.path('orders'), orders)
+            after = {'orders': self.version('orders')}
+        if order is not None:
+            self.notify('order_status', order, (before, after))
+        return order
+
+    def start_background(self):
+        """Orqa fon vazifalarini boshlash (jurnalni yig'ish)"""
+        if self.journal is not None:
+            self.journal.start_compactor()
+
+    def close(self):
+        """Backendni yopish"""
+        if self.journal is not None:
+            self.journal.close()
+
+def get_backend(data_dir, backend=None):
+    """STORAGE_BACKEND bo'yicha backend yaratish"""
+    backend = (backend or STORAGE_BACKEND).lower()
+    if backend == 'sqlite':
+        from sqlite_storage import SqliteBackend
+        return SqliteBackend(os.getenv('SQLITE_PATH', os.path.join(data_dir, 'bot.db')), data_dir)
+    if backend != 'json':
+        logger.error(f"Noma'lum STORAGE_BACKEND: {backend}, json ishlatiladi")
+    return JsonBackend(data_dir)
+
+# Asinxron fasad - bloklovchi I/O event loop'dan tashqarida
+STORAGE_IO_THREADS = int(os.getenv('STORAGE_IO_THREADS', '4'))
+
+class AsyncStorage:
+    """Backend ustidagi asinxron fasad
+
+    Disk I/O cheklangan thread pool'da bajariladi, shuning uchun bitta sekin
+    yozuv boshqa foydalanuvchilarning update'larini to'xtatib qo'ymaydi.
+    Ma'lumot xotirada va eskirmagan bo'lsa, u to'g'ridan-to'g'ri qaytariladi.
+    """
+
+    def __init__(self, backend, max_workers=None):
+        self.backend = backend
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or STORAGE_IO_THREADS,
+            thread_name_prefix='storage-io'
+        )
+        self._inflight = {}
+
+    async def run(self, func, *args, **kwargs):
+        """Bloklovchi funksiyani thread pool'da bajarish"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def _reload(self, name):
+        """Faylni thread pool'da o'qish - bir vaqtdagi so'rovlar bitta o'qishni kutadi"""
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self.run(self.backend.load, name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        await asyncio.shield(task)
+
+    async def load(self, name, default=None):
+        """Ma'lumotni yuklash"""
+        if not self.backend.is_fresh(name):
+            await self._reload(name)
+        return self.backend.load(name, default)
+
+    async def prefetch(self, *names):
+        """Eskirgan ma'lumotlarni oldindan yuklash - keyingi sinxron load() xotiradan oladi"""
+        stale = [name for name in names if not self.backend.is_fresh(name)]
+        if stale:
+            await asyncio.gather(*(self._reload(name) for name in stale))
+
+    async def save(self, name, data):
+        """Ma'lumotni saqlash"""
+        await self.run(self.backend.save, name, data)
+
+    async def create_orders(self, orders):
+        """Buyurtmalar guruhini saqlash"""
+        return await self.run(self.backend.create_orders, orders)
+
+    async def update_order_status(self, order_id, status):
+        """Buyurtma statusini o'zgartirish"""
+        return await self.run(self.backend.update_order_status, order_id, status)
+
+    def shutdown(self):
+        """Thread pool'ni to'xtatish"""
+        self.executor.shutdown(wait=True)
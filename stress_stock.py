@@ -0,0 +1,102 @@
+"""
+Zaxira uchun stress test - bir mahsulotga minglab bir vaqtdagi buyurtma
+Miqdori N bo'lgan mahsulotga ko'p buyurtma yuboriladi va aynan N tasi
+qabul qilinganini tekshiradi (ortiqcha sotuv yo'q).
+
+Ishlatish:
+    python stress_stock.py
+    python stress_stock.py --orders 5000 --quantity 100 --backend sqlite
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import storage
+from stock import StockLedger
+from indexes import DataIndex
+from group_commit import GroupCommitWriter
+from benchmark import generate_dataset, make_order
+
+def prepare(tmp, quantity, backend_name):
+    """Sintetik ma'lumotlar, birinchi mahsulot miqdori = quantity"""
+    generate_dataset(tmp, 100, 0, image_bytes=0)
+    storage.clear_cache()
+    backend = storage.get_backend(tmp, backend_name)
+    products = backend.load('products', [])
+    products[0]['quantity'] = quantity
+    backend.save('products', products)
+    return backend, products[0]['id']
+
+def check(backend, product_id, quantity, accepted):
+    """Natijani tekshirish: aynan quantity ta buyurtma, miqdor 0"""
+    product = next(p for p in backend.load('products', []) if p['id'] == product_id)
+    saved = sum(1 for o in backend.load('orders', []) if o['productId'] == product_id)
+    return accepted == quantity and saved == quantity and product['quantity'] == 0
+
+def run_async(order_count, quantity, backend_name):
+    """Bot yo'li: bitta event loop, StockLedger + GroupCommitWriter + thread pool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend, product_id = prepare(tmp, quantity, backend_name)
+        storage_io = storage.AsyncStorage(backend)
+        index = DataIndex(backend)
+        writer = GroupCommitWriter(backend, storage_io=storage_io,
+                                   stock=StockLedger(backend, lookup=index.product))
+
+        async def run():
+            results = await asyncio.gather(*(
+                writer.submit(make_order(i, product_id)) for i in range(order_count)
+            ))
+            return sum(1 for order in results if order is not None)
+
+        start = time.perf_counter()
+        accepted = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        ok = check(backend, product_id, quantity, accepted)
+        storage_io.shutdown()
+        backend.close()
+    return {'mode': 'async', 'backend': backend_name, 'orders': order_count, 'accepted': accepted,
+            'seconds': elapsed, 'per_sec': order_count / elapsed, 'ok': ok}
+
+def run_threads(order_count, quantity, backend_name, threads=16):
+    """To'g'ridan-to'g'ri backend.create_order - ko'p ipdan (backenddagi shartli kamaytirish)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend, product_id = prepare(tmp, quantity, backend_name)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(lambda i: backend.create_order(make_order(i, product_id)),
+                                    range(order_count)))
+        elapsed = time.perf_counter() - start
+        accepted = sum(1 for order in results if order is not None)
+        ok = check(backend, product_id, quantity, accepted)
+        backend.close()
+    return {'mode': f'threads{threads}', 'backend': backend_name, 'orders': order_count, 'accepted': accepted,
+            'seconds': elapsed, 'per_sec': order_count / elapsed, 'ok': ok}
+
+def main():
+    parser = argparse.ArgumentParser(description="Zaxira stress testi")
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--quantity', type=int, default=100)
+    parser.add_argument('--backend', nargs='+', default=['json', 'sqlite'], choices=['json', 'sqlite'])
+    args = parser.parse_args()
+
+    results = []
+    for backend_name in args.backend:
+        results.append(run_async(args.orders, args.quantity, backend_name))
+        results.append(run_threads(args.orders, args.quantity, backend_name))
+
+    print(f"{'backend':>8} {'mode':>9} {'orders':>7} {'accepted':>9} {'seconds':>8} {'orders/s':>9} {'ok':>4}")
+    for r in results:
+        print(f"{r['backend']:>8} {r['mode']:>9} {r['orders']:>7} {r['accepted']:>9} {r['seconds']:>8.3f} "
+              f"{r['per_sec']:>9.0f} {'✅' if r['ok'] else '❌':>4}")
+
+    if not all(r['ok'] for r in results):
+        print(f"❌ Ortiqcha yoki kam sotuv: kutilgan {args.quantity}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
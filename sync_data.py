@@ -1,13 +1,41 @@
 """
 Ma'lumotlar Sinxronizatsiyasi
 Web sayt va Telegram bot o'rtasida ma'lumotlarni sinxronlashtiradi
+
+Kuzatish rejimi (python sync_data.py watch): inotify (bo'lmasa stat bilan
+so'rov) orqali o'zgarishga darhol javob beradi, faqat mazmuni o'zgargan
+fayllarni nusxalaydi va holatni .sync_state.json da saqlaydi.
+
+Fayl ikki tomonda ham o'zgargan bo'lsa (products, categories, orders),
+oxirgi sinxronlangan nusxa (.sync_base/) asosida yozuvlar id bo'yicha
+uch tomonlama birlashtiriladi: ikkala tomonning o'zaro zid bo'lmagan
+o'zgarishlari saqlanadi, haqiqiy ziddiyatlar (bir maydon ikki tomonda
+turlicha o'zgargan) ko'rsatiladi.
+
+Nashr (python sync_data.py publish): bot_data dan statik sayt uchun
+minifikatsiya qilingan, siqilgan, xeshli nusxalar va manifest.json
+(data_publish.py). SYNC_PUBLISH=1 bo'lsa kuzatish rejimi har
+sinxronizatsiyadan keyin nashrni ham yangilaydi.
 """
 
 import json
 import os
+import sys
+import time
+import select
 import shutil
+import struct
+import ctypes
+import ctypes.util
+import hashlib
+import itertools
 from datetime import datetime
 
+from storage import JsonBackend, STATS_FILES, data_stats, file_signature, write_json_atomic
+from image_store import migrate_images
+from backup_store import BackupStore
+from data_publish import Publisher
+
 # Papkalar
 WEB_DATA_DIR = 'web_data'
 BOT_DATA_DIR = 'bot_data'
@@ -15,6 +43,16 @@ BOT_DATA_DIR = 'bot_data'
 # Fayllar
 FILES_TO_SYNC = ['products.json', 'categories.json', 'orders.json', 'settings.json']
 
+# Kuzatish rejimi: holat fayli, ketma-ket yozuvlarni birlashtirish (ms), so'rov oralig'i (s)
+SYNC_STATE_FILE = '.sync_state.json'
+SYNC_BASE_DIR = '.sync_base'
+SYNC_DEBOUNCE_MS = float(os.getenv('SYNC_DEBOUNCE_MS', '200'))
+SYNC_POLL_INTERVAL = float(os.getenv('SYNC_POLL_INTERVAL', '1'))
+SYNC_PUBLISH = os.getenv('SYNC_PUBLISH', '0') == '1'
+
+# Yozuvlar (id bo'yicha) birlashtiriladigan fayllar
+MERGE_FILES = ['products.json', 'categories.json', 'orders.json']
+
 def ensure_directories():
     """Papkalarni yaratish"""
     os.makedirs(WEB_DATA_DIR, exist_ok=True)
@@ -36,6 +74,11 @@ def sync_web_to_bot():
         else:
             print(f"⚠️ {filename} topilmadi")
     
+    # Web'dan kelgan base64 rasmlarni bot_data/images ga ko'chirish
+    changed = migrate_images(JsonBackend(BOT_DATA_DIR, journal=False), BOT_DATA_DIR)
+    if changed:
+        print(f"🖼 {changed} ta rasm bot_data/images ga ko'chirildi")
+    
     print("✅ Sinxronizatsiya tugadi!\n")
 
 def sync_bot_to_web():
@@ -56,79 +99,453 @@ def sync_bot_to_web():
     
     print("✅ Sinxronizatsiya tugadi!\n")
 
+def sync_both():
+    """Ikki tomonlama sinxronizatsiya - ikkala tomon o'zgargan bo'lsa yozuvlar birlashtiriladi"""
+    ensure_directories()
+    
+    print("🔄 Ikki tomonlama sinxronizatsiya boshlandi...")
+    
+    state = load_sync_state()
+    for filename in FILES_TO_SYNC:
+        direction = sync_file(filename, state)
+        print(f"✅ {filename}: {direction}" if direction else f"➖ {filename}: o'zgarish yo'q")
+    save_sync_state(state)
+    
+    print("✅ Sinxronizatsiya tugadi!\n")
+
 def create_backup():
-    """Backup yaratish"""
+    """Backup yaratish - o'zgargan fayllar siqilgan holda bir marta saqlanadi (backup_store.py)"""
     ensure_directories()
     
-    backup_dir = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    os.makedirs(backup_dir, exist_ok=True)
+    store = BackupStore()
+    print(f"💾 Backup yaratilmoqda: {store.root}")
     
-    print(f"💾 Backup yaratilmoqda: {backup_dir}")
+    snapshot_id = store.create([('web', WEB_DATA_DIR), ('bot', BOT_DATA_DIR)])
+    removed, deleted = store.prune()
     
-    # Web ma'lumotlarini backup qilish
-    for filename in FILES_TO_SYNC:
-        web_file = os.path.join(WEB_DATA_DIR, filename)
-        if os.path.exists(web_file):
-            shutil.copy2(web_file, os.path.join(backup_dir, f"web_{filename}"))
+    if snapshot_id:
+        print(f"✅ Backup yaratildi: {snapshot_id} ({store.stats['objects_written']} ta yangi obyekt, "
+              f"{store.stats['bytes_written'] / 1024:.0f} KB)")
+    else:
+        print("➖ Oxirgi backupdan keyin o'zgarish yo'q")
+    if removed:
+        print(f"🗑 Eskirgan backuplar o'chirildi: {removed} ta ({deleted} ta obyekt)")
+    print()
+
+def restore_backup():
+    """Backupdan bot_data ni tiklash"""
+    store = BackupStore()
+    snapshot_ids = store.snapshots()
+    if not snapshot_ids:
+        print("❌ Backuplar topilmadi\n")
+        return
     
-    # Bot ma'lumotlarini backup qilish
-    for filename in FILES_TO_SYNC:
-        bot_file = os.path.join(BOT_DATA_DIR, filename)
-        if os.path.exists(bot_file):
-            shutil.copy2(bot_file, os.path.join(backup_dir, f"bot_{filename}"))
+    print("⚠️ Tiklashdan oldin botni to'xtating - aks holda u tiklangan buyurtmalarni o'z ro'yxati bilan qayta yozadi")
+    for number, snapshot_id in enumerate(snapshot_ids[-10:], 1):
+        print(f"{number}. {snapshot_id}")
+    choice = input("Backup raqami (bo'sh - oxirgisi): ").strip()
+    recent = snapshot_ids[-10:]
+    if choice and (not choice.isdigit() or not 1 <= int(choice) <= len(recent)):
+        print("❌ Noto'g'ri tanlov\n")
+        return
+    snapshot_id = recent[int(choice) - 1] if choice else recent[-1]
     
-    print(f"✅ Backup yaratildi: {backup_dir}\n")
+    restored = store.restore(snapshot_id, 'bot', BOT_DATA_DIR)
+    print(f"✅ {snapshot_id}: {restored} ta fayl {BOT_DATA_DIR} ga tiklandi"
+          f" (snapshotda yo'q {store.stats['removed']} ta fayl o'chirildi)\n")
+
+def publish_data():
+    """Statik sayt uchun nashr: xeshli, siqilgan fayllar va manifest.json"""
+    ensure_directories()
+    
+    publisher = Publisher(BOT_DATA_DIR)
+    print(f"📤 Nashr qilinmoqda: {publisher.target_dir}")
+    changed = publisher.publish()
+    
+    if changed:
+        print(f"✅ Yangilandi: {', '.join(changed)}")
+    else:
+        print("➖ Oxirgi nashrdan keyin o'zgarish yo'q")
+    for name, entry in publisher.manifest().get('files', {}).items():
+        print(f"  📄 {entry['file']}: {entry['count']} ta, {entry['bytes']} bytes, gzip {entry['gz']} bytes")
+    print()
 
 def show_status():
-    """Ma'lumotlar holati"""
+    """Ma'lumotlar holati (soni statistika faylidan, fayl o'zgargan bo'lsa oqim bilan sanaladi)
+
+    Faqat o'qiladi - papkalarga statistika fayllari yozilmaydi.
+    """
     ensure_directories()
     
     print("📊 Ma'lumotlar holati:\n")
     
-    print("Web Sayt:")
-    for filename in FILES_TO_SYNC:
-        web_file = os.path.join(WEB_DATA_DIR, filename)
-        if os.path.exists(web_file):
-            size = os.path.getsize(web_file)
-            with open(web_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                count = len(data) if isinstance(data, list) else "N/A"
-            print(f"  ✅ {filename}: {size} bytes, {count} items")
+    for title, data_dir in (("Web Sayt:", WEB_DATA_DIR), ("\nTelegram Bot:", BOT_DATA_DIR)):
+        print(title)
+        for filename in FILES_TO_SYNC:
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                print(f"  ❌ {filename}: Mavjud emas")
+                continue
+            size = os.path.getsize(path)
+            if filename not in STATS_FILES:
+                print(f"  ✅ {filename}: {size} bytes, N/A items")
+                continue
+            try:
+                stats = data_stats(path, save=False)
+            except ValueError as e:
+                print(f"  ❌ {filename}: {size} bytes, buzilgan JSON ({e})")
+                continue
+            print(f"  ✅ {filename}: {size} bytes, {stats['count']} items")
+            if stats['invalid']:
+                print(f"     ⚠️ {stats['invalid']} ta noto'g'ri yozuv: {'; '.join(stats['errors'])}")
+    
+    print()
+
+# Kuzatish rejimi
+def load_sync_state():
+    """Oxirgi sinxronizatsiya holati: fayl -> xesh, imzolar"""
+    try:
+        with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sync_state(state):
+    """Holatni saqlash"""
+    write_json_atomic(SYNC_STATE_FILE, state)
+
+def file_hash(path):
+    """Fayl mazmuni xeshi (bo'laklab o'qiladi)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def side_hash(path, entry, side):
+    """Fayl xeshi - imzo (inode, hajm, mtime) o'zgarmagan bo'lsa fayl o'qilmaydi"""
+    signature = file_signature(path)
+    if signature is None:
+        entry.pop(f'{side}_signature', None)
+        entry.pop(f'{side}_hash', None)
+        return None
+    if entry.get(f'{side}_signature') != list(signature):
+        entry[f'{side}_signature'] = list(signature)
+        entry[f'{side}_hash'] = file_hash(path)
+    return entry[f'{side}_hash']
+
+def copy_atomic(source, target):
+    """Nusxalash: vaqtinchalik fayl + os.replace (o'quvchi yarim faylni ko'rmaydi)"""
+    tmp_path = f"{target}.tmp"
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+# Uch tomonlama birlashtirish
+_MISSING = object()
+
+def merge_value(base, web, bot):
+    """Bitta qiymat: (natija, ziddiyat) - faqat bir tomon o'zgargan bo'lsa o'sha olinadi"""
+    if web == bot:
+        return web, False
+    if web == base:
+        return bot, False
+    if bot == base:
+        return web, False
+    return web, True
+
+def merge_fields(base, web, bot):
+    """Ikki tomonda o'zgargan yozuv - maydonlar bo'yicha; ziddiyatda web qiymati"""
+    merged, conflicts = {}, []
+    for key in itertools.chain(web, (key for key in bot if key not in web)):
+        value, conflict = merge_value(base.get(key, _MISSING), web.get(key, _MISSING), bot.get(key, _MISSING))
+        if conflict:
+            conflicts.append(key)
+        if value is not _MISSING:
+            merged[key] = value
+    return merged, conflicts
+
+def index_records(records, key='id'):
+    """id -> yozuv; id siz yoki takrorlangan yozuv bo'lsa None (birlashtirib bo'lmaydi)"""
+    if not isinstance(records, list):
+        return None
+    by_id = {}
+    for record in records:
+        if not isinstance(record, dict) or record.get(key) is None or record[key] in by_id:
+            return None
+        by_id[record[key]] = record
+    return by_id
+
+def merge_records(base, web, bot, key='id'):
+    """Yozuvlar ro'yxatlarini id bo'yicha uch tomonlama birlashtirish - O(n)
+
+    Qaytaradi: (natija, ziddiyatlar) yoki None (ro'yxatlarni birlashtirib bo'lmaydi).
+    Ziddiyat: (id, maydonlar) yoki (id, None) - bir tomonda o'chirilgan, ikkinchisida
+    o'zgartirilgan yozuv (o'zgartirilgani saqlanadi). Tartib web bo'yicha, botdagi
+    yangi yozuvlar oxirida.
+    """
+    base_by_id = index_records(base, key)
+    web_by_id = index_records(web, key)
+    bot_by_id = index_records(bot, key)
+    if base_by_id is None or web_by_id is None or bot_by_id is None:
+        return None
+    
+    merged, conflicts = [], []
+    for record_id in itertools.chain(web_by_id, (i for i in bot_by_id if i not in web_by_id)):
+        base_record = base_by_id.get(record_id, _MISSING)
+        web_record = web_by_id.get(record_id, _MISSING)
+        bot_record = bot_by_id.get(record_id, _MISSING)
+        value, conflict = merge_value(base_record, web_record, bot_record)
+        if conflict:
+            if web_record is _MISSING or bot_record is _MISSING:
+                value = bot_record if web_record is _MISSING else web_record
+                conflicts.append((record_id, None))
+            else:
+                value, fields = merge_fields({} if base_record is _MISSING else base_record,
+                                             web_record, bot_record)
+                if fields:
+                    conflicts.append((record_id, fields))
+        if value is not _MISSING:
+            merged.append(value)
+    return merged, conflicts
+
+def load_json(path, default=None):
+    """JSON faylni o'qish (yo'q yoki buzilgan bo'lsa default)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_base(filename, source, digest, entry):
+    """Oxirgi sinxronlangan nusxa - keyingi birlashtirish uchun asos"""
+    if filename in MERGE_FILES and source is not None and \
+            (entry.get('hash') != digest or not os.path.exists(os.path.join(SYNC_BASE_DIR, filename))):
+        os.makedirs(SYNC_BASE_DIR, exist_ok=True)
+        copy_atomic(source, os.path.join(SYNC_BASE_DIR, filename))
+    entry['hash'] = digest
+
+def merge_file(filename, entry, web_file, bot_file):
+    """Ikki tomonda o'zgargan faylni yozuvlar bo'yicha birlashtirib ikkala tomonga yozish
+
+    Qaytaradi: True yoki None (birlashtirib bo'lmadi yoki o'qish paytida fayl o'zgardi).
+    """
+    signatures = (file_signature(web_file), file_signature(bot_file))
+    web = load_json(web_file)
+    bot = load_json(bot_file)
+    base = load_json(os.path.join(SYNC_BASE_DIR, filename), [])
+    result = merge_records(base, web, bot)
+    if result is None:
+        return None
+    merged, conflicts = result
+    
+    # O'qishdan keyin yozilgan bo'lsa - uni bosib ketmaslik, keyingi hodisada qayta birlashtiriladi
+    if (file_signature(web_file), file_signature(bot_file)) != signatures:
+        return None
+    write_json_atomic(bot_file, merged)
+    copy_atomic(bot_file, web_file)
+    
+    digest = file_hash(bot_file)
+    for side, path in (('web', web_file), ('bot', bot_file)):
+        entry[f'{side}_signature'] = list(file_signature(path))
+        entry[f'{side}_hash'] = digest
+    save_base(filename, bot_file, digest, entry)
+    
+    for record_id, fields in conflicts:
+        if fields is None:
+            print(f"⚠️ {filename} id={record_id}: bir tomonda o'chirilgan, ikkinchisida o'zgartirilgan - saqlandi")
         else:
-            print(f"  ❌ {filename}: Mavjud emas")
+            print(f"⚠️ {filename} id={record_id}: {', '.join(fields)} ikki tomonda o'zgargan - web qiymati olindi")
+    entry['conflicts'] = [[record_id, fields] for record_id, fields in conflicts][-50:]
+    return True
+
+def sync_file(filename, state):
+    """Bitta faylni sinxronlash: qaysi tomon o'zgargan bo'lsa o'shani nusxalash,
+    ikkalasi o'zgargan bo'lsa yozuvlar bo'yicha birlashtirish
+
+    Qaytaradi: 'web->bot', 'bot->web', 'merge' yoki None (o'zgarish yo'q).
+    """
+    web_file = os.path.join(WEB_DATA_DIR, filename)
+    bot_file = os.path.join(BOT_DATA_DIR, filename)
+    entry = state.setdefault(filename, {})
     
-    print("\nTelegram Bot:")
-    for filename in FILES_TO_SYNC:
-        bot_file = os.path.join(BOT_DATA_DIR, filename)
-        if os.path.exists(bot_file):
-            size = os.path.getsize(bot_file)
-            with open(bot_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                count = len(data) if isinstance(data, list) else "N/A"
-            print(f"  ✅ {filename}: {size} bytes, {count} items")
+    web_hash = side_hash(web_file, entry, 'web')
+    bot_hash = side_hash(bot_file, entry, 'bot')
+    if web_hash == bot_hash:
+        save_base(filename, web_file if web_hash else None, web_hash, entry)
+        return None
+    
+    base = entry.get('hash')
+    if bot_hash is None or (web_hash is not None and bot_hash == base):
+        direction = 'web->bot'
+    elif web_hash is None or web_hash == base:
+        direction = 'bot->web'
+    elif filename in MERGE_FILES and merge_file(filename, entry, web_file, bot_file):
+        direction = 'merge'
+    else:
+        # Birlashtirib bo'lmaydi (sozlamalar, id siz yozuvlar) - eski rejimdagidek web ustun
+        print(f"⚠️ {filename} ikki tomonda ham o'zgargan, web nusxasi olinadi")
+        direction = 'web->bot'
+    
+    if direction != 'merge':
+        if direction == 'web->bot':
+            source_hash, target_side, source_file, target_file = web_hash, 'bot', web_file, bot_file
         else:
-            print(f"  ❌ {filename}: Mavjud emas")
+            source_hash, target_side, source_file, target_file = bot_hash, 'web', bot_file, web_file
+        copy_atomic(source_file, target_file)
+        
+        # Nusxa manba bilan bir xil - uni qayta o'qib xeshlash shart emas
+        entry[f'{target_side}_signature'] = list(file_signature(target_file))
+        entry[f'{target_side}_hash'] = source_hash
+        save_base(filename, source_file, source_hash, entry)
+    entry['synced_at'] = datetime.now().isoformat()
     
-    print()
+    if direction != 'bot->web' and filename == 'products.json':
+        changed = migrate_images(JsonBackend(BOT_DATA_DIR, journal=False), BOT_DATA_DIR)
+        if changed:
+            print(f"🖼 {changed} ta rasm bot_data/images ga ko'chirildi")
+            # Rasmlar havolaga almashgan nusxani web'ga qaytarish
+            sync_file(filename, state)
+    return direction
 
-def auto_sync():
-    """Avtomatik sinxronizatsiya (har 10 sekundda)"""
-    import time
+# inotify (Linux) - ctypes orqali, qo'shimcha kutubxonasiz
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+_EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Papkalardagi fayl o'zgarishlarini inotify orqali kuzatish"""
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+        for directory in directories:
+            if libc.inotify_add_watch(self.fd, os.path.abspath(directory).encode(), mask) < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+
+    def wait(self, timeout):
+        """O'zgargan fayl nomlari (timeout soniya kutiladi, None - cheksiz)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        names = set()
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace'))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """inotify bo'lmasa: har SYNC_POLL_INTERVAL soniyada faqat stat (fayl o'qilmaydi)"""
+
+    def __init__(self, directories, interval=None):
+        self.directories = directories
+        self.interval = interval or SYNC_POLL_INTERVAL
+        self.signatures = self._scan()
+
+    def _scan(self):
+        return {(directory, filename): file_signature(os.path.join(directory, filename))
+                for directory in self.directories for filename in FILES_TO_SYNC}
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._scan()
+        changed = {filename for (directory, filename), signature in current.items()
+                   if signature != self.signatures.get((directory, filename))}
+        self.signatures = current
+        return changed
+
+    def close(self):
+        pass
+
+def make_watcher(directories):
+    """inotify, ishlamasa - stat bilan so'rov"""
+    try:
+        return InotifyWatcher(directories)
+    except (OSError, AttributeError) as e:
+        print(f"⚠️ inotify ishlamadi ({e}), har {SYNC_POLL_INTERVAL} soniyada tekshiriladi")
+        return PollingWatcher(directories)
+
+def watch_sync(stop=None, debounce_ms=None):
+    """Kuzatish rejimi: o'zgarishdan keyin (debounce) faqat o'zgargan faylni sinxronlash
+
+    stop - threading.Event (berilsa, o'rnatilganda to'xtaydi).
+    """
+    ensure_directories()
+    debounce = (SYNC_DEBOUNCE_MS if debounce_ms is None else debounce_ms) / 1000
+    state = load_sync_state()
+    
+    # Ishga tushganda: faqat oxirgi sinxronizatsiyadan keyin o'zgarganlar
+    for filename in FILES_TO_SYNC:
+        direction = sync_file(filename, state)
+        if direction:
+            print(f"✅ {filename}: {direction}")
+    save_sync_state(state)
     
-    print("🔄 Avtomatik sinxronizatsiya rejimi")
+    watcher = make_watcher([WEB_DATA_DIR, BOT_DATA_DIR])
+    pending = {}
+    try:
+        while stop is None or not stop.is_set():
+            now = time.monotonic()
+            timeout = max(min(pending.values()) - now, 0) if pending else None
+            if stop is not None:
+                timeout = 0.5 if timeout is None else min(timeout, 0.5)
+            for filename in watcher.wait(timeout):
+                if filename in FILES_TO_SYNC:
+                    pending[filename] = time.monotonic() + debounce
+            
+            now = time.monotonic()
+            due = [filename for filename, deadline in pending.items() if deadline <= now]
+            for filename in due:
+                del pending[filename]
+                try:
+                    direction = sync_file(filename, state)
+                except Exception as e:
+                    print(f"❌ {filename} sinxronlashda xatolik: {e}")
+                    continue
+                if direction:
+                    print(f"✅ {datetime.now().strftime('%H:%M:%S')} {filename}: {direction}")
+            if due:
+                save_sync_state(state)
+                if SYNC_PUBLISH:
+                    try:
+                        Publisher(BOT_DATA_DIR).publish()
+                    except Exception as e:
+                        print(f"❌ Nashr qilishda xatolik: {e}")
+    finally:
+        watcher.close()
+
+def auto_sync():
+    """Avtomatik sinxronizatsiya - o'zgarishlarni kuzatish rejimi"""
+    print("🔄 Avtomatik sinxronizatsiya rejimi (o'zgarishlar kuzatiladi)")
     print("Ctrl+C bilan to'xtatish mumkin\n")
     
     try:
-        while True:
-            sync_web_to_bot()
-            sync_bot_to_web()
-            print(f"⏰ Keyingi sinxronizatsiya 10 sekunddan keyin...")
-            time.sleep(10)
+        watch_sync()
     except KeyboardInterrupt:
         print("\n👋 Sinxronizatsiya to'xtatildi")
 
 def main():
     """Asosiy menyu"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        auto_sync()
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'publish':
+        publish_data()
+        return
+    
     print("=" * 50)
     print("📦 Ma'lumotlar Sinxronizatsiya Tizimi")
     print("=" * 50)
@@ -142,24 +559,29 @@ def main():
         print("4. Backup yaratish")
         print("5. Holat ko'rsatish")
         print("6. Avtomatik sinxronizatsiya")
+        print("7. Backupdan tiklash")
+        print("8. Statik sayt uchun nashr")
         print("0. Chiqish")
         print()
         
-        choice = input("Tanlov (0-6): ").strip()
+        choice = input("Tanlov (0-8): ").strip()
         
         if choice == '1':
             sync_web_to_bot()
         elif choice == '2':
             sync_bot_to_web()
         elif choice == '3':
-            sync_web_to_bot()
-            sync_bot_to_web()
+            sync_both()
         elif choice == '4':
             create_backup()
         elif choice == '5':
             show_status()
         elif choice == '6':
             auto_sync()
+        elif choice == '7':
+            restore_backup()
+        elif choice == '8':
+            publish_data()
         elif choice == '0':
             print("👋 Xayr!")
             break
@@ -3,12 +3,35 @@ Telegram Bot - Render.com uchun optimizatsiya qilingan
 24/7 ishlash uchun disk storage bilan
 """
 
+import io
 import os
-import json
+import re
+import asyncio
 import logging
-from datetime import datetime
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from datetime import datetime, timedelta
+from telegram import (
+    Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton,
+    InlineQueryResultArticle, InputTextMessageContent
+)
+from telegram.ext import (
+    Application, CommandHandler, CallbackQueryHandler, MessageHandler, InlineQueryHandler, TypeHandler,
+    ExtBot, filters, ContextTypes
+)
+from storage import get_backend, cache_stats, AsyncStorage
+from group_commit import GroupCommitWriter
+from stock import StockLedger
+from indexes import DataIndex
+from search import SearchIndex, tokenize
+from reports import OrderRollups
+from render_cache import RenderCache
+import metrics
+import data_api
+from metrics import instrument
+from profiler import profiler
+from image_store import (
+    migrate_images, is_data_uri, is_image_ref, store_data_uri, thumbnail,
+    cached_file_id, remember_file_id, forget_file_id, photo_stats
+)
 
 # Logging sozlash
 logging.basicConfig(
@@ -17,26 +40,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Ma'lumotlar bazasi fayllari - Render.com disk storage
+# Ma'lumotlar bazasi - Render.com disk storage
+# STORAGE_BACKEND=sqlite bo'lsa bot_data/bot.db ishlatiladi (storage.py)
 DATA_DIR = os.getenv('DATA_DIR', '/opt/render/project/src/bot_data')
-PRODUCTS_FILE = os.path.join(DATA_DIR, 'products.json')
-CATEGORIES_FILE = os.path.join(DATA_DIR, 'categories.json')
-ORDERS_FILE = os.path.join(DATA_DIR, 'orders.json')
-SETTINGS_FILE = os.path.join(DATA_DIR, 'settings.json')
-ADMIN_ID_FILE = os.path.join(DATA_DIR, 'admin_ids.json')
 
 # Ma'lumotlar bazasi papkasini yaratish
 os.makedirs(DATA_DIR, exist_ok=True)
+backend = get_backend(DATA_DIR)
+# Disk I/O thread pool'da - event loop bloklanmaydi
+storage_io = AsyncStorage(backend)
+index = DataIndex(backend)
+search_index = SearchIndex(backend)
+stock = StockLedger(backend, lookup=index.product)
+# /report uchun kunlik buyurtma yig'indilari
+rollups = OrderRollups(backend, lookup=index.product)
+order_writer = GroupCommitWriter(backend, storage_io=storage_io, stock=stock)
+render_cache = RenderCache()
+# Inline so'rovlar alohida keshda - tez-tez keladigan so'rovlar katalog ko'rinishlarini chiqarib yubormasin
+inline_cache = RenderCache(int(os.getenv('INLINE_CACHE_SIZE', '1024')))
+
+# Metrikalar (metrics.py): fayl I/O, buyurtmalar, keshlar
+metrics.watch_backend(backend)
+metrics.add_cache('render', lambda: (render_cache.stats['hits'], render_cache.stats['misses']))
+metrics.add_cache('inline', lambda: (inline_cache.stats['hits'], inline_cache.stats['misses']))
+metrics.add_cache('photo_file_id', lambda: (photo_stats['cache_hits'], photo_stats['uploads']))
 
 # Admin ID'lar
+class MetricsBot(ExtBot):
+    """Bot - yuborish xatolari metrics.send_failures da metod va qabul qiluvchi (admin/chat) bo'yicha hisoblanadi"""
+
+    async def _counted(self, method, send, args, kwargs):
+        try:
+            return await send(*args, **kwargs)
+        except Exception:
+            chat_id = kwargs.get('chat_id', args[0] if args else None)
+            metrics.send_failures.inc(1, method, 'admin' if chat_id in ADMIN_IDS else 'chat')
+            raise
+
+    async def send_message(self, *args, **kwargs):
+        return await self._counted('send_message', super().send_message, args, kwargs)
+
+    async def send_photo(self, *args, **kwargs):
+        return await self._counted('send_photo', super().send_photo, args, kwargs)
+
+    async def send_document(self, *args, **kwargs):
+        return await self._counted('send_document', super().send_document, args, kwargs)
+
 def load_admin_ids():
     """Admin ID'larni yuklash"""
-    try:
-        if os.path.exists(ADMIN_ID_FILE):
-            with open(ADMIN_ID_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Admin IDs yuklashda xatolik: {e}")
+    admin_ids = backend.load('admin_ids', [])
+    if admin_ids:
+        return admin_ids
     
     # Default admin ID (muhit o'zgaruvchisidan)
     admin_ids_str = os.getenv('ADMIN_IDS', '')
@@ -44,42 +98,22 @@ def load_admin_ids():
         return [int(id.strip()) for id in admin_ids_str.split(',') if id.strip()]
     return []
 
-def save_admin_ids(admin_ids):
+async def save_admin_ids(admin_ids):
     """Admin ID'larni saqlash"""
-    try:
-        with open(ADMIN_ID_FILE, 'w', encoding='utf-8') as f:
-            json.dump(admin_ids, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Admin IDs saqlashda xatolik: {e}")
+    await storage_io.save('admin_ids', list(admin_ids))
 
 ADMIN_IDS = load_admin_ids()
 
-# Ma'lumotlar bazasi funksiyalari
-def load_data(filename, default=None):
-    """Fayldan ma'lumotlarni yuklash"""
-    if default is None:
-        default = []
-    
-    try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Ma'lumot yuklashda xatolik {filename}: {e}")
-    
-    return default
-
-def save_data(filename, data):
-    """Ma'lumotlarni faylga saqlash"""
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Ma'lumot saqlashda xatolik {filename}: {e}")
+# Ma'lumotlar bazasi funksiyalari (storage.py - xotiradagi kesh bilan)
+def get_catalog_version():
+    """Katalog versiyasi - mahsulotlar yoki kategoriyalar o'zgarsa oshadi"""
+    # Fayl tashqaridan o'zgargan bo'lsa, versiya shu yerda yangilanadi
+    index.refresh('products', 'categories')
+    return backend.version('products', 'categories')
 
 def get_products():
     """Mahsulotlarni olish"""
-    return load_data(PRODUCTS_FILE, [])
+    return backend.load('products', [])
 
 def get_categories():
     """Kategoriyalarni olish"""
@@ -90,15 +124,19 @@ def get_categories():
         {'id': 4, 'name': 'Kitoblar', 'description': 'Kitoblar va nashrlar', 'icon': '📚', 'createdAt': datetime.now().isoformat()}
     ]
     
-    categories = load_data(CATEGORIES_FILE, default_categories)
+    categories = backend.load('categories', default_categories)
     if not categories:
-        save_data(CATEGORIES_FILE, default_categories)
+        backend.save('categories', default_categories)
         categories = default_categories
     return categories
 
 def get_orders():
     """Buyurtmalarni olish"""
-    return load_data(ORDERS_FILE, [])
+    return backend.load('orders', [])
+
+async def get_stats(*names):
+    """Yozuvlar soni va taqsimoti (backend.stats) - fayl o'zgargan bo'lsa thread pool'da o'qiladi"""
+    return await asyncio.gather(*(storage_io.run(backend.stats, name) for name in names))
 
 def get_settings():
     """Sozlamalarni olish"""
@@ -110,15 +148,14 @@ def get_settings():
         'contact_info': '📞 Bog\'lanish:\nTelefon: +998 99 978 87 80\nEmail: fayziev978@mail.ru'
     }
     
-    settings = load_data(SETTINGS_FILE, default_settings)
+    settings = backend.load('settings', default_settings)
     if not settings:
-        save_data(SETTINGS_FILE, default_settings)
+        backend.save('settings', default_settings)
         settings = default_settings
     return settings
 
-def add_order(order_data):
-    """Yangi buyurtma qo'shish"""
-    orders = get_orders()
+async def add_order(order_data):
+    """Yangi buyurtma qo'shish (guruhli yozuv - group_commit.py), mahsulot tugagan bo'lsa None"""
     order = {
         'id': int(datetime.now().timestamp() * 1000),
         'productId': order_data['productId'],
@@ -128,20 +165,75 @@ def add_order(order_data):
         'createdAt': datetime.now().isoformat(),
         'status': 'pending'
     }
-    orders.append(order)
-    save_data(ORDERS_FILE, orders)
     
-    # Mahsulot miqdorini kamaytirish
-    products = get_products()
-    for product in products:
-        if product['id'] == order_data['productId']:
-            product['quantity'] = product.get('quantity', 0) - 1
-            if product['quantity'] < 0:
-                product['quantity'] = 0
-            break
-    save_data(PRODUCTS_FILE, products)
+    # Buyurtmani saqlash va mahsulot miqdorini kamaytirish
+    return await order_writer.submit(order)
+
+# Telegram caption limiti
+CAPTION_LIMIT = 1024
+
+# Sahifadagi elementlar soni
+PRODUCTS_PAGE_SIZE = int(os.getenv('PRODUCTS_PAGE_SIZE', '10'))
+ORDERS_PAGE_SIZE = int(os.getenv('ORDERS_PAGE_SIZE', '10'))
+# Inline rejim: bitta javobdagi natijalar (Telegram chegarasi 50) va Telegram serveridagi kesh (s)
+INLINE_PAGE_SIZE = 20
+INLINE_CACHE_TIME = int(os.getenv('INLINE_CACHE_TIME', '30'))
+
+def page_count(total, page_size):
+    """Sahifalar soni"""
+    return max((total + page_size - 1) // page_size, 1)
+
+def pagination_row(prefix, page, pages):
+    """Oldingi/keyingi tugmalari - callback_data: <prefix>_<page>"""
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("⬅️ Oldingi", callback_data=f"{prefix}_{page - 1}"))
+    if pages > 1:
+        row.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data="noop"))
+    if page < pages - 1:
+        row.append(InlineKeyboardButton("Keyingi ➡️", callback_data=f"{prefix}_{page + 1}"))
+    return row
+
+async def edit_or_replace(query, text, reply_markup=None, parse_mode=None):
+    """Xabarni tahrirlash - rasmli xabar matnga tahrirlanmaydi, shuning uchun almashtiriladi"""
+    if query.message and query.message.photo:
+        await query.message.reply_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        await query.delete_message()
+    else:
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+
+async def send_product_photo(query, product, caption, reply_markup):
+    """Mahsulot rasmini yuborish - avval yuklangan bo'lsa faqat file_id bilan"""
+    ref = product.get('image')
+    if is_data_uri(ref):
+        ref = await storage_io.run(store_data_uri, DATA_DIR, ref)
+    if not is_image_ref(ref) or len(caption) > CAPTION_LIMIT:
+        return False
+    
+    file_id = await storage_io.run(cached_file_id, DATA_DIR, ref)
+    if file_id:
+        try:
+            await query.message.reply_photo(photo=file_id, caption=caption, reply_markup=reply_markup, parse_mode='Markdown')
+            photo_stats['cache_hits'] += 1
+            return True
+        except Exception as e:
+            logger.error(f"Keshdagi file_id ishlamadi, rasm qayta yuklanadi: {e}")
+            await storage_io.run(forget_file_id, DATA_DIR, ref)
     
-    return order
+    try:
+        photo = await storage_io.run(thumbnail, DATA_DIR, ref)
+        if photo is None:
+            return False
+        sent = await query.message.reply_photo(photo=photo, caption=caption, reply_markup=reply_markup, parse_mode='Markdown')
+    except Exception as e:
+        photo_stats['errors'] += 1
+        logger.error(f"Mahsulot rasmini yuborishda xatolik: {e}")
+        return False
+    
+    photo_stats['uploads'] += 1
+    live_refs = [p.get('image') for p in get_products()]
+    await storage_io.run(remember_file_id, DATA_DIR, ref, sent.photo[-1].file_id, live_refs)
+    return True
 
 # Bot buyruqlari
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -164,13 +256,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await update.message.reply_text(welcome_message, reply_markup=reply_markup)
 
-async def products(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Mahsulotlar kategoriyalarini ko'rsatish"""
+# Katalog ko'rinishlari (render_cache orqali keshlanadi)
+def build_categories_view():
+    """Kategoriyalar ro'yxati: (matn, klaviatura)"""
     categories = get_categories()
     
     if not categories:
-        await update.message.reply_text("Hozircha kategoriyalar mavjud emas.")
-        return
+        return "Hozircha kategoriyalar mavjud emas.", None
     
     keyboard = []
     for category in categories:
@@ -180,71 +272,46 @@ async def products(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )])
     
     keyboard.append([InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_main")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await update.message.reply_text(
-        "📦 *Kategoriyalar:*\n\nQaysi kategoriyani ko'rmoqchisiz?",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+    return "📦 *Kategoriyalar:*\n\nQaysi kategoriyani ko'rmoqchisiz?", InlineKeyboardMarkup(keyboard)
 
-async def show_category_products(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Tanlangan kategoriya mahsulotlarini ko'rsatish"""
-    query = update.callback_query
-    await query.answer()
-    
-    category_id = int(query.data.split('_')[1])
-    products = get_products()
-    categories = get_categories()
-    
-    category = next((cat for cat in categories if cat['id'] == category_id), None)
+def build_category_view(category_id, page):
+    """Kategoriya mahsulotlari sahifasi: (matn, klaviatura)"""
+    category = index.category(category_id)
     if not category:
-        await query.edit_message_text("Kategoriya topilmadi.")
-        return
+        return "Kategoriya topilmadi.", None
     
-    category_products = [p for p in products if p.get('categoryId') == category_id and p.get('quantity', 0) > 0]
+    category_products = index.category_products(category_id)
     
     if not category_products:
         keyboard = [[InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_categories")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(
-            f"*{category['name']}* kategoriyasida hozircha mahsulotlar yo'q.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
-        return
+        return f"*{category['name']}* kategoriyasida hozircha mahsulotlar yo'q.", InlineKeyboardMarkup(keyboard)
+    
+    pages = page_count(len(category_products), PRODUCTS_PAGE_SIZE)
+    page = min(max(page, 0), pages - 1)
+    start = page * PRODUCTS_PAGE_SIZE
     
     keyboard = []
-    for product in category_products:
+    for product in category_products[start:start + PRODUCTS_PAGE_SIZE]:
         keyboard.append([InlineKeyboardButton(
             f"{product['name']} - {format_price(product['price'])} so'm",
             callback_data=f"product_{product['id']}"
         )])
     
+    nav_row = pagination_row(f"category_{category_id}", page, pages)
+    if nav_row:
+        keyboard.append(nav_row)
     keyboard.append([InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_categories")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await query.edit_message_text(
-        f"*{category['name']}*\n\n{category.get('description', '')}\n\nMahsulotlar:",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+    message = f"*{category['name']}*\n\n{category.get('description', '')}\n\nMahsulotlar:"
+    return message, InlineKeyboardMarkup(keyboard)
 
-async def show_product_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Mahsulot tafsilotlarini ko'rsatish"""
-    query = update.callback_query
-    await query.answer()
-    
-    product_id = int(query.data.split('_')[1])
-    products = get_products()
-    categories = get_categories()
-    
-    product = next((p for p in products if p['id'] == product_id), None)
+def build_product_view(product_id):
+    """Mahsulot tafsilotlari: (mahsulot, matn, klaviatura)"""
+    product = index.product(product_id)
     if not product:
-        await query.edit_message_text("Mahsulot topilmadi.")
-        return
+        return None, "Mahsulot topilmadi.", None
     
-    category = next((cat for cat in categories if cat['id'] == product.get('categoryId')), None)
+    category = index.category(product.get('categoryId'))
     category_name = category['name'] if category else "Kategoriyasiz"
     
     message = (
@@ -261,9 +328,88 @@ async def show_product_details(update: Update, context: ContextTypes.DEFAULT_TYP
         [InlineKeyboardButton("✅ Buyurtma berish", callback_data=f"order_{product_id}")],
         [InlineKeyboardButton("🔙 Orqaga", callback_data=f"category_{product.get('categoryId')}")]
     ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    return product, message, InlineKeyboardMarkup(keyboard)
+
+def build_search_view(query, page):
+    """Qidiruv natijalari sahifasi: (matn, klaviatura) yoki hech narsa topilmasa (None, None)"""
+    results, total = search_index.search(query, page * PRODUCTS_PAGE_SIZE, PRODUCTS_PAGE_SIZE)
+    if not total:
+        return None, None
+    
+    pages = page_count(total, PRODUCTS_PAGE_SIZE)
+    if page >= pages:
+        page = pages - 1
+        results, total = search_index.search(query, page * PRODUCTS_PAGE_SIZE, PRODUCTS_PAGE_SIZE)
+    
+    keyboard = []
+    for product in results:
+        stock = f"{format_price(product['price'])} so'm" if product.get('quantity', 0) > 0 else "tugagan"
+        keyboard.append([InlineKeyboardButton(
+            f"{product['name']} - {stock}",
+            callback_data=f"product_{product['id']}"
+        )])
+    
+    nav_row = pagination_row("search", page, pages)
+    if nav_row:
+        keyboard.append(nav_row)
+    keyboard.append([InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_categories")])
+    
+    return f"🔍 *{query}* bo'yicha {total} ta mahsulot topildi:", InlineKeyboardMarkup(keyboard)
+
+def render_view(view, *args):
+    """Ko'rinishni keshdan olish yoki yaratish - kalit: (view, id, sahifa), katalog versiyasi"""
+    builders = {
+        'categories': build_categories_view,
+        'category': build_category_view,
+        'product': build_product_view,
+        'search': build_search_view
+    }
+    return render_cache.get_or_build((view, *args), get_catalog_version(), lambda: builders[view](*args))
+
+async def products(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Mahsulotlar kategoriyalarini ko'rsatish"""
+    message, reply_markup = render_view('categories')
+    
+    await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+
+async def show_categories(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Kategoriyalar ro'yxatiga qaytish (callback_data: back_to_categories)"""
+    query = update.callback_query
+    await query.answer()
+    
+    message, reply_markup = render_view('categories')
+    await edit_or_replace(query, message, reply_markup=reply_markup, parse_mode='Markdown')
+
+async def show_category_products(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Tanlangan kategoriya mahsulotlarini ko'rsatish"""
+    query = update.callback_query
+    await query.answer()
+    
+    # callback_data: category_<id> yoki category_<id>_<sahifa>
+    parts = query.data.split('_')
+    category_id = int(parts[1])
+    page = int(parts[2]) if len(parts) > 2 else 0
+    
+    message, reply_markup = render_view('category', category_id, page)
+    await edit_or_replace(query, message, reply_markup=reply_markup, parse_mode='Markdown')
+
+async def show_product_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Mahsulot tafsilotlarini ko'rsatish"""
+    query = update.callback_query
+    await query.answer()
+    
+    product_id = int(query.data.split('_')[1])
+    product, message, reply_markup = render_view('product', product_id)
     
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    if not product:
+        await edit_or_replace(query, message)
+        return
+    
+    # Rasm bo'lsa rasm bilan, aks holda matn
+    if await send_product_photo(query, product, message, reply_markup):
+        await query.delete_message()
+    else:
+        await edit_or_replace(query, message, reply_markup=reply_markup, parse_mode='Markdown')
 
 async def order_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Mahsulotga buyurtma berish"""
@@ -273,7 +419,8 @@ async def order_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
     product_id = int(query.data.split('_')[1])
     context.user_data['ordering_product_id'] = product_id
     
-    await query.edit_message_text(
+    await edit_or_replace(
+        query,
         "Buyurtma sababini yozing:\n(Masalan: Kimga qachon berilganligin asos bor yoqligini yozing!.)",
         reply_markup=InlineKeyboardMarkup([[
             InlineKeyboardButton("❌ Bekor qilish", callback_data=f"product_{product_id}")
@@ -289,19 +436,13 @@ async def handle_order_reason(update: Update, context: ContextTypes.DEFAULT_TYPE
     reason = update.message.text
     user = update.effective_user
     
-    products = get_products()
-    product = next((p for p in products if p['id'] == product_id), None)
+    product = index.product(product_id)
     
     if not product:
         await update.message.reply_text("Mahsulot topilmadi.")
         del context.user_data['ordering_product_id']
         return
     
-    if product.get('quantity', 0) <= 0:
-        await update.message.reply_text("Kechirasiz, bu mahsulot tugadi.")
-        del context.user_data['ordering_product_id']
-        return
-    
     order_data = {
         'productId': product_id,
         'userName': f"{user.first_name} {user.last_name or ''}".strip(),
@@ -309,7 +450,13 @@ async def handle_order_reason(update: Update, context: ContextTypes.DEFAULT_TYPE
         'reason': reason
     }
     
-    order = add_order(order_data)
+    # Tekshirish va band qilish atomar - oxirgi donani faqat bittasi oladi
+    order = await add_order(order_data)
+    
+    if order is None:
+        await update.message.reply_text("Kechirasiz, bu mahsulot tugadi.")
+        del context.user_data['ordering_product_id']
+        return
     
     await update.message.reply_text(
         f"✅ Buyurtma qabul qilindi!\n\n"
@@ -353,27 +500,27 @@ async def handle_order_reason(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     del context.user_data['ordering_product_id']
 
-async def my_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Foydalanuvchining buyurtmalarini ko'rsatish"""
-    user = update.effective_user
-    orders = get_orders()
-    products = get_products()
+def build_orders_page(user_id, page):
+    """Buyurtmalar tarixining bitta sahifasi: (matn, klaviatura) yoki buyurtma bo'lmasa (None, None)"""
+    user_orders, total = index.user_orders_page(user_id, page, ORDERS_PAGE_SIZE)
     
-    user_orders = [o for o in orders if o.get('telegramId') == user.id]
+    if not total:
+        return None, None
     
-    if not user_orders:
-        await update.message.reply_text("Sizda hali buyurtmalar yo'q.")
-        return
+    pages = page_count(total, ORDERS_PAGE_SIZE)
+    if page >= pages:
+        page = pages - 1
+        user_orders, total = index.user_orders_page(user_id, page, ORDERS_PAGE_SIZE)
     
     message = "*📋 Sizning buyurtmalaringiz:*\n\n"
     
-    for order in reversed(user_orders[-10:]):
-        product = next((p for p in products if p['id'] == order.get('productId')), None)
+    status_emoji = {'pending': '⏳', 'completed': '✅', 'cancelled': '❌'}
+    status_text = {'pending': 'Kutilmoqda', 'completed': 'Bajarildi', 'cancelled': 'Bekor qilindi'}
+    
+    for order in user_orders:
+        product = index.product(order.get('productId'))
         product_name = product['name'] if product else "Noma'lum mahsulot"
         
-        status_emoji = {'pending': '⏳', 'completed': '✅', 'cancelled': '❌'}
-        status_text = {'pending': 'Kutilmoqda', 'completed': 'Bajarildi', 'cancelled': 'Bekor qilindi'}
-        
         emoji = status_emoji.get(order.get('status', 'pending'), '⏳')
         status = status_text.get(order.get('status', 'pending'), 'Kutilmoqda')
         
@@ -387,7 +534,114 @@ async def my_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"Status: {status}\n\n"
         )
     
-    await update.message.reply_text(message, parse_mode='Markdown')
+    nav_row = pagination_row("orders", page, pages)
+    reply_markup = InlineKeyboardMarkup([nav_row]) if nav_row else None
+    return message, reply_markup
+
+async def my_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Foydalanuvchining buyurtmalarini ko'rsatish"""
+    user = update.effective_user
+    message, reply_markup = build_orders_page(user.id, 0)
+    
+    if message is None:
+        await update.message.reply_text("Sizda hali buyurtmalar yo'q.")
+        return
+    
+    await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+
+async def show_orders_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Buyurtmalar tarixining boshqa sahifasi (callback_data: orders_<sahifa>)"""
+    query = update.callback_query
+    await query.answer()
+    
+    page = int(query.data.split('_')[1])
+    message, reply_markup = build_orders_page(update.effective_user.id, page)
+    
+    if message is None:
+        await edit_or_replace(query, "Sizda hali buyurtmalar yo'q.")
+        return
+    
+    await edit_or_replace(query, message, reply_markup=reply_markup, parse_mode='Markdown')
+
+def build_inline_results(query, offset):
+    """Inline natijalar sahifasi: (maqolalar, next_offset) - keyingi sahifa bo'lmasa next_offset bo'sh"""
+    products, total = search_index.search(query, offset, INLINE_PAGE_SIZE)
+    
+    results = []
+    for product in products:
+        quantity = product.get('quantity', 0)
+        stock = f"{quantity} dona" if quantity > 0 else "tugagan"
+        results.append(InlineQueryResultArticle(
+            id=str(product['id']),
+            title=product['name'],
+            description=f"💰 {format_price(product['price'])} so'm | 📦 {stock}",
+            input_message_content=InputTextMessageContent(
+                f"*{product['name']}*\n\n"
+                f"💰 Narxi: {format_price(product['price'])} so'm\n"
+                f"📦 Mavjud: {stock}",
+                parse_mode='Markdown'
+            )
+        ))
+    
+    next_offset = str(offset + INLINE_PAGE_SIZE) if offset + INLINE_PAGE_SIZE < total else ''
+    return results, next_offset
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline rejim: istalgan chatda @bot <nom> - narx va qoldiq
+
+    Kalit normallashtirilgan so'rov (katta-kichik harf, kirill/lotin farqi yo'q),
+    natijalar katalog versiyasi o'zgarguncha inline_cache dan olinadi.
+    """
+    query = update.inline_query
+    offset = int(query.offset) if query.offset.isdigit() else 0
+    key = ' '.join(tokenize(query.query))[:64]
+    
+    if not key:
+        await query.answer([], cache_time=INLINE_CACHE_TIME)
+        return
+    
+    results, next_offset = inline_cache.get_or_build(
+        (key, offset), get_catalog_version(), lambda: build_inline_results(key, offset)
+    )
+    await query.answer(results, cache_time=INLINE_CACHE_TIME, next_offset=next_offset)
+
+async def reply_search(update, context, query):
+    """Qidiruv natijalarining birinchi sahifasi - sahifalash uchun so'rov user_data'da saqlanadi"""
+    # Markdown belgilari xabarni buzmasligi uchun olib tashlanadi
+    query = ' '.join(re.sub(r'[*_`\[\]]', ' ', query).split())[:64]
+    message, reply_markup = render_view('search', query, 0)
+    
+    if message is None:
+        await update.message.reply_text(
+            f"🔍 \"{query}\" bo'yicha hech narsa topilmadi.\n"
+            "Boshqa so'z bilan qidiring yoki /products buyrug'ini bosing."
+        )
+        return
+    
+    context.user_data['search_query'] = query
+    await update.message.reply_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+
+async def search_products(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Mahsulot qidirish: /search <so'z> (lotin yoki kirill)"""
+    if not context.args:
+        await update.message.reply_text("Foydalanish: /search <mahsulot nomi>, masalan: /search printer")
+        return
+    
+    await reply_search(update, context, ' '.join(context.args))
+
+async def show_search_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Qidiruv natijalarining boshqa sahifasi (callback_data: search_<sahifa>)"""
+    query = update.callback_query
+    await query.answer()
+    
+    search_query = context.user_data.get('search_query')
+    message, reply_markup = render_view('search', search_query, int(query.data.split('_')[1])) if search_query else (None, None)
+    
+    if message is None:
+        await edit_or_replace(query, "Qidiruv natijalari eskirgan. /search buyrug'i bilan qayta qidiring.")
+        return
+    
+    await edit_or_replace(query, message, reply_markup=reply_markup, parse_mode='Markdown')
 
 async def info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Bot haqida ma'lumot"""
@@ -402,6 +656,8 @@ async def info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/start - Asosiy menyu\n"
         "/products - Mahsulotlar\n"
         "/my_orders - Mening buyurtmalarim\n"
+        "/search - Mahsulot qidirish\n"
+        "@<bot nomi> <mahsulot> - istalgan chatda narx va qoldiq\n"
         "/info - Ma'lumot\n"
         "/contact - Aloqa\n"
         "/health - Bot holati"
@@ -421,16 +677,14 @@ async def contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(contact_info)
 
 async def health(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Bot holati - Render.com health check"""
-    products = get_products()
-    orders = get_orders()
-    categories = get_categories()
+    """Bot holati - Render.com health check (fayllar o'qilmaydi - statistika fayllaridan)"""
+    products, categories, orders = await get_stats('products', 'categories', 'orders')
     
     message = (
         "✅ *Bot ishlayapti!*\n\n"
-        f"📦 Mahsulotlar: {len(products)}\n"
-        f"📂 Kategoriyalar: {len(categories)}\n"
-        f"🛒 Buyurtmalar: {len(orders)}\n"
+        f"📦 Mahsulotlar: {products['count']}\n"
+        f"📂 Kategoriyalar: {categories['count']}\n"
+        f"🛒 Buyurtmalar: {orders['count']}\n"
         f"📁 Data papka: {DATA_DIR}\n"
         f"⏰ Vaqt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
     )
@@ -442,55 +696,33 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
     text = update.message.text
     
     if 'ordering_product_id' in context.user_data:
-        await handle_order_reason(update, context)
+        await order_reason_route(update, context)
         return
     
-    if text == "🛍 Mahsulotlar":
-        await products(update, context)
-    elif text == "📋 Mening buyurtmalarim":
-        await my_orders(update, context)
-    elif text == "ℹ️ Ma'lumot":
-        await info(update, context)
-    elif text == "☎️ Aloqa":
-        await contact(update, context)
-    elif text == "👤 Admin Panel":
-        await admin_stats(update, context)
+    route = TEXT_ROUTES.get(text)
+    if route is not None:
+        await route(update, context)
     else:
-        await update.message.reply_text("Noto'g'ri buyruq. /start buyrug'ini bosing.")
+        # Boshqa matn - mahsulot qidiruvi
+        await search_route(update, context, text)
 
 async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Callback so'rovlarini qayta ishlash"""
     query = update.callback_query
     data = query.data
     
-    if data.startswith('category_'):
-        await show_category_products(update, context)
-    elif data.startswith('product_'):
-        await show_product_details(update, context)
-    elif data.startswith('order_'):
-        await order_product(update, context)
+    for prefix, route in CALLBACK_ROUTES:
+        if data.startswith(prefix):
+            await route(update, context)
+            return
+    
+    if data == 'noop':
+        await query.answer()
     elif data == 'back_to_main':
         await query.answer()
         await query.message.delete()
     elif data == 'back_to_categories':
-        await query.answer()
-        categories = get_categories()
-        
-        keyboard = []
-        for category in categories:
-            keyboard.append([InlineKeyboardButton(
-                f"{category.get('icon', '📦')} {category['name']}", 
-                callback_data=f"category_{category['id']}"
-            )])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_main")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(
-            "📦 *Kategoriyalar:*\n\nQaysi kategoriyani ko'rmoqchisiz?",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
+        await categories_route(update, context)
 
 def format_price(price):
     """Narxni formatlash"""
@@ -504,23 +736,28 @@ async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Sizda admin huquqi yo'q.")
         return
     
-    products = get_products()
-    categories = get_categories()
-    orders = get_orders()
+    products, categories, orders = await get_stats('products', 'categories', 'orders')
     
-    total_products = len(products)
-    available_products = len([p for p in products if p.get('quantity', 0) > 0])
-    total_orders = len(orders)
-    pending_orders = len([o for o in orders if o.get('status') == 'pending'])
+    total_products = products['count']
+    available_products = products['available']
+    total_orders = orders['count']
+    pending_orders = orders['statuses'].get('pending', 0)
+    invalid = products['invalid'] + categories['invalid'] + orders['invalid']
+    stats = cache_stats()
     
     message = (
         f"*📊 Admin statistikasi*\n\n"
         f"📦 Jami mahsulotlar: {total_products}\n"
         f"✅ Mavjud mahsulotlar: {available_products}\n"
-        f"📂 Kategoriyalar: {len(categories)}\n"
+        f"📂 Kategoriyalar: {categories['count']}\n"
         f"🛒 Jami buyurtmalar: {total_orders}\n"
         f"⏳ Kutilayotgan buyurtmalar: {pending_orders}\n"
+        f"💾 Kesh: {stats['hits']} hit / {stats['misses']} miss ({stats['hit_ratio']:.0%})\n"
+        f"🖼 Rasmlar: {photo_stats['uploads']} yuklandi / {photo_stats['cache_hits']} file_id keshdan\n"
+        f"🧩 Render kesh: {render_cache.stats['hits']} hit / {render_cache.stats['misses']} miss\n"
     )
+    if invalid:
+        message += f"⚠️ Noto'g'ri yozuvlar: {invalid}\n"
     
     await update.message.reply_text(message, parse_mode='Markdown')
 
@@ -540,18 +777,201 @@ async def add_admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         new_admin_id = int(context.args[0])
         if new_admin_id not in ADMIN_IDS:
             ADMIN_IDS.append(new_admin_id)
-            save_admin_ids(ADMIN_IDS)
+            await save_admin_ids(ADMIN_IDS)
             await update.message.reply_text(f"✅ Admin qo'shildi: {new_admin_id}")
         else:
             await update.message.reply_text("Bu foydalanuvchi allaqachon admin.")
     except ValueError:
         await update.message.reply_text("Noto'g'ri user_id formati.")
 
+async def profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Profillashni yoqish: /profile [N update] [T s] yoki /profile stop"""
+    user_id = update.effective_user.id
+    
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("Sizda admin huquqi yo'q.")
+        return
+    
+    if context.args and context.args[0] == 'stop':
+        if not profiler.active:
+            await update.message.reply_text("Profillash yoqilmagan.")
+            return
+        profiler.stop()
+        return
+    
+    if profiler.active:
+        await update.message.reply_text("Profillash allaqachon yoqilgan. To'xtatish: /profile stop")
+        return
+    
+    updates = seconds = None
+    try:
+        for arg in context.args:
+            if arg.endswith('s'):
+                seconds = float(arg[:-1])
+            else:
+                updates = int(arg)
+    except ValueError:
+        await update.message.reply_text("Foydalanish: /profile [update soni] [soniya]s, masalan: /profile 200 30s")
+        return
+    
+    done = profiler.start(updates, seconds)
+    await update.message.reply_text(
+        f"🔬 Profillash yoqildi: keyingi {profiler.limit_updates} ta update yoki {profiler.limit_seconds:.0f} soniya.\n"
+        f"Natija shu chatga yuboriladi."
+    )
+    asyncio.get_running_loop().create_task(send_profile_report(context.bot, update.effective_chat.id, done))
+
+# /report <kun soni> uchun yuqori chegara (timedelta sana oralig'idan chiqmasligi uchun)
+REPORT_MAX_DAYS = 36500
+
+def parse_report_date(text):
+    """YYYY-MM-DD yoki DD.MM.YYYY -> YYYY-MM-DD (noto'g'ri bo'lsa None)"""
+    for date_format in ('%Y-%m-%d', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(text, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def parse_report_args(args):
+    """/report argumentlari -> (boshlanish, tugash, kategoriya id) yoki None
+
+    /report [kun soni] [kategoriya id]  - oxirgi N kun (standart 30)
+    /report <sana> [sana] [kategoriya id]
+    """
+    args = list(args)
+    today = datetime.now()
+    end = today.strftime('%Y-%m-%d')
+    start = (today - timedelta(days=29)).strftime('%Y-%m-%d')
+    
+    if args and parse_report_date(args[0]):
+        start = parse_report_date(args.pop(0))
+        if args and parse_report_date(args[0]):
+            end = parse_report_date(args.pop(0))
+    elif args and args[0].isdigit():
+        days = min(max(int(args.pop(0)), 1), REPORT_MAX_DAYS)
+        start = (today - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    
+    category_id = None
+    if args:
+        if not args[0].isdigit() or len(args) > 1:
+            return None
+        category_id = int(args[0])
+    if start > end:
+        start, end = end, start
+    return start, end, category_id
+
+async def report(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Buyurtmalar hisoboti: /report [kun soni | sana [sana]] [kategoriya id]"""
+    user_id = update.effective_user.id
+    
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("Sizda admin huquqi yo'q.")
+        return
+    
+    parsed = parse_report_args(context.args or [])
+    if parsed is None:
+        await update.message.reply_text(
+            "Foydalanish: /report [kun soni] [kategoriya id] yoki /report <sana> [sana] [kategoriya id]\n"
+            "Masalan: /report 7, /report 2025-11-01 2025-11-30 1"
+        )
+        return
+    start, end, category_id = parsed
+    
+    # Birinchi chaqiruvda yig'indilar quriladi - event loop bloklanmasligi uchun thread pool'da
+    result = await storage_io.run(rollups.report, start, end, category_id)
+    
+    period = f"{datetime.fromisoformat(start).strftime('%d.%m.%Y')} - {datetime.fromisoformat(end).strftime('%d.%m.%Y')}"
+    message = f"*📈 Buyurtmalar hisoboti*\n{period}\n"
+    if category_id is not None:
+        category = index.category(category_id)
+        message += f"Kategoriya: {category['name'] if category else category_id}\n"
+    message += f"\n🛒 Jami buyurtmalar: {result['total']}\n"
+    
+    if not result['total']:
+        await update.message.reply_text(message, parse_mode='Markdown')
+        return
+    
+    status_emoji = {'pending': '⏳', 'completed': '✅', 'cancelled': '❌'}
+    status_text = {'pending': 'Kutilmoqda', 'completed': 'Bajarildi', 'cancelled': 'Bekor qilindi'}
+    for status, count in sorted(result['statuses'].items(), key=lambda item: -item[1]):
+        message += f"{status_emoji.get(status, '•')} {status_text.get(status, status)}: {count}\n"
+    
+    # Markdown belgilari xabarni buzmasligi uchun olib tashlanadi
+    def clean(text):
+        return re.sub(r'[*_`\[\]]', '', str(text))
+    
+    if category_id is None and len(result['categories']) > 1:
+        message += "\n*📂 Kategoriyalar:*\n"
+        for category_key, count in sorted(result['categories'].items(), key=lambda item: -item[1]):
+            category = index.category(category_key)
+            name = f"{category.get('icon', '')} {clean(category['name'])}" if category else "• Boshqa"
+            message += f"{name}: {count}\n"
+    
+    message += "\n*🏆 Eng ko'p buyurtma qilingan:*\n"
+    for product_id, count in result['top_products']:
+        product = index.product(product_id)
+        message += f"• {clean(product['name']) if product else f'#{product_id}'}: {count}\n"
+    
+    message += "\n*👤 Faol foydalanuvchilar:*\n"
+    for telegram_id, name, count in result['top_users']:
+        message += f"• {clean(name or telegram_id)}: {count}\n"
+    
+    await update.message.reply_text(message, parse_mode='Markdown')
+
+async def send_profile_report(bot, chat_id, done):
+    """Sessiya tugagach xulosani va to'liq hisobotni yuborish"""
+    try:
+        await asyncio.wait_for(done.wait(), timeout=profiler.limit_seconds)
+    except asyncio.TimeoutError:
+        pass
+    profiler.stop()
+    
+    try:
+        await bot.send_message(chat_id=chat_id, text=profiler.summary())
+        report = io.BytesIO(profiler.report().encode('utf-8'))
+        await bot.send_document(chat_id=chat_id, document=report, filename='profile.txt')
+    except Exception as e:
+        logger.error(f"Profil hisobotini yuborishda xatolik: {e}")
+
+# Ma'lumotlarni oldindan yuklash
+async def prefetch_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Har bir update'dan oldin eskirgan fayllarni thread pool'da o'qish
+
+    Handlerlar sinxron get_*() funksiyalarini chaqiradi - bu yerdan keyin
+    ular xotiradagi nusxani oladi va event loop diskni kutmaydi.
+    """
+    try:
+        await storage_io.prefetch('products', 'categories', 'orders', 'settings')
+    except Exception as e:
+        logger.error(f"Ma'lumotlarni oldindan yuklashda xatolik: {e}")
+
 # Error handler
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Xatolarni qayta ishlash"""
     logger.error(f"Update {update} caused error {context.error}")
 
+# Dispatcherlarning yo'naltirish jadvallari - ichki handlerlar ham instrument() bilan o'ralgan
+# (metrikada o'z nomi bilan, /profile da "callback_handler > show_product_details" ko'rinishida)
+TEXT_ROUTES = {
+    "🛍 Mahsulotlar": instrument(products),
+    "📋 Mening buyurtmalarim": instrument(my_orders),
+    "ℹ️ Ma'lumot": instrument(info),
+    "☎️ Aloqa": instrument(contact),
+    "👤 Admin Panel": instrument(admin_stats),
+}
+order_reason_route = instrument(handle_order_reason)
+search_route = instrument(reply_search)
+
+CALLBACK_ROUTES = [
+    ('category_', instrument(show_category_products)),
+    ('product_', instrument(show_product_details)),
+    ('order_', instrument(order_product)),
+    ('orders_', instrument(show_orders_page)),
+    ('search_', instrument(show_search_page)),
+]
+categories_route = instrument(show_categories)
+
 def main():
     """Botni ishga tushirish"""
     BOT_TOKEN = os.getenv('BOT_TOKEN')
@@ -565,21 +985,28 @@ def main():
         logger.error("BOT_TOKEN muhit o'zgaruvchisini belgilang yoki bot_data/settings.json da saqlang")
         return
     
-    # Applicationni yaratish
-    application = Application.builder().token(BOT_TOKEN).build()
-    
-    # Handlerlarni qo'shish
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("products", products))
-    application.add_handler(CommandHandler("my_orders", my_orders))
-    application.add_handler(CommandHandler("info", info))
-    application.add_handler(CommandHandler("contact", contact))
-    application.add_handler(CommandHandler("health", health))
-    application.add_handler(CommandHandler("admin_stats", admin_stats))
-    application.add_handler(CommandHandler("add_admin", add_admin))
-    
-    application.add_handler(CallbackQueryHandler(callback_handler))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_messages))
+    # Applicationni yaratish (MetricsBot - yuborish xatolari metrikasi)
+    application = Application.builder().bot(MetricsBot(BOT_TOKEN)).build()
+    
+    # Handlerlarni qo'shish (group=-2 va -1 - har bir update'dan oldin)
+    # instrument - bajarilish vaqti, xatolar va /profile (metrics.py), handler tanasi o'zgarmaydi
+    application.add_handler(TypeHandler(Update, metrics.count_update), group=-2)
+    application.add_handler(TypeHandler(Update, prefetch_data), group=-1)
+    application.add_handler(CommandHandler("start", instrument(start)))
+    application.add_handler(CommandHandler("products", instrument(products)))
+    application.add_handler(CommandHandler("my_orders", instrument(my_orders)))
+    application.add_handler(CommandHandler("search", instrument(search_products)))
+    application.add_handler(CommandHandler("info", instrument(info)))
+    application.add_handler(CommandHandler("contact", instrument(contact)))
+    application.add_handler(CommandHandler("health", instrument(health)))
+    application.add_handler(CommandHandler("admin_stats", instrument(admin_stats)))
+    application.add_handler(CommandHandler("add_admin", instrument(add_admin)))
+    application.add_handler(CommandHandler("profile", instrument(profile)))
+    application.add_handler(CommandHandler("report", instrument(report)))
+    
+    application.add_handler(CallbackQueryHandler(instrument(callback_handler)))
+    application.add_handler(InlineQueryHandler(instrument(inline_query)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, instrument(handle_text_messages)))
     
     # Error handler
     application.add_error_handler(error_handler)
@@ -589,7 +1016,26 @@ def main():
     logger.info(f"📊 Ma'lumotlar papkasi: {DATA_DIR}")
     logger.info(f"👥 Admin IDs: {ADMIN_IDS}")
     
+    # products.json dagi base64 rasmlarni bot_data/images ga ko'chirish
+    migrate_images(backend, DATA_DIR)
+    
+    # Qidiruv indeksi - birinchi so'rov uni qurishni kutmasligi uchun
+    search_index.refresh()
+    # Hisobot yig'indilari - mavjud buyurtmalardan noldan quriladi
+    rollups.refresh()
+    
+    # Buyurtmalar jurnalini orqa fonda yig'ish
+    backend.start_background()
+    
+    # Prometheus metrikalari (METRICS_PORT=0 - o'chirilgan)
+    metrics.start_server()
+    
+    # Web panel uchun ma'lumotlar API (DATA_API_PORT=0 - o'chirilgan)
+    data_api.start_server(backend, DATA_DIR)
+    
     application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
+    storage_io.shutdown()
+    backend.close()
 
 if __name__ == '__main__':
     main()
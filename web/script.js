@@ -8,6 +8,15 @@ const GITHUB_REPO = 'mahsulot-tizimi';
 const GITHUB_BRANCH = 'main';
 const GITHUB_RAW = `https://raw.githubusercontent.com/${GITHUB_USER}/${GITHUB_REPO}/${GITHUB_BRANCH}/bot_data`;
 
+// Bot ma'lumotlar API (data_api.py) - berilsa GitHub o'rniga ishlatiladi:
+// localStorage.setItem('dataApiUrl', 'http://127.0.0.1:8081')
+const DATA_API_URL = (localStorage.getItem('dataApiUrl') || '').replace(/\/$/, '');
+const DATA_API_TOKEN = localStorage.getItem('dataApiToken') || '';
+const DATA_NAMES = ['products', 'categories', 'orders'];
+
+// Statik nashr (sync_data.py publish -> web/data): manifest + xeshli fayllar
+const PUBLISH_URL = 'data';
+
 // Database class - GitHub Raw + LocalStorage
 class Database {
     constructor() {
@@ -16,6 +25,10 @@ class Database {
         this.orders = [];
         this.settings = {};
         this.lastUpdate = null;
+        this.apiVersion = null;
+        this.etags = {};
+        this.published = JSON.parse(localStorage.getItem('publishedHashes') || '{}');
+        this.publishAvailable = true;
         this.init();
     }
 
@@ -23,13 +36,148 @@ class Database {
         // Birinchi localStorage'dan yuklash (tez)
         this.loadFromLocalStorage();
         
-        // Keyin GitHub'dan yangilash
-        await this.loadFromGitHub();
+        // Keyin GitHub'dan (yoki bot API'dan) yangilash
+        await this.refresh();
         
-        // Auto-refresh har 30 soniyada
+        // Auto-refresh
         this.startAutoRefresh();
     }
 
+    // Manba: bot API (sozlangan bo'lsa), statik nashr (bo'lsa) yoki GitHub
+    async refresh() {
+        if (DATA_API_URL) {
+            await this.loadFromApi();
+        } else if (!this.publishAvailable || !(await this.loadFromPublished())) {
+            await this.loadFromGitHub();
+        }
+    }
+
+    // Statik nashrdan yangilash: avval kichik manifest.json, keyin faqat xeshi
+    // o'zgargan fayllar (xeshli fayl o'zgarmaydi - brauzer keshidan olinadi)
+    async loadFromPublished() {
+        try {
+            const response = await fetch(`${PUBLISH_URL}/manifest.json`, { cache: 'no-cache' });
+            if (!response.ok || !(response.headers.get('Content-Type') || '').includes('json')) {
+                // Nashr qilinmagan (404 yoki rewrite orqali index.html) - GitHub'dan o'qiladi
+                this.publishAvailable = false;
+                return false;
+            }
+            const manifest = await response.json();
+            
+            let changed = false;
+            for (const name of DATA_NAMES) {
+                const entry = manifest.files[name];
+                if (!entry || this.published[name] === entry.hash) continue;
+                
+                const fileResponse = await fetch(`${PUBLISH_URL}/${entry.file}`);
+                if (!fileResponse.ok) {
+                    throw new Error(`HTTP error! status: ${fileResponse.status}`);
+                }
+                this[name] = await fileResponse.json();
+                this.published[name] = entry.hash;
+                changed = true;
+            }
+            
+            if (changed) {
+                this.lastUpdate = new Date();
+                this.saveToLocalStorage();
+                console.log('✅ Nashrdan yangilandi');
+                
+                if (typeof loadDashboard === 'function') {
+                    loadDashboard();
+                }
+                showNotification('Ma\'lumotlar yangilandi! 🔄', 'success');
+            }
+            return true;
+        } catch (err) {
+            console.error('❌ Nashrdan yuklashda xato:', err);
+            return false;
+        }
+    }
+
+    // Bot API'dan yangilash: o'zgarish bo'lmasa 304 (faqat sarlavhalar),
+    // bo'lsa faqat o'zgargan yozuvlar keladi (pushed - oqimdan kelgan o'zgarish)
+    async loadFromApi(pushed) {
+        try {
+            let reload = DATA_NAMES;
+            let changed = false;
+            
+            if (pushed || this.apiVersion) {
+                let delta = pushed;
+                if (!delta) {
+                    const response = await this.apiFetch(`/api/changes?since=${encodeURIComponent(this.apiVersion)}`);
+                    if (response.status === 304) return;
+                    delta = await response.json();
+                }
+                reload = delta.reset ? DATA_NAMES : [];
+                if (!delta.reset) {
+                    for (const change of delta.changes) {
+                        if (change.op === 'replace') {
+                            reload.push(change.name);
+                        } else {
+                            this.applyRecords(change.name, change.records);
+                            changed = true;
+                        }
+                    }
+                }
+                this.apiVersion = delta.version;
+            } else {
+                // Versiya ro'yxatlardan oldin olinadi - oradagi o'zgarishlar keyingi so'rovda keladi
+                const response = await this.apiFetch('/api/changes?since=');
+                this.apiVersion = (await response.json()).version;
+            }
+            
+            for (const name of reload) {
+                const response = await this.apiFetch(`/api/${name}`, this.etags[name]);
+                if (response.status === 304) continue;
+                this.etags[name] = response.headers.get('ETag');
+                this[name] = await response.json();
+                changed = true;
+            }
+            
+            if (changed) {
+                this.lastUpdate = new Date();
+                this.saveToLocalStorage();
+                console.log('✅ Bot API\'dan yangilandi');
+                
+                if (typeof loadDashboard === 'function') {
+                    loadDashboard();
+                }
+                showNotification('Ma\'lumotlar yangilandi! 🔄', 'success');
+            }
+        } catch (err) {
+            console.error('❌ Bot API\'dan yuklashda xato:', err);
+            this.apiVersion = null;
+        }
+    }
+
+    // API so'rovi (ETag bo'lsa If-None-Match bilan)
+    async apiFetch(path, etag) {
+        const headers = {};
+        if (etag) headers['If-None-Match'] = etag;
+        if (DATA_API_TOKEN) headers['Authorization'] = `Bearer ${DATA_API_TOKEN}`;
+        
+        const response = await fetch(`${DATA_API_URL}${path}`, { cache: 'no-store', headers });
+        if (!response.ok && response.status !== 304) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response;
+    }
+
+    // Yangi/o'zgargan yozuvlarni id bo'yicha qo'llash
+    applyRecords(name, records) {
+        const list = this[name];
+        const positions = new Map(list.map((item, i) => [item.id, i]));
+        for (const record of records) {
+            if (positions.has(record.id)) {
+                list[positions.get(record.id)] = record;
+            } else {
+                positions.set(record.id, list.length);
+                list.push(record);
+            }
+        }
+    }
+
     // GitHub'dan ma'lumotlarni yuklash
     async loadFromGitHub() {
         try {
@@ -97,14 +245,38 @@ class Database {
         }
     }
 
+    // Bot API oqimi (SSE): o'zgarishlar so'rovsiz, kelishi bilan qo'llanadi.
+    // Uzilsa brauzer Last-Event-ID bilan qayta ulanadi - oradagi o'zgarishlar yo'qolmaydi
+    startFeed() {
+        const params = new URLSearchParams({ since: this.apiVersion || '' });
+        if (DATA_API_TOKEN) params.set('token', DATA_API_TOKEN);
+        
+        let queue = Promise.resolve();
+        this.feed = new EventSource(`${DATA_API_URL}/api/feed?${params}`);
+        this.feed.addEventListener('change', (event) => {
+            const delta = JSON.parse(event.data);
+            // Navbat bilan - ro'yxatni qayta yuklash tugamasdan keyingi o'zgarish qo'llanmaydi
+            queue = queue.then(() => this.loadFromApi(delta));
+        });
+        this.feed.onerror = () => console.log('⚠️ Bot API oqimi uzildi, qayta ulanmoqda...');
+        
+        console.log('⚡ Bot API oqimi yoqildi');
+    }
+
     // Auto-refresh
     startAutoRefresh() {
-        // Har 30 soniyada yangilash
+        if (DATA_API_URL && window.EventSource) {
+            this.startFeed();
+            return;
+        }
+        
+        // GitHub - har 30 soniyada, bot API - har 5 soniyada (o'zgarish bo'lmasa faqat sarlavhalar)
+        const interval = DATA_API_URL ? 5000 : 30000;
         setInterval(async () => {
-            await this.loadFromGitHub();
-        }, 30000);
+            await this.refresh();
+        }, interval);
         
-        console.log('⏰ Auto-refresh yoqildi (30 soniya)');
+        console.log(`⏰ Auto-refresh yoqildi (${interval / 1000} soniya)`);
     }
 
     // LocalStorage'dan yuklash
@@ -138,6 +310,7 @@ class Database {
             localStorage.setItem('categories', JSON.stringify(this.categories));
             localStorage.setItem('orders', JSON.stringify(this.orders));
             localStorage.setItem('settings', JSON.stringify(this.settings));
+            localStorage.setItem('publishedHashes', JSON.stringify(this.published));
         } catch (err) {
             console.error('LocalStorage saqlashda xato:', err);
         }
@@ -303,7 +476,7 @@ setInterval(updateSyncStatus, 5000);
 
 async function manualRefresh() {
     showNotification('🔄 GitHub\'dan yangilanyapti...', 'info');
-    await db.loadFromGitHub();
+    await db.refresh();
 }
 
 // ============================================